@@ -0,0 +1,48 @@
+"""
+Decode-time benchmark for the JSON backends of core.decoding on the saved GraphQL captures
+(debug_graphql/*.json, ~450 KB each), against the old body.decode('utf-8') + json.loads path.
+
+    python -m benchmarks.bench_decoding [--repeat 20]
+"""
+import argparse
+import glob
+import json
+import time
+
+from core.decoding import JsonDecoder
+
+
+def _time(fn, bodies, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body in bodies:
+            fn(body)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    bodies = []
+    for path in sorted(glob.glob("debug_graphql/*.json")):
+        with open(path, "rb") as f:
+            bodies.append(f.read())
+    if not bodies:
+        print("No captures in debug_graphql/")
+        return
+    size = sum(len(b) for b in bodies)
+    print(f"{len(bodies)} bodies, {size / 1024:.0f} KB")
+
+    baseline = _time(lambda body: json.loads(body.decode('utf-8')), bodies, args.repeat)
+    print(f"{'decode + json.loads':<20} {baseline * 1000:8.2f} ms")
+    for backend in JsonDecoder.available():
+        elapsed = _time(JsonDecoder(backend).loads, bodies, args.repeat)
+        print(f"{backend:<20} {elapsed * 1000:8.2f} ms  ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Memory and encode-time benchmark of the core.models records against the plain dicts they replace,
+on the scraped X posts in data/ (each post loaded many times over, like a long streaming run).
+
+    python -m benchmarks.bench_models [--copies 20]
+"""
+import argparse
+import glob
+import json
+import time
+import tracemalloc
+
+from core.decoding import dumps, orjson
+from core.models import Post
+from core.utils import ScraperUtils
+
+
+def load_posts() -> list:
+    posts = []
+    for path in sorted(glob.glob("data/x*.json")):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        posts.extend(p for p in (data if isinstance(data, list) else [data]) if isinstance(p, dict) and p.get("url"))
+    return posts
+
+
+def _retained(build):
+    """ Bytes still allocated after build() returns, and the built value. """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, value
+
+
+def _encode_time(posts, encode=None, repeat=5):
+    encode = encode or (lambda post: dumps(post, default=ScraperUtils.json_default))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for post in posts:
+            encode(post)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--copies", type=int, default=20)
+    args = parser.parse_args()
+
+    raw = [json.dumps(p) for p in load_posts()]
+    if not raw:
+        print("No X posts in data/")
+        return
+    raw = raw * args.copies
+    comments = sum(len(json.loads(r).get("comments") or []) for r in raw)
+    print(f"{len(raw)} posts, {comments} comments")
+
+    # Each copy is decoded separately, so strings are not shared between copies (as when scraping)
+    dict_bytes, dicts = _retained(lambda: [json.loads(r) for r in raw])
+    model_bytes, models = _retained(lambda: [Post.from_dict(json.loads(r)) for r in raw])
+    print(f"{'dicts':<8} {dict_bytes / len(raw) / 1024:8.1f} KB/post")
+    print(f"{'models':<8} {model_bytes / len(raw) / 1024:8.1f} KB/post  ({1 - model_bytes / dict_bytes:.0%} less)")
+
+    dict_time = _encode_time(dicts)
+    model_time = _encode_time(models)
+    if orjson is not None:
+        print(f"encode dicts (orjson) {_encode_time(dicts, orjson.dumps) * 1000:8.2f} ms")
+    print(f"encode dicts          {dict_time * 1000:8.2f} ms")
+    print(f"encode models         {model_time * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Replay benchmark of the parsing hot path: recorded GraphQL bodies (core.replay) through the X
+and Instagram parsers, reporting posts/sec, comments/sec and peak memory per path.
+
+With --save the results become the baseline; with --check the run fails (exit 1) when a path
+is slower, or peaks higher, than the baseline by more than --tolerance, so a parser regression
+is caught before it ships.
+
+    python -m benchmarks.bench_replay [--copies 10] [--repeat 5] [--save | --check] [--baseline PATH]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from core.replay import Replay
+
+DEFAULT_BASELINE = "data/bench_replay_baseline.json"
+
+
+def run_suite(replay: Replay, repeat: int) -> dict:
+    paths = {
+        "x": replay.x_posts,
+        "x_legacy": replay.x_legacy,
+        "instagram": replay.instagram_posts,
+    }
+    return {name: Replay.measure(run, repeat) for name, run in paths.items()}
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    found = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not result["posts"]:
+            continue
+        if result["posts_per_sec"] < base["posts_per_sec"] * (1 - tolerance):
+            found.append(f"{name}: {result['posts_per_sec']:.0f} posts/s vs {base['posts_per_sec']:.0f} baseline")
+        if result["peak_mb"] > base["peak_mb"] * (1 + tolerance):
+            found.append(f"{name}: peak {result['peak_mb']:.1f} MB vs {base['peak_mb']:.1f} MB baseline")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--copies", type=int, default=10, help="replay the recorded bodies this many times per run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=40)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--save", action="store_true", help="store this run as the baseline")
+    mode.add_argument("--check", action="store_true", help="exit 1 on a regression against the baseline")
+    args = parser.parse_args()
+
+    replay = Replay.from_disk(page_size=args.page_size, copies=args.copies)
+    if not replay.x_threads and not replay.instagram_bodies:
+        print("Nothing to replay: no X results in data/ and no captures in debug_graphql/")
+        return
+    results = run_suite(replay, args.repeat)
+
+    print(f"{'path':<10} {'posts':>7} {'comments':>9} {'posts/s':>10} {'comments/s':>12} {'peak MB':>8}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['posts']:>7} {r['comments']:>9} {r['posts_per_sec']:>10.0f} "
+              f"{r['comments_per_sec']:>12.0f} {r['peak_mb']:>8.1f}")
+
+    baseline_path = Path(args.baseline)
+    if args.save:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Baseline saved to {baseline_path}")
+    elif args.check:
+        if not baseline_path.exists():
+            print(f"No baseline at {baseline_path}; run with --save first")
+            sys.exit(2)
+        found = regressions(results, json.loads(baseline_path.read_text(encoding="utf-8")), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+        print(f"No regression beyond {args.tolerance:.0%} of {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
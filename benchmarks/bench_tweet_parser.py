@@ -0,0 +1,77 @@
+"""
+Parse-time benchmark: the two walks the old scraper path ran over every captured body
+(parse_tweet_json and parse_comments_from_json) against the single-pass TweetDetailParser.parse,
+which also reads the Bottom cursor.
+
+TweetDetail payloads are rebuilt from the saved results in data/ by core.replay (one focal tweet
+plus its comments, split into cursor-sized pages), so the run needs no network or browser.
+
+    python -m benchmarks.bench_tweet_parser [--repeat 50] [--page-size 40]
+"""
+import argparse
+import msgspec
+import json
+import time
+
+from core.utils import ScraperUtils
+from core.tweet_parser import TweetDetailParser
+from core.models import Comment, Repost, Tweet
+from core.replay import load_payloads
+
+
+def legacy_parse(body):
+    return ScraperUtils.parse_tweet_json(body), ScraperUtils.parse_comments_from_json(body)
+
+
+def single_pass_parse(body):
+    return TweetDetailParser.parse(body)
+
+
+def _run(fn, bodies):
+    start = time.perf_counter()
+    for body in bodies:
+        fn(body)
+    return time.perf_counter() - start
+
+
+def best_of(fns, bodies, repeat):
+    """ Best time of each function; runs are interleaved so machine noise hits all of them alike. """
+    best = [float("inf")] * len(fns)
+    for _ in range(repeat):
+        for i, fn in enumerate(fns):
+            best[i] = min(best[i], _run(fn, bodies))
+    return best
+
+
+def check_equivalence(bodies):
+    """ Same fields as the dict parsers once their string counts are read as ints (ids are new). """
+    for body in bodies:
+        old_main, old_comments = legacy_parse(body)
+        new = single_pass_parse(body)
+        new_comments = [msgspec.structs.replace(c, id=None) for c in new["comments"]]
+        assert new_comments == [Comment.from_dict(c) for c in old_comments], "comment output differs"
+        assert new["cursor"] == ScraperUtils.find_cursor(body, 'Bottom'), "cursor differs"
+        if old_main["post"]["id"]:
+            assert new["post"] == Tweet.from_dict(old_main["post"]), "main post differs"
+            assert new["repost"] == Repost.from_dict(old_main.get("repost")), "repost differs"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=40)
+    args = parser.parse_args()
+
+    bodies = load_payloads(page_size=args.page_size)
+    size = sum(len(json.dumps(b)) for b in bodies)
+    check_equivalence(bodies)
+    print(f"{len(bodies)} payloads, {size / 1024:.0f} KB, outputs identical")
+
+    old, new = best_of((legacy_parse, single_pass_parse), bodies, args.repeat)
+    print(f"parse_tweet_json + parse_comments_from_json: {old * 1000:8.2f} ms")
+    print(f"TweetDetailParser.parse:                     {new * 1000:8.2f} ms")
+    print(f"speedup: {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+from playwright.async_api import async_playwright
+from core.browser import STEALTH_SCRIPT, ResourceBlocker, persistent_context_options
+from core.network_cache import NetworkCache
+
+
+class AsyncBrowserEngine:
+    """
+    asyncio counterpart of BrowserEngine. Same create_driver / restart_driver / quit_driver
+    surface, but every method is a coroutine so one event loop can drive many pages.
+    """
+    def __init__(self, headless: bool = False, window_size: str = "1280,900", user_data_dir: str | None = None,
+                 block_resources="default", network_cache: NetworkCache = None):
+        # Dedicated directory for Playwright profile to avoid conflicts
+        self.user_data_dir = user_data_dir or os.path.join(os.getcwd(), "chrome_profile")
+        os.makedirs(self.user_data_dir, exist_ok=True)
+        self.headless = headless
+        self.window_size = window_size
+        self.playwright = None
+        self.context = None
+        self.page = None
+        # Same blocking profiles and network cache as BrowserEngine
+        self.blocker = ResourceBlocker.from_profile(block_resources)
+        self.network_cache = network_cache
+
+    async def create_driver(self):
+        self.playwright = await async_playwright().start()
+        self.context = await self.playwright.chromium.launch_persistent_context(
+            self.user_data_dir,
+            **persistent_context_options(self.headless, self.window_size)
+        )
+        if self.blocker is not None or self.network_cache is not None:
+            await self.context.route("**/*", self.handle_route)
+        self.page = await self.new_page()
+
+        return self.page
+
+    async def handle_route(self, route):
+        """ BrowserEngine.handle_route for the async context. """
+        if self.blocker is not None and self.blocker.blocks(route.request):
+            await route.abort()
+        elif self.network_cache is not None:
+            await self.network_cache.handle_async(route)
+        else:
+            await route.continue_()
+
+    async def new_page(self):
+        page = await self.context.new_page()
+        await page.add_init_script(STEALTH_SCRIPT)
+        return page
+
+    async def get_driver(self):
+        if self.page is None:
+            return await self.create_driver()
+        return self.page
+
+    async def restart_driver(self):
+        await self.quit_driver()
+        return await self.create_driver()
+
+    async def quit_driver(self):
+        if self.context:
+            await self.context.close()
+        if self.playwright:
+            await self.playwright.stop()
+        self.context = None
+        self.playwright = None
+        self.page = None
@@ -1,9 +1,134 @@
 import random
 import os
 from playwright.sync_api import sync_playwright
+from core.network_cache import NetworkCache
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36"
+]
+
+# Additional enhanced stealth scripts (layered on top of stealth plugin)
+STEALTH_SCRIPT = """
+        Object.defineProperty(navigator, 'hardwareConcurrency', {get: () => 8});
+        Object.defineProperty(navigator, 'deviceMemory', {get: () => 8});
+        Object.defineProperty(navigator, 'maxTouchPoints', {get: () => 0});
+        window.chrome = { runtime: {} };
+        const originalQuery = window.navigator.permissions.query;
+        window.navigator.permissions.query = (parameters) => (
+          parameters.name === 'notifications' ?
+            Promise.resolve({ state: Notification.permission }) :
+            originalQuery(parameters)
+        );
+        """
+
+
+# Resource types and URL fragments aborted by each blocking profile. XHR/fetch (GraphQL) always goes
+# through unless its URL matches an analytics pattern.
+ANALYTICS_PATTERNS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'facebook.com/tr',
+    '/jot/', 'client_event', 'scribe.x.com',           # X telemetry
+    '/logging_client_events', '/ajax/bz', '/logging/',  # Instagram telemetry
+)
+BLOCK_PROFILES = {
+    "default": {"resource_types": {"image", "media", "font", "stylesheet"}, "url_patterns": ANALYTICS_PATTERNS},
+    # "default" of the Instagram scrapers: their XPath selectors depend on the layout
+    "instagram": {"resource_types": {"image", "media", "font"}, "url_patterns": ANALYTICS_PATTERNS},
+    "media": {"resource_types": {"image", "media", "font"}, "url_patterns": ()},
+    "none": {"resource_types": set(), "url_patterns": ()},
+}
+# Assumed transfer size per blocked request. Aborted requests are never downloaded, so their real
+# size is unknown; these averages only turn block counts into a rough estimate of bytes saved.
+ESTIMATED_BYTES = {"image": 60_000, "media": 800_000, "font": 40_000, "stylesheet": 25_000}
+DEFAULT_ESTIMATED_BYTES = 10_000
+
+
+class ResourceBlocker:
+    """
+    context.route handler that aborts requests the scrapers never read. Media URLs stay in the
+    DOM (img/video src), so they can still be recorded without being downloaded.
+
+    Only counts are measured. estimated_bytes_saved multiplies them by ESTIMATED_BYTES per
+    resource type; it is an order of magnitude, not a measurement.
+    """
+    def __init__(self, resource_types=(), url_patterns=()):
+        self.resource_types = set(resource_types)
+        self.url_patterns = tuple(url_patterns)
+        self.reset()
+
+    @classmethod
+    def from_profile(cls, profile):
+        """ profile is a BLOCK_PROFILES name, a dict with the same keys, or None (no blocking). """
+        if profile is None:
+            return None
+        if isinstance(profile, str):
+            if profile not in BLOCK_PROFILES:
+                raise ValueError(f"Unknown blocking profile: {profile}")
+            profile = BLOCK_PROFILES[profile]
+        blocker = cls(profile.get("resource_types", ()), profile.get("url_patterns", ()))
+        return blocker if blocker.resource_types or blocker.url_patterns else None
+
+    def reset(self):
+        self.allowed = 0
+        self.blocked = {}
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        return resource_type in self.resource_types or any(p in url for p in self.url_patterns)
+
+    def blocks(self, request) -> bool:
+        """ Decides (and counts) whether a routed request is aborted. """
+        resource_type = request.resource_type
+        if self.should_block(resource_type, request.url):
+            self.blocked[resource_type] = self.blocked.get(resource_type, 0) + 1
+            return True
+        self.allowed += 1
+        return False
+
+    @property
+    def estimated_bytes_saved(self) -> int:
+        return sum(ESTIMATED_BYTES.get(t, DEFAULT_ESTIMATED_BYTES) * n for t, n in self.blocked.items())
+
+    def report(self) -> dict:
+        return {
+            "blocked": sum(self.blocked.values()),
+            "allowed": self.allowed,
+            "by_type": dict(self.blocked),
+            "estimated_mb_saved": round(self.estimated_bytes_saved / 1024 / 1024, 1),
+        }
+
+
+def persistent_context_options(headless: bool, window_size: str) -> dict:
+    """ Keyword arguments for launch_persistent_context, shared by the sync and async engines. """
+    width, height = map(int, window_size.split(','))
+    return dict(
+        headless=headless,
+        viewport={"width": width, "height": height},
+        user_agent=random.choice(USER_AGENTS),
+        bypass_csp=True,
+        ignore_https_errors=True,
+        java_script_enabled=True,
+        args=[
+            '--disable-blink-features=AutomationControlled',
+            '--no-sandbox',
+            '--disable-infobars',
+            '--disable-notifications',
+            '--disable-dev-shm-usage',
+            '--disable-gpu' if headless else '',
+            '--disable-web-security',
+            '--disable-site-isolation-trials',
+            '--no-experiments',
+            '--allow-running-insecure-content',
+            '--disable-features=IsolateOrigins,site-per-process',
+            '--disable-setuid-sandbox'
+        ],
+        slow_mo=100 if not headless else 0  # Slight delay for realism in non-headless
+    )
+
 
 class BrowserEngine:
-    def __init__(self, headless: bool = False, window_size: str = "1280,900", user_data_dir: str | None = None):
+    def __init__(self, headless: bool = False, window_size: str = "1280,900", user_data_dir: str | None = None,
+                 block_resources="default", network_cache: NetworkCache = None):
         # Dedicated directory for Playwright profile to avoid conflicts
         self.user_data_dir = user_data_dir or os.path.join(os.getcwd(), "chrome_profile")
         os.makedirs(self.user_data_dir, exist_ok=True)
@@ -12,58 +137,45 @@ class BrowserEngine:
         self.playwright = None
         self.context = None
         self.page = None
+        # Aborts images, fonts, stylesheets and telemetry; see BLOCK_PROFILES (None = load everything)
+        self.blocker = ResourceBlocker.from_profile(block_resources)
+        # Records responses to disk or serves them from it (None = live network only)
+        self.network_cache = network_cache
 
     def create_driver(self):
         self.playwright = sync_playwright().start()
-        user_agents = [
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36"
-        ]
-        ua = random.choice(user_agents)
-        width, height = map(int, self.window_size.split(','))
         self.context = self.playwright.chromium.launch_persistent_context(
             self.user_data_dir,
-            headless=self.headless,
-            viewport={"width": width, "height": height},
-            user_agent=ua,
-            bypass_csp=True,
-            ignore_https_errors=True,
-            java_script_enabled=True,
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--no-sandbox',
-                '--disable-infobars',
-                '--disable-notifications',
-                '--disable-dev-shm-usage',
-                '--disable-gpu' if self.headless else '',
-                '--disable-web-security',
-                '--disable-site-isolation-trials',
-                '--no-experiments',
-                '--allow-running-insecure-content',
-                '--disable-features=IsolateOrigins,site-per-process',
-                '--disable-setuid-sandbox'
-            ],
-            slow_mo=100 if not self.headless else 0  # Slight delay for realism in non-headless
+            **persistent_context_options(self.headless, self.window_size)
         )
-        self.page = self.context.new_page()
+        if self.blocker is not None or self.network_cache is not None:
+            self.context.route("**/*", self.handle_route)
+        self.page = self.new_page()
 
+        return self.page
 
-        # Additional enhanced stealth scripts (layered on top of stealth plugin)
-        self.page.add_init_script("""
-        Object.defineProperty(navigator, 'hardwareConcurrency', {get: () => 8});
-        Object.defineProperty(navigator, 'deviceMemory', {get: () => 8});
-        Object.defineProperty(navigator, 'maxTouchPoints', {get: () => 0});
-        window.chrome = { runtime: {} };
-        const originalQuery = window.navigator.permissions.query;
-        window.navigator.permissions.query = (parameters) => (
-          parameters.name === 'notifications' ?
-            Promise.resolve({ state: Notification.permission }) :
-            originalQuery(parameters)
-        );
-        """)
+    def handle_route(self, route):
+        """
+        The one context.route handler: blocked requests are aborted before the network cache
+        sees them, so recordings never contain (and replays never need) images or telemetry.
+        """
+        if self.blocker is not None and self.blocker.blocks(route.request):
+            route.abort()
+        elif self.network_cache is not None:
+            self.network_cache.handle(route)
+        else:
+            route.continue_()
 
-        return self.page
+    def new_page(self):
+        """
+        Open another tab in the persistent context with the same stealth patches
+        as the main page. Used by the worker pool in XScraper.search.
+        """
+        page = self.context.new_page()
+
+        page.add_init_script(STEALTH_SCRIPT)
+
+        return page
 
     def get_driver(self):
         if self.page is None:
@@ -78,4 +190,7 @@ class BrowserEngine:
         if self.context:
             self.context.close()
         if self.playwright:
-            self.playwright.stop()
\ No newline at end of file
+            self.playwright.stop()
+        self.context = None
+        self.playwright = None
+        self.page = None
\ No newline at end of file
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from core.decoding import dumps, loads
+from core.models import MODELS
+from core.utils import ScraperUtils
+
+
+class Checkpoint:
+    """
+    On-disk progress of one search run, so a crashed or killed run resumes where it stopped
+    instead of scrolling the feed and visiting its posts again from zero.
+
+    Files under `directory` (one set per run, named after platform, target and max_posts):
+        <name>.json          snapshot of the feed collection: feed url, collected post hrefs,
+                             scroll round and position, whether collection finished
+        <name>.journal       one line per visited ("done") or failed post href, appended
+        <name>.posts.jsonl   the completed posts, one per line
+
+    The snapshot is rewritten (fsynced, then atomically replaced) once per scroll round; a post
+    only appends a line to the journal and, if kept, to the posts file. A post counts as done
+    once the consumer of the generator took it, so a kill in between scrapes it again rather
+    than losing it. A run that reaches its end removes its checkpoint.
+
+        checkpoint = Checkpoint.for_run('x', "#Python", max_posts=200)
+        for post in scraper.iter_search("#Python", max_posts=200, checkpoint=checkpoint):
+            sink.write(post)
+    """
+    def __init__(self, path: str, platform: str = None):
+        """ :param platform: 'x' or 'instagram'; resumed posts come back as its model (dicts if None) """
+        self.path = Path(path)
+        self.posts_path = self.path.with_suffix(".posts.jsonl")
+        self.journal_path = self.path.with_suffix(".journal")
+        self.model = MODELS.get(platform)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.url = None
+        self.hrefs = []
+        self.scroll_rounds = 0
+        self.scroll_y = 0
+        self.collection_done = False
+        self.done = set()
+        self.failed = {}
+        self.resumed = self._load()
+
+    @classmethod
+    def for_run(cls, platform: str, target: str, max_posts: int, directory: str = "data/checkpoints"):
+        """ The checkpoint of a run; the same platform, target and max_posts resume it. """
+        digest = hashlib.sha1(f"{platform}|{target}|{max_posts}".encode("utf-8")).hexdigest()[:16]
+        return cls(os.path.join(directory, f"{platform}_{digest}.json"), platform=platform)
+
+    def _load(self) -> bool:
+        resumed = False
+        if self.path.exists():
+            try:
+                state = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                ScraperUtils.log_error(f"Ignoring unreadable checkpoint {self.path}: {e}")
+                state = None
+            if state is not None:
+                self.url = state.get("url")
+                self.hrefs = state.get("hrefs", [])
+                self.scroll_rounds = state.get("scroll_rounds", 0)
+                self.scroll_y = state.get("scroll_y", 0)
+                self.collection_done = state.get("collection_done", False)
+                # Snapshots written before the journal carried the visited posts themselves
+                self.done = set(state.get("done", []))
+                self.failed = dict(state.get("failed", {}))
+                resumed = True
+        resumed = self._replay_journal() or resumed
+        if resumed:
+            ScraperUtils.log_info(f"Resuming checkpoint {self.path.name}: {len(self.hrefs)} posts collected, "
+                                  f"{len(self.done)} done, scroll round {self.scroll_rounds}")
+        return resumed
+
+    def _replay_journal(self) -> bool:
+        if not self.journal_path.exists():
+            return False
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                try:
+                    entry = loads(line)
+                except Exception:
+                    # A line cut short by a crash
+                    continue
+                href = entry.get("href")
+                if entry.get("status") == "done":
+                    self.done.add(href)
+                    self.failed.pop(href, None)
+                else:
+                    self.failed[href] = entry.get("error")
+        return True
+
+    def save(self):
+        """ Rewrites the collection snapshot; visited posts live in the journal. """
+        state = {
+            "url": self.url,
+            "hrefs": self.hrefs,
+            "scroll_rounds": self.scroll_rounds,
+            "scroll_y": self.scroll_y,
+            "collection_done": self.collection_done,
+        }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(state))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _append(path: Path, line: bytes):
+        with open(path, "ab") as f:
+            f.write(line)
+            f.write(b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def collected(self, url: str, hrefs: list, scroll_rounds: int, scroll_y: int = 0, finished: bool = False):
+        """ Records the feed collection after a scroll round; finished=True once it has stopped. """
+        self.url = url
+        self.hrefs = list(hrefs)
+        self.scroll_rounds = scroll_rounds
+        self.scroll_y = scroll_y or 0
+        self.collection_done = finished
+        self.save()
+
+    def pending(self, hrefs) -> list:
+        """ The hrefs not visited yet; failed ones are tried again. """
+        return [href for href in hrefs if href not in self.done]
+
+    def post_done(self, href: str, post=None):
+        """ Marks href visited; post (if kept) is appended to the posts file first. """
+        if post is not None:
+            self._append(self.posts_path, dumps(post, default=ScraperUtils.json_default))
+        self._append(self.journal_path, dumps({"href": href, "status": "done"}))
+        self.done.add(href)
+        self.failed.pop(href, None)
+
+    def post_failed(self, href: str, error: str = None):
+        error = str(error or "no data")[:300]
+        self._append(self.journal_path, dumps({"href": href, "status": "failed", "error": error}))
+        self.failed[href] = error
+
+    def posts(self) -> list:
+        """ Posts completed by earlier attempts of this run, as platform models. """
+        if not self.posts_path.exists():
+            return []
+        posts = []
+        with open(self.posts_path, "rb") as f:
+            for line in f:
+                try:
+                    post = loads(line)
+                except Exception:
+                    # A line cut short by a crash
+                    continue
+                posts.append(self.model.from_dict(post) if self.model is not None else post)
+        return posts
+
+    def finish(self):
+        """ Removes the checkpoint of a completed run. """
+        for path in (self.path, self.journal_path, self.posts_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        if self.failed:
+            ScraperUtils.log_info(f"Run finished with {len(self.failed)} failed posts: {list(self.failed)}")
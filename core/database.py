@@ -1,4 +1,163 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from pymongo import UpdateOne, ASCENDING
+from pymongo.errors import BulkWriteError
+from configDB.db import get_database
+from core.utils import ScraperUtils
+from core.models import Record
+from core.seen_index import SeenIndex
 
 
+class MongoSink:
+    """
+    Batched MongoDB writer for scraped posts, usable anywhere a JsonlSink is.
 
+    Posts are upserted into `posts` on a stable `key`: the X status id or Instagram shortcode
+    of the post URL, or the URL itself when it has neither. A post stored without an id (DOM
+    fallback) and scraped again with one therefore updates the same document. Comments go to
+    `comments`, one document per comment, keyed on that post key + comment identity.
 
+    Writes are buffered and sent as unordered bulk_write calls once `batch_size` operations are
+    queued, and by a background thread once the oldest pending write is `flush_interval`
+    seconds old, so a sink that stops receiving posts still flushes. A duplicate-key error on
+    an upsert means another writer inserted the same key between our match and our insert;
+    those operations are retried (they then match that document and update it). Any other
+    error, or a conflict that outlives RETRIES, is logged.
+
+        sink = MongoSink(platform="x")
+        scraper.run_to_sink(sink, search_text="#Python", max_posts=100)
+    """
+    RETRIES = 3
+
+    def __init__(self, platform: str, db=None, batch_size: int = 200, flush_interval: float = 5.0,
+                 posts_collection: str = "posts", comments_collection: str = "comments"):
+        self.platform = platform
+        self.db = db if db is not None else get_database()
+        self.posts = self.db[posts_collection]
+        self.comments = self.db[comments_collection]
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.count = 0
+        self._post_ops = []
+        self._comment_ops = []
+        self._pending_since = None
+        self._lock = threading.RLock()
+        self._closed = threading.Event()
+        self.ensure_indexes()
+        self._flusher = None
+        if flush_interval and flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_periodically, name=f"mongo-sink-{platform}", daemon=True)
+            self._flusher.start()
+
+    def ensure_indexes(self):
+        self._backfill_keys()
+        self.posts.create_index([("platform", ASCENDING), ("key", ASCENDING)], unique=True, name="uniq_post_key")
+        self.posts.create_index([("platform", ASCENDING), ("url", ASCENDING)], unique=True, name="uniq_post_url")
+        self.posts.create_index([("platform", ASCENDING), ("id", ASCENDING)], unique=True, name="uniq_post_id",
+                                partialFilterExpression={"id": {"$type": "string"}})
+        self.comments.create_index([("key", ASCENDING)], unique=True, name="uniq_comment_key")
+        self.comments.create_index([("post_key", ASCENDING)], name="comment_post")
+
+    def _backfill_keys(self):
+        """ Gives posts stored before `key` existed their key, so upserts keep matching them. """
+        ops = [UpdateOne({"_id": doc["_id"]}, {"$set": {"key": self.post_key(doc)}})
+               for doc in self.posts.find({"platform": self.platform, "key": {"$exists": False}}, {"url": 1, "id": 1})]
+        if ops:
+            self._bulk(self.posts, ops)
+            ScraperUtils.log_info(f"Backfilled the key of {len(ops)} {self.platform} posts")
+
+    @staticmethod
+    def post_key(post: dict) -> str:
+        url = post.get("url")
+        return SeenIndex.post_id(url) or str(url or post.get("id"))
+
+    @staticmethod
+    def comment_key(post_key: str, comment: dict) -> str:
+        identity = comment.get("id")
+        if not identity:
+            # X comments carry user/text/timestamp, Instagram ones username/message/time
+            raw = "||".join(str(comment.get(k) or "") for k in ("user", "username", "text", "message", "timestamp", "time"))
+            identity = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        return f"{post_key}:{identity}"
+
+    def write(self, post: dict):
+        if isinstance(post, Record):
+            post = post.to_dict()
+        now = datetime.now(timezone.utc)
+        key = self.post_key(post)
+        comments = post.get("comments") or []
+
+        doc = {k: v for k, v in post.items() if k != "comments"}
+        doc["platform"] = self.platform
+        doc["comment_count"] = len(comments)
+        doc["last_scraped"] = now
+        doc["key"] = key
+        post_op = UpdateOne({"platform": self.platform, "key": key},
+                            {"$set": doc, "$setOnInsert": {"first_scraped": now}}, upsert=True)
+
+        comment_ops = []
+        for comment in comments:
+            ckey = self.comment_key(key, comment)
+            cdoc = dict(comment, key=ckey, post_key=key, platform=self.platform, last_scraped=now)
+            comment_ops.append(UpdateOne({"key": ckey}, {"$set": cdoc}, upsert=True))
+
+        with self._lock:
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+            self._post_ops.append(post_op)
+            self._comment_ops.extend(comment_ops)
+            self.count += 1
+            if len(self._post_ops) + len(self._comment_ops) >= self.batch_size:
+                self.flush()
+
+    def _bulk(self, collection, ops):
+        for _ in range(self.RETRIES + 1):
+            if not ops:
+                return
+            try:
+                collection.bulk_write(ops, ordered=False)
+                return
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                failed = [err for err in errors if err.get("code") != 11000]
+                if failed:
+                    ScraperUtils.log_error(f"{len(failed)} {collection.name} writes failed: {failed[0].get('errmsg')}")
+                # Concurrent upserts of the same key: the retry matches the other writer's document
+                ops = [ops[err["index"]] for err in errors if err.get("code") == 11000]
+        if ops:
+            ScraperUtils.log_error(f"{len(ops)} {collection.name} writes still hit duplicate keys after "
+                                   f"{self.RETRIES} retries: {ops[0]!r}")
+
+    def flush(self):
+        with self._lock:
+            post_ops, comment_ops = self._post_ops, self._comment_ops
+            self._post_ops = []
+            self._comment_ops = []
+            self._pending_since = None
+            # Posts first, so a reader never finds comments of a post that is not stored yet
+            self._bulk(self.posts, post_ops)
+            self._bulk(self.comments, comment_ops)
+
+    def _flush_periodically(self):
+        while not self._closed.wait(min(self.flush_interval, 1.0)):
+            pending_since = self._pending_since
+            if pending_since is None or time.monotonic() - pending_since < self.flush_interval:
+                continue
+            try:
+                self.flush()
+            except Exception as e:
+                ScraperUtils.log_error(f"Timed flush of the {self.platform} MongoSink failed: {e}")
+
+    def close(self):
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,105 @@
+import json
+import msgspec
+
+# Optional fast decoder; msgspec (which core.models needs anyway) and the stdlib json are the fallbacks
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonDecoder:
+    """
+    Decodes JSON straight from the bytes Playwright returns, without the intermediate str.
+
+    Picks the first installed backend of BACKENDS (orjson, msgspec, json) unless one is named.
+    All backends return plain dicts/lists, so parsers do not care which one is used.
+    """
+    BACKENDS = ("orjson", "msgspec", "json")
+
+    def __init__(self, backend: str = None):
+        available = self.available()
+        if backend is None:
+            backend = available[0]
+        elif backend not in available:
+            raise ValueError(f"JSON backend '{backend}' is not installed (available: {', '.join(available)})")
+        self.backend = backend
+        if backend == "orjson":
+            self._loads = orjson.loads
+        elif backend == "msgspec":
+            self._loads = msgspec.json.Decoder().decode
+        else:
+            self._loads = json.loads
+
+    @staticmethod
+    def available() -> list:
+        installed = {"orjson": orjson is not None, "msgspec": True, "json": True}
+        return [name for name in JsonDecoder.BACKENDS if installed[name]]
+
+    def loads(self, data):
+        if isinstance(data, str) and self.backend == "msgspec":
+            data = data.encode("utf-8")
+        return self._loads(data)
+
+
+_decoder = JsonDecoder()
+
+
+def get_decoder() -> JsonDecoder:
+    return _decoder
+
+
+def set_decoder(backend: str = None) -> JsonDecoder:
+    """ Switches the process-wide decoder, e.g. set_decoder("json") to compare against the stdlib. """
+    global _decoder
+    _decoder = JsonDecoder(backend)
+    return _decoder
+
+
+def loads(data):
+    return _decoder.loads(data)
+
+
+_encoders = {}
+
+
+def dumps(obj, default=None) -> bytes:
+    """
+    Compact UTF-8 JSON. msgspec encodes the core.models Structs natively, without building a
+    dict copy first; `default` handles anything else it does not know.
+    """
+    encoder = _encoders.get(default)
+    if encoder is None:
+        encoder = _encoders[default] = msgspec.json.Encoder(enc_hook=default)
+    return encoder.encode(obj)
+
+
+class LazyJson:
+    """
+    A captured response body that is decoded the first time a parser asks for it.
+
+    Listeners store the raw bytes; bodies that are never parsed (e.g. after a comment budget
+    is reached) are never decoded. A body that is not valid JSON decodes to None.
+    """
+    __slots__ = ("raw", "_value", "_decoded")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self._value = None
+        self._decoded = False
+
+    @property
+    def value(self):
+        if not self._decoded:
+            try:
+                self._value = loads(self.raw)
+            except Exception:
+                self._value = None
+            self._decoded = True
+            self.raw = None
+        return self._value
+
+    @staticmethod
+    def resolve(data):
+        """ The decoded value of a LazyJson, anything else unchanged. """
+        return data.value if isinstance(data, LazyJson) else data
@@ -0,0 +1,136 @@
+import re
+from datetime import datetime, timezone
+from core.decoding import LazyJson
+from core.models import ISO_FORMAT, InstaComment, InstaPost, intern
+
+
+class InstaGraphQLParser:
+    """
+    Maps Instagram GraphQL payloads onto the records InstagramScraper builds from the DOM:
+    InstaPost (url, likes, timestamp, author, caption, mentions, hashtags, media, comments) and
+    InstaComment (username, time, message, likes, replies).
+
+    Handles the feed connection, the post page query (shortcode web_info) and the comment
+    connection pages the post page loads while its comment list is scrolled. Sponsored feed
+    edges are skipped.
+    """
+    FEED_KEY = 'xdt_api__v1__feed__timeline__connection'
+    MEDIA_KEY = 'xdt_api__v1__media__shortcode__web_info'
+    COMMENTS_KEY = 'xdt_api__v1__media__media_id__comments__connection'
+    KEYS = (FEED_KEY, MEDIA_KEY, COMMENTS_KEY)
+    POST_URL = "https://www.instagram.com/p/{code}/"
+    _EMPTY = {}
+
+    @staticmethod
+    def _timestamp(taken_at):
+        # Same format as the <time datetime="..."> attribute the DOM path reads
+        if not taken_at:
+            return None
+        return datetime.fromtimestamp(taken_at, timezone.utc).strftime(ISO_FORMAT)
+
+    @staticmethod
+    def _media_url(item: dict):
+        videos = item.get('video_versions')
+        if videos:
+            return videos[0].get('url')
+        candidates = (item.get('image_versions2') or InstaGraphQLParser._EMPTY).get('candidates')
+        return candidates[0].get('url') if candidates else None
+
+    @staticmethod
+    def media_urls(media: dict) -> list:
+        """ One URL per slide (the video when there is one, else the largest image). """
+        urls = []
+        for item in media.get('carousel_media') or [media]:
+            url = InstaGraphQLParser._media_url(item)
+            if url and url not in urls:
+                urls.append(url)
+        return urls
+
+    @staticmethod
+    def comment(node: dict) -> InstaComment:
+        username = (node.get('user') or InstaGraphQLParser._EMPTY).get('username')
+        return InstaComment(
+            intern(f"@{username}") if username else None,
+            InstaGraphQLParser._timestamp(node.get('created_at')),
+            node.get('text'),
+            node.get('comment_like_count') or 0,
+            node.get('child_comment_count') or 0,
+        )
+
+    @staticmethod
+    def post(media: dict) -> InstaPost:
+        caption = (media.get('caption') or InstaGraphQLParser._EMPTY).get('text')
+        pk = media.get('pk')
+        return InstaPost(
+            url=InstaGraphQLParser.POST_URL.format(code=media.get('code')),
+            id=str(pk) if pk is not None else None,
+            likes=media.get('like_count') or 0,
+            timestamp=InstaGraphQLParser._timestamp(media.get('taken_at')),
+            author=intern((media.get('user') or InstaGraphQLParser._EMPTY).get('username')),
+            caption=caption,
+            mentions=re.findall(r'@\w+', caption) if caption else [],
+            hashtags=re.findall(r'#\w+', caption) if caption else [],
+            media=InstaGraphQLParser.media_urls(media),
+            comments=[InstaGraphQLParser.comment(c) for c in media.get('comments') or []],
+        )
+
+    @staticmethod
+    def parse(data) -> dict:
+        """
+        Returns {"posts", "comments", "cursor"}: the posts of a feed page or post page, the
+        comments of a comment page, and the feed's end_cursor when there is a next page.
+        """
+        parsed = {"posts": [], "comments": [], "cursor": None}
+        data = LazyJson.resolve(data)
+        if not isinstance(data, dict):
+            return parsed
+        empty = InstaGraphQLParser._EMPTY
+        payload = data.get('data') or empty
+        if not isinstance(payload, dict):
+            return parsed
+
+        feed = payload.get(InstaGraphQLParser.FEED_KEY)
+        if feed:
+            for edge in feed.get('edges') or ():
+                node = edge.get('node') or empty
+                if node.get('ad'):
+                    continue
+                media = node.get('media') or (node.get('explore_story') or empty).get('media')
+                if media and media.get('code'):
+                    parsed["posts"].append(InstaGraphQLParser.post(media))
+            page_info = feed.get('page_info') or empty
+            if page_info.get('has_next_page'):
+                parsed["cursor"] = page_info.get('end_cursor')
+
+        web_info = payload.get(InstaGraphQLParser.MEDIA_KEY)
+        if web_info:
+            for media in web_info.get('items') or ():
+                if media and media.get('code'):
+                    parsed["posts"].append(InstaGraphQLParser.post(media))
+
+        comments = payload.get(InstaGraphQLParser.COMMENTS_KEY)
+        if comments:
+            for edge in comments.get('edges') or ():
+                node = edge.get('node')
+                if node:
+                    parsed["comments"].append(InstaGraphQLParser.comment(node))
+        return parsed
+
+    @staticmethod
+    def find_payloads(obj, found=None) -> list:
+        """
+        Payloads ({"data": {key: value}}) of the KEYS found anywhere inside obj. A post page
+        opened with goto ships its first query results inside <script type="application/json">
+        bundles instead of fetching them, at an arbitrary depth.
+        """
+        found = [] if found is None else found
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                if key in InstaGraphQLParser.KEYS and isinstance(value, dict):
+                    found.append({"data": {key: value}})
+                else:
+                    InstaGraphQLParser.find_payloads(value, found)
+        elif isinstance(obj, list):
+            for value in obj:
+                InstaGraphQLParser.find_payloads(value, found)
+        return found
@@ -3,6 +3,57 @@ import time
 import random
 from datetime import datetime
 import re
+from core.waits import WaitUtils
+
+# parse_instagram_comment run in the page over every container of a comment block: the same
+# XPaths, evaluated in the browser, so a post's comments come back in one round trip.
+# tests/test_insta_comments_js.py checks it against the per-element parser in Chromium.
+COMMENTS_JS = r"""
+([block, containerSelectors]) => {
+    const first = (node, xpath) => document.evaluate(
+        xpath, node, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    const all = (node, xpath) => {
+        const result = document.evaluate(xpath, node, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        return Array.from({length: result.snapshotLength}, (_, i) => result.snapshotItem(i));
+    };
+    const text = el => el ? el.textContent.trim() : null;
+
+    let containers = [];
+    for (const selector of containerSelectors) {
+        containers = all(block, selector);
+        if (containers.length) break;
+    }
+    const records = [];
+    for (const c of containers) {
+        const timeEl = first(c, ".//time[@title] | .//span[@title]");
+        // The datetime attribute is ISO like GraphQL timestamps; title is only a display date
+        const time = timeEl ? (timeEl.getAttribute("datetime") || timeEl.getAttribute("title")) : null;
+        if (time === null) continue;
+
+        const link = first(c, ".//a[@role='link' and @tabindex='0']");
+        const href = link ? link.getAttribute("href") : null;
+        const message = first(c, ".//time/ancestor::div[1]/following-sibling::*[self::span or self::div][1]")
+            || first(c, ".//time/ancestor::div[2]/descendant::span[normalize-space()][last()]");
+        const like = first(c, ".//*[contains(translate(normalize-space(.), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'like')]");
+        const likesMatch = like ? /(\d+)/.exec(like.textContent.trim().replace(/\u00a0/g, " ")) : null;
+        const reply = first(c, ".//div[@role='button' and @tabindex='0' and contains(., 'View all')]");
+        const repliesMatch = reply ? /View all (\d+) replies/.exec(reply.textContent.trim()) : null;
+        const media = first(c, ".//img[contains(@src, '/media/')]");
+
+        const record = {
+            username: href ? "@" + href.replace(/^\/+|\/+$/g, "").split("/")[0] : null,
+            time: time,
+            message: text(message),
+            likes: likesMatch ? parseInt(likesMatch[1], 10) : 0,
+            replies: repliesMatch ? parseInt(repliesMatch[1], 10) : 0,
+        };
+        const src = media ? media.getAttribute("src") : null;
+        if (src) record.media = src;
+        records.push(record);
+    }
+    return records;
+}
+"""
 
 class InstaUtils:
     @staticmethod
@@ -35,6 +86,11 @@ class InstaUtils:
             target = f"https://www.instagram.com/explore/search/keyword/?q={text}"
             return target
 
+    @staticmethod
+    def is_graphql(response):
+        url = response.url
+        return response.status == 200 and ('/graphql/query' in url or '/api/graphql' in url)
+
     @staticmethod
     def random_delay(min_sec, max_sec):
         delay = random.uniform(min_sec, max_sec)
@@ -42,9 +98,11 @@ class InstaUtils:
 
     @staticmethod
     def scroll_page(page, pause, max_scrolls):
+        # pause is an upper bound: each scroll returns as soon as the page grows
         for i in range(max_scrolls):
+            height = page.evaluate("document.body.scrollHeight")
             page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(pause)
+            WaitUtils.wait_for_height_increase(page, height, timeout=int(pause * 1000))
         print("INFO: scroll_page finished")
 
     @staticmethod
@@ -67,7 +125,8 @@ class InstaUtils:
 
         # --- Time ---
         time_el = container.query_selector("xpath=.//time[@title] | .//span[@title]")
-        comment_time = time_el.get_attribute("title") if time_el else None
+        # The datetime attribute is ISO like GraphQL timestamps; title is only a display date
+        comment_time = (time_el.get_attribute("datetime") or time_el.get_attribute("title")) if time_el else None
 
         if comment_time is None:
             return None
@@ -123,6 +182,15 @@ class InstaUtils:
         return parsed
 
 
+    @staticmethod
+    def parse_instagram_comments(page, block, container_selectors):
+        """
+        parse_instagram_comment for every comment container under `block` (an ElementHandle),
+        in a single page.evaluate. container_selectors are XPaths relative to the block; the
+        first one with matches is used.
+        """
+        return page.evaluate(COMMENTS_JS, [block, list(container_selectors)])
+
     @staticmethod
     def scroll_until_end(page, locator, pause=3, max_tries=3):
         locator.wait_for(state="visible", timeout=2000)
@@ -153,7 +221,7 @@ class InstaUtils:
                 try:
                     load_more.first.scroll_into_view_if_needed()
                     load_more.first.click()
-                    page.wait_for_timeout(3000)
+                    WaitUtils.wait_for_dom_mutation(page, locator, timeout=3000)
                     tries = 0
                     continue
                 except Exception as e:
@@ -163,9 +231,9 @@ class InstaUtils:
             current_height = locator.evaluate("el => el.scrollTop + el.clientHeight")
             total_height = locator.evaluate("el => el.scrollHeight")
 
-            # Scroll to bottom
+            # Scroll to bottom; pause is an upper bound, the wait ends once new comments render
             locator.evaluate("el => el.scrollTo(0, el.scrollHeight)")
-            page.wait_for_timeout(pause * 1000)
+            WaitUtils.wait_for_height_increase(page, total_height, locator=locator, timeout=int(pause * 1000))
 
             # Update progress bar
             progress_bar.total = total_height  # update total if new content loaded
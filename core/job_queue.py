@@ -0,0 +1,204 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class Job:
+    """ A recurring scrape: what to run, how often, and its retry state. """
+    id: int
+    platform: str
+    mode: str
+    query: str
+    max_posts: int
+    interval: float
+    priority: int
+    next_run: float
+    attempts: int = 0
+    last_status: str = None
+    last_error: str = None
+
+
+class JobQueue:
+    """
+    Persistent queue of recurring scrape jobs, backed by SQLite.
+
+    A job is unique per (platform, mode, query). Due jobs are claimed highest priority first,
+    oldest due first; a claim is a lease, so a worker that dies mid-run only holds its job
+    until the lease expires. Success schedules the next run `interval` seconds later; failure
+    retries with exponential backoff (plus jitter) up to max_retries, after which the job
+    waits for its next regular run. Safe to share between worker threads.
+
+        queue = JobQueue()
+        queue.add('x', '#Python', interval=3600, priority=5)
+        queue.add('instagram', '@nasa', interval=6 * 3600)
+    """
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            platform     TEXT NOT NULL,
+            mode         TEXT NOT NULL DEFAULT 'search',
+            query        TEXT NOT NULL,
+            max_posts    INTEGER NOT NULL DEFAULT 10,
+            interval     REAL NOT NULL,
+            priority     INTEGER NOT NULL DEFAULT 0,
+            enabled      INTEGER NOT NULL DEFAULT 1,
+            next_run     REAL NOT NULL,
+            lease_until  REAL NOT NULL DEFAULT 0,
+            attempts     INTEGER NOT NULL DEFAULT 0,
+            runs         INTEGER NOT NULL DEFAULT 0,
+            last_run     REAL,
+            last_status  TEXT,
+            last_error   TEXT,
+            last_posts   INTEGER,
+            UNIQUE (platform, mode, query)
+        )
+    """
+    _COLUMNS = "id, platform, mode, query, max_posts, interval, priority, next_run, attempts, last_status, last_error"
+
+    def __init__(self, path: str = "data/jobs.sqlite3", max_retries: int = 3, backoff: float = 60.0,
+                 max_backoff: float = 3600.0, lease: float = 3600.0):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.lease = lease
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(self._SCHEMA)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_due ON jobs (platform, enabled, next_run)")
+        self.conn.commit()
+
+    def add(self, platform: str, query: str, interval: float, priority: int = 0, mode: str = 'search',
+            max_posts: int = 10, start_at: float = None) -> int:
+        """ Adds a job, or updates interval/priority/max_posts of an existing one. Returns its id. """
+        platform = platform.lower()
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT INTO jobs (platform, mode, query, max_posts, interval, priority, next_run)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (platform, mode, query) DO UPDATE SET
+                    max_posts = excluded.max_posts,
+                    interval = excluded.interval,
+                    priority = excluded.priority,
+                    enabled = 1
+                """,
+                (platform, mode, query, max_posts, interval, priority, start_at or time.time()),
+            )
+            self.conn.commit()
+            return self.conn.execute(
+                "SELECT id FROM jobs WHERE platform = ? AND mode = ? AND query = ?", (platform, mode, query)
+            ).fetchone()[0]
+
+    def set_enabled(self, job_id: int, enabled: bool):
+        with self._lock:
+            self.conn.execute("UPDATE jobs SET enabled = ? WHERE id = ?", (int(enabled), job_id))
+            self.conn.commit()
+
+    def remove(self, job_id: int):
+        with self._lock:
+            self.conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            self.conn.commit()
+
+    def claim(self, platform: str, now: float = None) -> Job | None:
+        """ Leases the most urgent due job of the platform; None when nothing is due. """
+        now = now or time.time()
+        with self._lock:
+            row = self.conn.execute(
+                f"""
+                SELECT {self._COLUMNS} FROM jobs
+                WHERE platform = ? AND enabled = 1 AND next_run <= ? AND lease_until <= ?
+                ORDER BY priority DESC, next_run ASC
+                LIMIT 1
+                """,
+                (platform.lower(), now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE jobs SET lease_until = ? WHERE id = ?", (now + self.lease, row[0]))
+            self.conn.commit()
+        return Job(*row)
+
+    def complete(self, job: Job, posts: int = 0):
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                """
+                UPDATE jobs SET next_run = ?, lease_until = 0, attempts = 0, runs = runs + 1,
+                    last_run = ?, last_status = 'ok', last_error = NULL, last_posts = ?
+                WHERE id = ?
+                """,
+                (now + job.interval, now, posts, job.id),
+            )
+            self.conn.commit()
+
+    def retry_delay(self, attempts: int) -> float:
+        delay = min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+        return delay * random.uniform(0.8, 1.2)
+
+    def fail(self, job: Job, error: str) -> float:
+        """ Records a failed run and schedules the retry. Returns the delay until the next attempt. """
+        now = time.time()
+        attempts = job.attempts + 1
+        if attempts > self.max_retries:
+            # Give up on this round; the job comes back at its regular interval
+            attempts, delay = 0, job.interval
+        else:
+            delay = self.retry_delay(attempts)
+        with self._lock:
+            self.conn.execute(
+                """
+                UPDATE jobs SET next_run = ?, lease_until = 0, attempts = ?, runs = runs + 1,
+                    last_run = ?, last_status = 'failed', last_error = ?
+                WHERE id = ?
+                """,
+                (now + delay, attempts, now, str(error)[:500], job.id),
+            )
+            self.conn.commit()
+        return delay
+
+    def next_due(self, platform: str) -> float | None:
+        """ Time of the platform's next due job (may be in the past), None if it has no jobs. """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT MIN(MAX(next_run, lease_until)) FROM jobs WHERE platform = ? AND enabled = 1",
+                (platform.lower(),),
+            ).fetchone()
+        return row[0]
+
+    def jobs(self, platform: str = None) -> list:
+        query = f"SELECT {self._COLUMNS} FROM jobs"
+        params = ()
+        if platform:
+            query += " WHERE platform = ?"
+            params = (platform.lower(),)
+        with self._lock:
+            return [Job(*row) for row in self.conn.execute(query + " ORDER BY priority DESC, next_run ASC", params)]
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                """
+                SELECT COUNT(*),
+                       SUM(enabled = 1 AND next_run <= ? AND lease_until <= ?),
+                       SUM(lease_until > ?),
+                       SUM(last_status = 'failed')
+                FROM jobs
+                """,
+                (now, now, now),
+            ).fetchone()
+        return {"jobs": row[0], "due": row[1] or 0, "running": row[2] or 0, "failing": row[3] or 0}
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from core.utils import ScraperUtils
+
+
+class StageStats:
+    """ Call count, total and max duration of one stage, plus recent samples for percentiles. """
+    __slots__ = ("calls", "total", "max", "samples")
+    MAX_SAMPLES = 1000
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def add(self, seconds: float):
+        self.calls += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) >= self.MAX_SAMPLES:
+            # Keep a moving window; the totals above stay exact
+            self.samples[self.calls % self.MAX_SAMPLES] = seconds
+        else:
+            self.samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RunMetrics:
+    """
+    Where the time of a scrape run goes: timed spans per stage plus counters.
+
+    Stages used by the scrapers: navigation (goto), fetch (direct GraphQL calls), wait (event
+    waits for feeds/posts), scroll (feed and comment scrolling/pagination), interception
+    (reading response bodies), parse (GraphQL/DOM to post), persist (seen index and sink
+    writes), delay (pacing sleeps).
+    Counters: posts, comments, responses_intercepted, bytes_intercepted, responses_parsed.
+    Nested spans are each counted in full, so stage shares can add up to more than 100%.
+
+        with scraper.metrics.span("navigation"):
+            page.goto(url)
+        scraper.metrics.log_summary()
+        scraper.metrics.export("x_metrics.prom")    # or .json
+    """
+    STAGES = ("navigation", "fetch", "wait", "scroll", "interception", "parse", "persist", "delay")
+
+    def __init__(self, platform: str = None):
+        self.platform = platform
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self._start = time.perf_counter()
+            self.stages = {}
+            self.counters = {}
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+            stats.add(seconds)
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def add(self, counter: str, value: int = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def count_post(self, post):
+        """ Counts a finished post and its comments. """
+        if post:
+            self.add("posts")
+            self.add("comments", len(post.get("comments") or ()))
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self._start
+        with self._lock:
+            counters = dict(self.counters)
+            stages = {
+                name: {
+                    "calls": s.calls,
+                    "total_s": round(s.total, 3),
+                    "mean_ms": round(s.total / s.calls * 1000, 1) if s.calls else 0.0,
+                    "p50_ms": round(s.percentile(0.5) * 1000, 1),
+                    "p95_ms": round(s.percentile(0.95) * 1000, 1),
+                    "max_ms": round(s.max * 1000, 1),
+                    "share": round(s.total / elapsed, 3) if elapsed else 0.0,
+                }
+                for name, s in self.stages.items()
+            }
+        rate = lambda n: round(n / elapsed, 3) if elapsed else 0.0
+        return {
+            "platform": self.platform,
+            "started": self.started,
+            "elapsed_s": round(elapsed, 3),
+            "stages": stages,
+            "counters": counters,
+            "posts_per_sec": rate(counters.get("posts", 0)),
+            "comments_per_sec": rate(counters.get("comments", 0)),
+            "mb_intercepted": round(counters.get("bytes_intercepted", 0) / 1024 / 1024, 2),
+        }
+
+    def log_summary(self):
+        summary = self.summary()
+        ScraperUtils.log_info(
+            f"Run metrics ({summary['platform']}): {summary['elapsed_s']:.1f}s, "
+            f"{summary['counters'].get('posts', 0)} posts ({summary['posts_per_sec']:.2f}/s), "
+            f"{summary['counters'].get('comments', 0)} comments ({summary['comments_per_sec']:.2f}/s), "
+            f"{summary['mb_intercepted']} MB intercepted"
+        )
+        ordered = sorted(summary["stages"].items(), key=lambda item: item[1]["total_s"], reverse=True)
+        for name, s in ordered:
+            ScraperUtils.log_info(
+                f"  {name:<13} {s['total_s']:>8.2f}s {s['share']:>6.1%}  calls {s['calls']:<5} "
+                f"mean {s['mean_ms']:.0f}ms  p95 {s['p95_ms']:.0f}ms  max {s['max_ms']:.0f}ms"
+            )
+        return summary
+
+    def to_prometheus(self, prefix: str = "scraper") -> str:
+        """
+        Prometheus text exposition format, e.g. for node_exporter's textfile collector.
+
+        Every series describes the last run only (they start from zero with each run), so all of
+        them are gauges; use max_over_time/sum_over_time across runs rather than rate().
+        """
+        summary = self.summary()
+        platform = summary["platform"] or "unknown"
+        lines = [
+            f"# HELP {prefix}_last_run_stage_seconds Time spent per stage in the last run",
+            f"# TYPE {prefix}_last_run_stage_seconds gauge",
+        ]
+        lines += [f'{prefix}_last_run_stage_seconds{{platform="{platform}",stage="{name}"}} {s["total_s"]}'
+                  for name, s in summary["stages"].items()]
+        lines += [f"# HELP {prefix}_last_run_stage_calls Spans per stage in the last run",
+                  f"# TYPE {prefix}_last_run_stage_calls gauge"]
+        lines += [f'{prefix}_last_run_stage_calls{{platform="{platform}",stage="{name}"}} {s["calls"]}'
+                  for name, s in summary["stages"].items()]
+        lines += [f"# HELP {prefix}_stage_p95_seconds 95th percentile span duration per stage",
+                  f"# TYPE {prefix}_stage_p95_seconds gauge"]
+        lines += [f'{prefix}_stage_p95_seconds{{platform="{platform}",stage="{name}"}} {s["p95_ms"] / 1000}'
+                  for name, s in summary["stages"].items()]
+        for name, value in sorted(summary["counters"].items()):
+            lines += [f"# HELP {prefix}_last_run_{name} {name.replace('_', ' ').capitalize()} in the last run",
+                      f"# TYPE {prefix}_last_run_{name} gauge",
+                      f'{prefix}_last_run_{name}{{platform="{platform}"}} {value}']
+        gauges = (("run_seconds", "elapsed_s"), ("posts_per_second", "posts_per_sec"),
+                  ("comments_per_second", "comments_per_sec"))
+        for metric, key in gauges:
+            lines += [f"# TYPE {prefix}_{metric} gauge", f'{prefix}_{metric}{{platform="{platform}"}} {summary[key]}']
+        lines += [f"# TYPE {prefix}_run_started_timestamp_seconds gauge",
+                  f'{prefix}_run_started_timestamp_seconds{{platform="{platform}"}} {summary["started"]:.0f}']
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str) -> Path:
+        """
+        Writes the metrics under data/ (same placement as ScraperUtils.save_json): Prometheus
+        text for a .prom path, JSON otherwise. The file is replaced atomically, so a collector
+        never reads half a file.
+        """
+        path = Path(path)
+        target = Path("data") / path.name if path.parent == Path(".") else Path("data") / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.suffix == ".prom":
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.summary(), indent=2)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_text(content, encoding="utf-8")
+        os.replace(tmp, target)
+        return target
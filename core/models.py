@@ -0,0 +1,301 @@
+import re
+import sys
+from datetime import datetime, timezone
+import msgspec
+
+_COUNT = re.compile(r'^([0-9][0-9,]*(?:\.[0-9]+)?)\s*([KMB]?)$', re.IGNORECASE)
+_SCALE = {'': 1, 'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000}
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+# Display dates of <time title="..."> elements, for records saved before the datetime attribute was read
+_DISPLAY_FORMATS = ("%b %d, %Y", "%B %d, %Y")
+
+
+def to_int(value) -> int:
+    """ Count as int from GraphQL (int or numeric str) or the DOM ("1,234", "1.2K", "3M"); 0 when unknown. """
+    if value.__class__ is int:
+        return value
+    if value is None or value == '':
+        return 0
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    match = _COUNT.match(str(value).strip())
+    if not match:
+        return 0
+    number, suffix = match.groups()
+    return int(float(number.replace(',', '')) * _SCALE[suffix.upper()])
+
+
+def to_iso_time(value) -> str | None:
+    """
+    UTC time as "2025-12-31T15:00:09.000Z", the format of GraphQL timestamps and <time datetime>,
+    from an epoch, an ISO string or a display date ("Dec 31, 2025", read as midnight UTC).
+    Unrecognised strings are returned unchanged.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc).strftime(ISO_FORMAT)
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        for fmt in _DISPLAY_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return value
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc)
+    return parsed.strftime(ISO_FORMAT)
+
+
+def intern(value):
+    """ Interns handles/profile URLs, so repeated commenters share one string. """
+    return sys.intern(value) if value.__class__ is str else value
+
+
+def comment_key(comment_id, user, text):
+    """
+    Identity of a comment for de-duplication: its id, or (user, first 200 characters of text)
+    when it has none. The tuple itself is the key, so two different comments never collide.
+    """
+    return comment_id or (user, (text or "")[:200])
+
+
+class Record(msgspec.Struct):
+    """
+    Base of the models: msgspec Structs, so core.decoding.dumps encodes them natively (no dict
+    copy) and they take a fraction of the memory of the dicts they replace.
+
+    Dict-style access (post["likes"], post.get("comments"), "img" in comment) behaves like the
+    earlier dict records: every field is a key, including fields set to None.
+    """
+    def __getitem__(self, key):
+        if key in self.__struct_fields__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__struct_fields__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__struct_fields__
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__struct_fields__ else default
+
+    def keys(self):
+        return self.__struct_fields__
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.__struct_fields__]
+
+    def to_dict(self) -> dict:
+        """ Plain dict copy (recursively), for encoders and drivers without Struct support. """
+        return msgspec.to_builtins(self)
+
+
+class Author(Record, gc=False):
+    name: str = None
+    screen_name: str = None
+    rest_id: str = None
+    avatar_url: str = None
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        d = d or {}
+        return cls(d.get("name"), intern(d.get("screen_name")), d.get("rest_id"), d.get("avatar_url"))
+
+
+class Metrics(Record, gc=False):
+    favorite_count: int = 0
+    reply_count: int = 0
+    retweet_count: int = 0
+    quote_count: int = 0
+    views_count: int = 0
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        d = d or {}
+        return cls(to_int(d.get("favorite_count")), to_int(d.get("reply_count")), to_int(d.get("retweet_count")),
+                   to_int(d.get("quote_count")), to_int(d.get("views_count")))
+
+
+class Media(Record, gc=False):
+    media_key: str = None
+    type: str = None
+    media_url: str = None
+    thumbnail: str = None
+    variants: list = []
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        return cls(d.get("media_key"), d.get("type"), d.get("media_url"), d.get("thumbnail"), d.get("variants") or [])
+
+
+class Tweet(Record, gc=False):
+    """ Structured tweet as returned by the TweetDetail parser (main, quoted or reposted post). """
+    id: str = None
+    created_at: str = None
+    text: str = None
+    author: Author = msgspec.field(default_factory=Author)
+    metrics: Metrics = msgspec.field(default_factory=Metrics)
+    entities: dict = {}
+    media: list = []
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        d = d or {}
+        return cls(d.get("id"), d.get("created_at"), d.get("text"), Author.from_dict(d.get("author")),
+                   Metrics.from_dict(d.get("metrics")), d.get("entities") or {},
+                   [Media.from_dict(m) for m in d.get("media") or []])
+
+
+class Repost(Record, gc=False):
+    url: str = None
+    post: Tweet = None
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        return cls(d.get("url"), Tweet.from_dict(d.get("post"))) if d else None
+
+
+class Comment(Record, gc=False):
+    user: str = None
+    text: str = None
+    timestamp: str = None
+    likes: int = 0
+    reposts: int = 0
+    views: int = 0
+    img: str = None
+    video: str = None
+    repost: Repost = None
+    id: str = None
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        return cls(intern(d.get("user")), d.get("text"), d.get("timestamp"), to_int(d.get("likes")),
+                   to_int(d.get("reposts")), to_int(d.get("views")), d.get("img"), d.get("video"),
+                   Repost.from_dict(d.get("repost")), d.get("id"))
+
+
+class Post(Record, gc=False):
+    """ A scraped X post with its comments; field names match the earlier flat dict records. """
+    url: str = None
+    likes: int = 0
+    retweets: int = 0
+    replies: int = 0
+    timestamp: str = None
+    author: str = None
+    text: str = None
+    mentions: list = []
+    hashtags: list = []
+    media: list = []
+    comments: list = []
+    id: str = None
+    quote_count: int = 0
+    views: int = 0
+    entities: dict = None
+    repost: Repost = None
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        return cls(
+            d.get("url"), to_int(d.get("likes")), to_int(d.get("retweets")), to_int(d.get("replies")),
+            d.get("timestamp"), intern(d.get("author")), d.get("text"), d.get("mentions") or [],
+            d.get("hashtags") or [], [Media.from_dict(m) for m in d.get("media") or []],
+            [Comment.from_dict(c) for c in d.get("comments") or []], d.get("id"),
+            to_int(d.get("quote_count")), to_int(d.get("views")), d.get("entities"),
+            Repost.from_dict(d.get("repost")),
+        )
+
+
+class InstaComment(Record, gc=False):
+    """ An Instagram comment, from GraphQL or the DOM (InstaUtils.parse_instagram_comment shape). """
+    username: str = None
+    time: str = None
+    message: str = None
+    likes: int = 0
+    replies: int = 0
+    media: str = None
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        return cls(intern(d.get("username")), to_iso_time(d.get("time")), d.get("message"), to_int(d.get("likes")),
+                   to_int(d.get("replies")), d.get("media"))
+
+
+class InstaPost(Record, gc=False):
+    """ A scraped Instagram post with its comments; same fields from GraphQL and from the DOM. """
+    url: str = None
+    likes: int = 0
+    timestamp: str = None
+    author: str = None
+    caption: str = None
+    mentions: list = []
+    hashtags: list = []
+    media: list = []
+    comments: list = []
+    id: str = None
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        return cls(
+            d.get("url"), to_int(d.get("likes")), to_iso_time(d.get("timestamp")), intern(d.get("author")), d.get("caption"),
+            d.get("mentions") or [], d.get("hashtags") or [], d.get("media") or [],
+            [InstaComment.from_dict(c) for c in d.get("comments") or []],
+            str(d["id"]) if d.get("id") is not None else None,
+        )
+
+
+MODELS = {'x': Post, 'instagram': InstaPost}
+
+
+class CommentIndex:
+    """
+    The comments of one post in arrival order, with one identity lookup shared by every batch
+    (page load, cursor pages, scrolling). A comment is identified by comment_key: its tweet id,
+    or user + the first 200 characters of text when it has none, so adding is O(1).
+    `keys` holds those identities; TweetDetailParser.parse adds to it directly.
+    """
+    __slots__ = ("comments", "keys")
+
+    def __init__(self, comments=()):
+        self.comments = []
+        self.keys = set()
+        self.extend(comments)
+
+    @staticmethod
+    def key(comment):
+        return comment_key(comment.get("id"), comment.get("user"), comment.get("text"))
+
+    def add(self, comment) -> bool:
+        """ Adds the comment unless it is already indexed; True if it was added. """
+        key = self.key(comment)
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        self.comments.append(comment)
+        return True
+
+    def extend(self, comments) -> int:
+        """ Adds each comment not yet indexed; returns how many were added. """
+        before = len(self.comments)
+        for comment in comments:
+            self.add(comment)
+        return len(self.comments) - before
+
+    def __contains__(self, comment) -> bool:
+        return self.key(comment) in self.keys
+
+    def __len__(self) -> int:
+        return len(self.comments)
+
+    def __iter__(self):
+        return iter(self.comments)
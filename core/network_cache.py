@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qsl, urlencode
+from core.utils import ScraperUtils
+
+# Query/form fields that change on every request (Instagram/Facebook session tokens and counters);
+# left out of the match key so a recording still matches in a later session
+VOLATILE_PARAMS = frozenset({
+    '__a', '__ccg', '__comet_req', '__csr', '__d', '__dyn', '__hblp', '__hs', '__hsdp', '__hsi',
+    '__req', '__rev', '__s', '__sjsp', '__spin_b', '__spin_r', '__spin_t', '__user', 'av', 'dpr',
+    'fb_dtsg', 'jazoest', 'lsd',
+})
+# Bodies are stored decoded, so the transfer headers of the original response no longer apply
+DROPPED_HEADERS = frozenset({'content-encoding', 'content-length', 'transfer-encoding', 'connection'})
+
+
+class NetworkCache:
+    """
+    Record-and-replay store for browser traffic, plugged into BrowserEngine's context.route.
+
+    mode="record": requests go to the network and every response is saved.
+    mode="replay": responses are served from disk; requests without a recording are aborted
+    (on_miss="abort") or sent to the network (on_miss="network").
+
+    Layout under `path`:
+        entries.jsonl        one HAR-style entry per response (request, status, headers, body hash)
+        blobs/ab/<sha256>    response bodies, content-addressed, so a script or image fetched
+                             on every page is stored once
+
+    Requests match on method, URL and POST body, ignoring the VOLATILE_PARAMS fields. A request
+    recorded several times (e.g. cursor-less feed pages) is replayed in recording order, then
+    the last recording repeats.
+
+        cache = NetworkCache("data/network_cache/x_python", mode="record")
+        XScraper(network_cache=cache).search("#Python")    # once, online
+        cache = NetworkCache("data/network_cache/x_python", mode="replay")
+        XScraper(network_cache=cache).search("#Python")    # offline, at disk speed
+    """
+    MODES = ("record", "replay")
+    MISS_POLICIES = ("abort", "network")
+
+    def __init__(self, path: str = "data/network_cache", mode: str = "replay", on_miss: str = "abort",
+                 ignore_params=VOLATILE_PARAMS):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown network cache mode: {mode}")
+        if on_miss not in self.MISS_POLICIES:
+            raise ValueError(f"Unknown miss policy: {on_miss}")
+        self.path = Path(path)
+        self.blob_dir = self.path / "blobs"
+        self.entries_path = self.path / "entries.jsonl"
+        self.mode = mode
+        self.on_miss = on_miss
+        self.ignore_params = frozenset(ignore_params or ())
+        self._entries = {}
+        self._served = {}
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self._load()
+        self.reset()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self.bytes_served = 0
+
+    def _load(self):
+        if not self.entries_path.exists():
+            return
+        with open(self.entries_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash while recording
+                    continue
+                self._entries.setdefault(entry["_key"], []).append(entry)
+        ScraperUtils.log_info(f"Network cache: {sum(map(len, self._entries.values()))} recorded responses in {self.path}")
+
+    def _filtered(self, pairs) -> str:
+        return urlencode(sorted((k, v) for k, v in pairs if k not in self.ignore_params))
+
+    def key(self, method: str, url: str, post_data=None) -> str:
+        parts = urlsplit(url)
+        digest = hashlib.sha256()
+        digest.update(f"{method.upper()} {parts.scheme}://{parts.netloc}{parts.path}?".encode("utf-8"))
+        digest.update(self._filtered(parse_qsl(parts.query, keep_blank_values=True)).encode("utf-8"))
+        if post_data:
+            body = post_data if isinstance(post_data, bytes) else post_data.encode("utf-8")
+            text = body.decode("utf-8", errors="replace")
+            if "=" in text and not text.lstrip().startswith(("{", "[")):
+                # Form-encoded: drop the per-request tokens like in the query string
+                body = self._filtered(parse_qsl(text, keep_blank_values=True)).encode("utf-8")
+            digest.update(b"\n")
+            digest.update(body)
+        return digest.hexdigest()
+
+    def _blob_path(self, sha: str) -> Path:
+        return self.blob_dir / sha[:2] / sha
+
+    def store(self, method: str, url: str, post_data, status: int, headers: dict, body: bytes):
+        """ Saves one response. Used by the route handler and by callers that bypass routing (context.request). """
+        body = body or b""
+        sha = hashlib.sha256(body).hexdigest()
+        blob = self._blob_path(sha)
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_suffix(".tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, blob)
+
+        headers = headers or {}
+        entry = {
+            "_key": self.key(method, url, post_data),
+            "startedDateTime": datetime.now(timezone.utc).isoformat(),
+            "request": {"method": method.upper(), "url": url, "bodySize": len(post_data or b"")},
+            "response": {
+                "status": status,
+                "headers": [{"name": k, "value": v} for k, v in headers.items()],
+                "content": {"size": len(body), "mimeType": headers.get("content-type", ""), "_sha256": sha},
+            },
+        }
+        with open(self.entries_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._entries.setdefault(entry["_key"], []).append(entry)
+        self.recorded += 1
+
+    def lookup(self, method: str, url: str, post_data=None) -> dict | None:
+        """ {"status", "headers", "body"} of the next recording of this request, None if there is none. """
+        key = self.key(method, url, post_data)
+        entries = self._entries.get(key)
+        if not entries:
+            self.misses += 1
+            return None
+        served = self._served.get(key, 0)
+        self._served[key] = served + 1
+        response = entries[min(served, len(entries) - 1)]["response"]
+        try:
+            body = self._blob_path(response["content"]["_sha256"]).read_bytes()
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.bytes_served += len(body)
+        headers = {h["name"]: h["value"] for h in response["headers"] if h["name"].lower() not in DROPPED_HEADERS}
+        return {"status": response["status"], "headers": headers, "body": body}
+
+    def handle(self, route):
+        request = route.request
+        if self.mode == "record":
+            try:
+                response = route.fetch()
+                body = response.body()
+            except Exception:
+                route.abort()
+                return
+            self.store(request.method, request.url, request.post_data_buffer, response.status, response.headers, body)
+            route.fulfill(response=response, body=body)
+            return
+
+        hit = self.lookup(request.method, request.url, request.post_data_buffer)
+        if hit is not None:
+            route.fulfill(status=hit["status"], headers=hit["headers"], body=hit["body"])
+        elif self.on_miss == "network":
+            route.continue_()
+        else:
+            route.abort()
+
+    async def handle_async(self, route):
+        """ handle() for an async_api context.route. """
+        request = route.request
+        if self.mode == "record":
+            try:
+                response = await route.fetch()
+                body = await response.body()
+            except Exception:
+                await route.abort()
+                return
+            self.store(request.method, request.url, request.post_data_buffer, response.status, response.headers, body)
+            await route.fulfill(response=response, body=body)
+            return
+
+        hit = self.lookup(request.method, request.url, request.post_data_buffer)
+        if hit is not None:
+            await route.fulfill(status=hit["status"], headers=hit["headers"], body=hit["body"])
+        elif self.on_miss == "network":
+            await route.continue_()
+        else:
+            await route.abort()
+
+    def report(self) -> dict:
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+            "mb_served": round(self.bytes_served / 1024 / 1024, 1),
+        }
@@ -0,0 +1,307 @@
+import glob
+import json
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from core.utils import ScraperUtils
+from core.tweet_parser import TweetDetailParser
+from core.insta_parser import InstaGraphQLParser
+from core.models import CommentIndex
+from core.decoding import LazyJson
+
+X_SAMPLE_FILES = ("data/x_scraped_results.json", "data/x_single_scraped_results.json")
+INSTAGRAM_SAMPLE_FILES = ("data/instagram_results.json",)
+CAPTURE_GLOB = "debug_graphql/*.json"
+
+
+# --- X: TweetDetail bodies rebuilt from saved results ---
+# data/ keeps the scraped X posts but not their responses, so each post is turned back into
+# the TweetDetail pages it came from: the focal tweet first, comments split into cursor pages.
+
+def _handle(url):
+    return (url or "").rstrip("/").rsplit("/", 1)[-1] or "unknown"
+
+
+def _count(value):
+    try:
+        return int(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _media_entities(media):
+    items = []
+    for m in media or []:
+        item = {"media_key": m.get("media_key"), "id_str": (m.get("media_key") or "").split("_")[-1],
+                "type": m.get("type"), "media_url_https": m.get("media_url"),
+                "sizes": {"large": {"h": 1280, "w": 720, "resize": "fit"}}, "original_info": {"height": 1280, "width": 720}}
+        if m.get("type") in ("video", "animated_gif"):
+            item["video_info"] = {"aspect_ratio": [9, 16], "duration_millis": 30000,
+                                  "variants": [dict(v, bitrate=i * 100000) for i, v in enumerate(m.get("variants", []))]}
+        items.append(item)
+    return items
+
+
+def build_user(handle, rest_id):
+    return {"result": {
+        "__typename": "User", "id": f"VXNlcjo{rest_id}", "rest_id": str(rest_id),
+        "avatar": {"image_url": f"https://pbs.twimg.com/profile_images/{rest_id}/a_normal.jpg"},
+        "core": {"created_at": "Tue Mar 10 12:00:00 +0000 2015", "name": handle.title(), "screen_name": handle},
+        "legacy": {"description": "", "followers_count": 1000, "friends_count": 100, "statuses_count": 5000,
+                   "entities": {"description": {"urls": []}}, "pinned_tweet_ids_str": []},
+        "is_blue_verified": False, "verification": {"verified": False},
+    }}
+
+
+def build_tweet(tweet_id, handle, text, created_at=None, likes=0, retweets=0, replies=0, quotes=0,
+                views=None, media=None, entities=None, quoted=None):
+    legacy = {
+        "id_str": str(tweet_id), "full_text": text, "created_at": created_at,
+        "favorite_count": likes, "retweet_count": retweets, "reply_count": replies, "quote_count": quotes,
+        "bookmark_count": 0, "conversation_id_str": str(tweet_id), "lang": "en",
+        "entities": entities or {"hashtags": [], "urls": [], "user_mentions": [], "symbols": []},
+        "display_text_range": [0, len(text or "")], "user_id_str": str(abs(hash(handle)) % 10 ** 9),
+    }
+    media_items = _media_entities(media)
+    if media_items:
+        legacy["extended_entities"] = {"media": media_items}
+    result = {
+        "__typename": "Tweet", "rest_id": str(tweet_id),
+        "core": {"user_results": build_user(handle, abs(hash(handle)) % 10 ** 9)},
+        "edit_control": {"edit_tweet_ids": [str(tweet_id)], "editable_until_msecs": "0", "is_edit_eligible": False},
+        "is_translatable": False, "views": {"count": str(views or 0), "state": "EnabledWithCount"},
+        "source": "<a href=\"https://mobile.twitter.com\">Twitter Web App</a>", "legacy": legacy,
+    }
+    if quoted is not None:
+        result["quoted_status_result"] = {"result": quoted}
+        legacy["quoted_status_permalink"] = {"expanded": f"https://twitter.com/{quoted['core']['user_results']['result']['core']['screen_name']}/status/{quoted['rest_id']}"}
+    return result
+
+
+def _main_tweet(post):
+    quoted = None
+    repost = post.get("repost")
+    if repost and repost.get("post"):
+        q = repost["post"]
+        metrics = q.get("metrics") or {}
+        quoted = build_tweet(q.get("id"), (q.get("author") or {}).get("screen_name") or "quoted", q.get("text"),
+                             q.get("created_at"), metrics.get("favorite_count") or 0, metrics.get("retweet_count") or 0,
+                             metrics.get("reply_count") or 0, metrics.get("quote_count") or 0,
+                             metrics.get("views_count"), q.get("media"), q.get("entities"))
+    return build_tweet(post.get("id") or "1", _handle(post.get("author")), post.get("text"), post.get("timestamp"),
+                       _count(post.get("likes")), _count(post.get("retweets")), _count(post.get("replies")),
+                       _count(post.get("quote_count")), post.get("views"), post.get("media"), post.get("entities"), quoted)
+
+
+def _comment_tweet(post_id, index, comment):
+    media = []
+    if comment.get("img"):
+        media.append({"media_key": f"3_{index}", "type": "photo", "media_url": comment["img"]})
+    if comment.get("video"):
+        media.append({"media_key": f"13_{index}", "type": "video", "media_url": comment["video"],
+                      "variants": [{"content_type": "video/mp4", "url": comment["video"]}]})
+    quoted = None
+    if comment.get("original_user"):
+        quoted = build_tweet(f"{post_id}9{index}", _handle(comment["original_user"]), comment.get("original_text") or "")
+    return build_tweet(f"{post_id}{index:05d}", _handle(comment.get("user")), comment.get("text"), comment.get("timestamp"),
+                       _count(comment.get("likes")), _count(comment.get("reposts")), 0, 0, comment.get("views"),
+                       media, None, quoted)
+
+
+def build_payloads(post, page_size=40):
+    """ TweetDetail bodies for one saved post: the focal tweet on the first page, comments over all pages. """
+    post_id = post.get("id") or "1"
+    comments = post.get("comments") or []
+    pages = [comments[i:i + page_size] for i in range(0, len(comments), page_size)] or [[]]
+    bodies = []
+    for number, chunk in enumerate(pages):
+        entries = []
+        if number == 0:
+            entries.append({"entryId": f"tweet-{post_id}", "sortIndex": "1",
+                            "content": {"entryType": "TimelineTimelineItem", "__typename": "TimelineTimelineItem",
+                                        "itemContent": {"itemType": "TimelineTweet", "__typename": "TimelineTweet",
+                                                        "tweet_results": {"result": _main_tweet(post)},
+                                                        "tweetDisplayType": "Tweet"}}})
+        for i, comment in enumerate(chunk):
+            index = number * page_size + i
+            tweet = _comment_tweet(post_id, index, comment)
+            entries.append({"entryId": f"conversationthread-{tweet['rest_id']}", "sortIndex": str(index),
+                            "content": {"entryType": "TimelineTimelineModule", "__typename": "TimelineTimelineModule",
+                                        "items": [{"entryId": f"conversationthread-{tweet['rest_id']}-tweet-{tweet['rest_id']}",
+                                                   "item": {"itemContent": {"itemType": "TimelineTweet",
+                                                                            "__typename": "TimelineTweet",
+                                                                            "tweet_results": {"result": tweet},
+                                                                            "tweetDisplayType": "Tweet"}}}],
+                                        "displayType": "VerticalConversation"}})
+        if number < len(pages) - 1:
+            entries.append({"entryId": f"cursor-bottom-{number}",
+                            "content": {"entryType": "TimelineTimelineItem", "__typename": "TimelineTimelineItem",
+                                        "itemContent": {"itemType": "TimelineTimelineCursor", "value": f"cursor-{number + 1}",
+                                                        "cursorType": "Bottom"}}})
+        bodies.append({"data": {"threaded_conversation_with_injections_v2": {"instructions": [
+            {"type": "TimelineClearCache"},
+            {"type": "TimelineAddEntries", "entries": entries},
+            {"type": "TimelineTerminateTimeline", "direction": "Top"},
+        ]}}})
+    return bodies
+
+
+def saved_posts(files):
+    """ The posts of the saved result files that exist; a file holds one post or a list of them. """
+    for path in files:
+        if not Path(path).exists():
+            continue
+        with open(path, encoding="utf-8") as f:
+            posts = json.load(f)
+        yield from posts if isinstance(posts, list) else [posts]
+
+
+def load_payloads(files=X_SAMPLE_FILES, page_size=40):
+    return [body for post in saved_posts(files) for body in build_payloads(post, page_size)]
+
+
+def load_threads(files=X_SAMPLE_FILES, page_size=40) -> list:
+    """ One list of encoded TweetDetail bodies per saved post, as the scraper would receive them. """
+    return [[json.dumps(body).encode("utf-8") for body in build_payloads(post, page_size)]
+            for post in saved_posts(files)]
+
+
+# --- Instagram: recorded feed responses, comment pages rebuilt from saved results ---
+# The captures are feed pages, which carry no comments; the saved posts' comments are turned
+# back into the comment connection pages the post view loads.
+
+def load_captures(pattern=CAPTURE_GLOB) -> list:
+    """
+    Encoded response bodies of the saved captures. A capture file is either one raw body or
+    a list of {"timestamp", "status", "request", "response"} records as written while debugging.
+    """
+    bodies = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        records = data if isinstance(data, list) else [{"response": data}]
+        for record in records:
+            if isinstance(record, dict) and isinstance(record.get("response"), dict):
+                bodies.append(json.dumps(record["response"]).encode("utf-8"))
+    return bodies
+
+
+def _epoch(value):
+    """ Saved comment times are either ISO datetimes (GraphQL path) or display dates (DOM path). """
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ", "%b %d, %Y"):
+        try:
+            return int(datetime.strptime(value, fmt).replace(tzinfo=timezone.utc).timestamp())
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def build_comment_pages(post, page_size=40) -> list:
+    """ Comment connection bodies for one saved Instagram post, `page_size` comments per page. """
+    comments = post.get("comments") or []
+    pages = [comments[i:i + page_size] for i in range(0, len(comments), page_size)]
+    bodies = []
+    for number, chunk in enumerate(pages):
+        edges = [{"node": {"pk": str(number * page_size + i), "text": c.get("message"),
+                           "created_at": _epoch(c.get("time")),
+                           "user": {"username": (c.get("username") or "").strip("/@") or None},
+                           "comment_like_count": _count(c.get("likes")),
+                           "child_comment_count": _count(c.get("replies"))}}
+                 for i, c in enumerate(chunk)]
+        has_next = number < len(pages) - 1
+        bodies.append({"data": {InstaGraphQLParser.COMMENTS_KEY: {
+            "edges": edges,
+            "page_info": {"has_next_page": has_next, "end_cursor": f"cursor-{number + 1}" if has_next else None},
+        }}})
+    return bodies
+
+
+def load_comment_pages(files=INSTAGRAM_SAMPLE_FILES, page_size=40) -> list:
+    return [json.dumps(body).encode("utf-8") for post in saved_posts(files) for body in build_comment_pages(post, page_size)]
+
+
+class Replay:
+    """
+    Feeds recorded GraphQL bodies through the parsers, without a browser or network.
+
+    Every run wraps the bodies in a fresh LazyJson, so decoding is measured as it happens
+    for live responses. Each replay method returns (posts, comments) counts.
+
+        replay = Replay.from_disk(copies=10)
+        print(Replay.measure(replay.x_posts))
+    """
+    def __init__(self, x_threads: list = None, instagram_bodies: list = None, instagram_comment_pages: list = None):
+        self.x_threads = x_threads or []
+        self.instagram_bodies = instagram_bodies or []
+        self.instagram_comment_pages = instagram_comment_pages or []
+
+    @classmethod
+    def from_disk(cls, x_files=X_SAMPLE_FILES, captures=CAPTURE_GLOB, instagram_files=INSTAGRAM_SAMPLE_FILES,
+                  page_size=40, copies=1):
+        return cls(load_threads(x_files, page_size) * copies, load_captures(captures) * copies,
+                   load_comment_pages(instagram_files, page_size) * copies)
+
+    def x_posts(self) -> tuple:
+        """ The scraper's path: one TweetDetailParser pass per body, comments merged in one CommentIndex. """
+        posts = comments = 0
+        for bodies in self.x_threads:
+            index = CommentIndex()
+            main = None
+            for body in bodies:
+                parsed = TweetDetailParser.parse(LazyJson(body), with_main=main is None, index=index)
+                if main is None and parsed["post"] and parsed["post"].id:
+                    main = parsed["post"]
+            posts += main is not None
+            comments += len(index)
+        return posts, comments
+
+    def x_legacy(self) -> tuple:
+        """ The ScraperUtils dict parsers: parse_tweet_json on the first body, parse_comments_from_json on all. """
+        posts = comments = 0
+        for bodies in self.x_threads:
+            decoded = [LazyJson(body) for body in bodies]
+            main = ScraperUtils.parse_tweet_json(decoded[0])
+            posts += bool(main and main["post"]["id"])
+            index = CommentIndex()
+            for body in decoded:
+                index.extend(ScraperUtils.parse_comments_from_json(body))
+            comments += len(index)
+        return posts, comments
+
+    def instagram_posts(self) -> tuple:
+        """ InstaGraphQLParser over the captured feed pages (posts) and the rebuilt comment pages. """
+        posts = comments = 0
+        for body in self.instagram_bodies:
+            posts += len(InstaGraphQLParser.parse(LazyJson(body))["posts"])
+        for body in self.instagram_comment_pages:
+            comments += len(InstaGraphQLParser.parse(LazyJson(body))["comments"])
+        return posts, comments
+
+    @staticmethod
+    def measure(run, repeat: int = 5) -> dict:
+        """
+        Best-of-`repeat` throughput of a replay method, plus its peak traced memory from one
+        more run under tracemalloc (kept apart, since tracing slows the parsers down).
+        """
+        best = float("inf")
+        posts = comments = 0
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            posts, comments = run()
+            best = min(best, time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return {
+            "posts": posts,
+            "comments": comments,
+            "seconds": best,
+            "posts_per_sec": posts / best if best else 0.0,
+            "comments_per_sec": comments / best if best else 0.0,
+            "peak_mb": peak / 1024 / 1024,
+        }
@@ -0,0 +1,114 @@
+import os
+import re
+import sqlite3
+import time
+
+
+class SeenIndex:
+    """
+    On-disk index of posts already scraped, so reruns of the same query only visit new posts.
+
+    Backed by SQLite. The ids of the platform are loaded into a dict at open time, so lookups
+    during feed scrolling never hit the disk. With refresh_after (seconds), posts scraped longer
+    ago than that are visited again to refresh their engagement counts.
+    """
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS seen_posts (
+            platform      TEXT NOT NULL,
+            post_id       TEXT NOT NULL,
+            url           TEXT,
+            first_scraped REAL NOT NULL,
+            last_scraped  REAL NOT NULL,
+            scrape_count  INTEGER NOT NULL DEFAULT 1,
+            likes         TEXT,
+            replies       TEXT,
+            comments      INTEGER,
+            PRIMARY KEY (platform, post_id)
+        )
+    """
+
+    def __init__(self, path: str = "data/seen_index.sqlite3", platform: str = "x", refresh_after: float = None):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.platform = platform
+        self.refresh_after = refresh_after
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(self._SCHEMA)
+        self.conn.commit()
+        self._last_scraped = dict(self.conn.execute(
+            "SELECT post_id, last_scraped FROM seen_posts WHERE platform = ?", (platform,)
+        ))
+
+    @staticmethod
+    def post_id(url: str) -> str | None:
+        """ X status id or Instagram shortcode of a post URL. """
+        if not url:
+            return None
+        match = re.search(r'/status/([0-9]+)', url) or re.search(r'/(?:p|reel)/([A-Za-z0-9_-]+)', url)
+        return match.group(1) if match else None
+
+    def __len__(self):
+        return len(self._last_scraped)
+
+    def __contains__(self, url: str):
+        return self.post_id(url) in self._last_scraped
+
+    def should_visit(self, url: str) -> bool:
+        post_id = self.post_id(url)
+        if post_id is None:
+            return True
+        last = self._last_scraped.get(post_id)
+        if last is None:
+            return True
+        return self.refresh_after is not None and time.time() - last >= self.refresh_after
+
+    def mark(self, url: str, post: dict = None):
+        """
+        Records a scraped post with a snapshot of its engagement counts. The scrapers only mark
+        posts that passed the date filter, so a rerun with another range still visits the rest.
+        """
+        post = post or {}
+        post_id = self.post_id(url) or post.get("id")
+        if not post_id:
+            return
+        now = time.time()
+        self.conn.execute(
+            """
+            INSERT INTO seen_posts (platform, post_id, url, first_scraped, last_scraped, likes, replies, comments)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (platform, post_id) DO UPDATE SET
+                url = excluded.url,
+                last_scraped = excluded.last_scraped,
+                scrape_count = scrape_count + 1,
+                likes = excluded.likes,
+                replies = excluded.replies,
+                comments = excluded.comments
+            """,
+            (self.platform, str(post_id), url, now, now,
+             None if post.get("likes") is None else str(post.get("likes")),
+             None if post.get("replies") is None else str(post.get("replies")),
+             len(post.get("comments") or []))
+        )
+        self.conn.commit()
+        self._last_scraped[str(post_id)] = now
+
+    def stats(self) -> dict:
+        row = self.conn.execute(
+            "SELECT COUNT(*), MIN(first_scraped), MAX(last_scraped), SUM(scrape_count) FROM seen_posts WHERE platform = ?",
+            (self.platform,)
+        ).fetchone()
+        return {
+            "platform": self.platform,
+            "posts": row[0],
+            "first_scraped": row[1],
+            "last_scraped": row[2],
+            "total_scrapes": row[3] or 0,
+        }
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,86 @@
+import bisect
+import hashlib
+import os
+import shutil
+from core.utils import ScraperUtils
+
+# Chrome files that tie a profile to the process using it, or only hold caches worth nothing in a copy
+PROFILE_SKIP = (
+    'SingletonLock', 'SingletonSocket', 'SingletonCookie', 'lockfile', 'LOCK',
+    'Cache', 'Code Cache', 'GPUCache', 'GrShaderCache', 'ShaderCache', 'DawnCache', 'CacheStorage',
+    'Crashpad', 'BrowserMetrics*', '*.tmp',
+)
+
+
+class HashRing:
+    """
+    Consistent hashing of queries/URLs onto shards.
+
+    Each shard is placed on the ring `replicas` times; a key belongs to the first shard point
+    after its hash. Adding or removing a shard only moves the keys of that shard, so workers
+    and hosts keep (and their profiles, seen indexes and caches stay warm for) the same queries
+    across runs.
+
+        ring = HashRing(["host-a/0", "host-a/1", "host-b/0"])
+        ring.node_for("#Python")        # -> "host-a/1", on every host and every run
+    """
+    def __init__(self, nodes=(), replicas: int = 100):
+        self.replicas = replicas
+        self._points = []
+        self._owners = []
+        self.nodes = []
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # Stable across processes and hosts, unlike hash()
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+    def add(self, node: str):
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for replica in range(self.replicas):
+            point = self._hash(f"{node}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node: str):
+        if node not in self.nodes:
+            return
+        self.nodes.remove(node)
+        kept = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points = [p for p, _ in kept]
+        self._owners = [o for _, o in kept]
+
+    def node_for(self, key: str) -> str:
+        if not self._points:
+            raise ValueError("HashRing has no nodes")
+        index = bisect.bisect(self._points, self._hash(key)) % len(self._points)
+        return self._owners[index]
+
+    def partition(self, keys) -> dict:
+        """ {node: [keys]} for every node, in input order; nodes without keys get an empty list. """
+        shards = {node: [] for node in self.nodes}
+        for key in keys:
+            shards[self.node_for(key)].append(key)
+        return shards
+
+
+def clone_profile(template: str, dest: str, refresh: bool = False) -> str:
+    """
+    Copies a logged-in Chrome profile directory to dest, leaving out lock files and caches.
+    An existing dest is kept (it holds the worker's own, newer session) unless refresh=True.
+    The template must not be in use by a running browser.
+    """
+    if os.path.isdir(dest) and not refresh:
+        return dest
+    if not os.path.isdir(template):
+        raise FileNotFoundError(f"Profile template not found: {template}")
+    if os.path.isdir(dest):
+        shutil.rmtree(dest)
+    shutil.copytree(template, dest, ignore=shutil.ignore_patterns(*PROFILE_SKIP), symlinks=True)
+    ScraperUtils.log_info(f"Cloned profile {template} -> {dest}")
+    return dest
@@ -0,0 +1,82 @@
+import os
+from pathlib import Path
+from core.utils import ScraperUtils
+from core.decoding import dumps
+
+
+class JsonlSink:
+    """
+    Streams posts to JSON Lines files as they are scraped.
+
+    Each post becomes one compact line. Lines are flushed and fsynced every `batch_size`
+    posts (and on close), so a crash loses at most one batch. Once the current file exceeds
+    `max_bytes`, writing continues in name.1.jsonl, name.2.jsonl, ...
+
+        with JsonlSink("x_results.jsonl") as sink:
+            for post in scraper.iter_search("#Python", max_posts=200):
+                sink.write(post)
+    """
+    def __init__(self, path: str, batch_size: int = 10, max_bytes: int = 100 * 1024 * 1024):
+        base_dir = Path("data")
+        path = Path(path)
+        # Same placement rule as ScraperUtils.save_json
+        self.path = base_dir / path.name if path.parent == Path(".") else base_dir / path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.batch_size = max(1, batch_size)
+        self.max_bytes = max_bytes
+        self.count = 0
+        self.files = []
+        self._pending = 0
+        self._file = None
+        self._open(self.path)
+
+    def _open(self, path: Path):
+        # Binary: lines are written as the encoded UTF-8 bytes, without a str round trip
+        self._file = open(path, "ab")
+        self.files.append(str(path))
+
+    def _next_path(self) -> Path:
+        index = len(self.files)
+        while True:
+            candidate = self.path.with_name(f"{self.path.stem}.{index}{self.path.suffix}")
+            if not candidate.exists():
+                return candidate
+            index += 1
+
+    def write(self, post: dict):
+        self._file.write(dumps(post, default=ScraperUtils.json_default))
+        self._file.write(b"\n")
+        self.count += 1
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+            if self.max_bytes and self._file.tell() >= self.max_bytes:
+                self.rotate()
+
+    def flush(self):
+        if self._file is None or self._pending == 0:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def rotate(self):
+        self.flush()
+        self._file.close()
+        next_path = self._next_path()
+        ScraperUtils.log_info(f"Rotating output to {next_path}")
+        self._open(next_path)
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,420 @@
+import sys
+from core.decoding import LazyJson
+from core.models import Author, Comment, CommentIndex, Media, Metrics, Repost, Tweet, comment_key, intern, to_int
+
+_intern = sys.intern
+
+
+class TweetDetailParser:
+    """
+    Single-pass parser for TweetDetail GraphQL payloads.
+
+    One walk over threaded_conversation_with_injections_v2.instructions yields the main post,
+    its quoted post and the conversation comments together. Field lookups are driven by the
+    tables below, so the outer post, the quoted post and the inner post of a comment all go
+    through the same extraction code. It builds core.models records directly (Tweet, Repost,
+    Comment) with the fields of ScraperUtils.parse_tweet_json / parse_comments_from_json,
+    integer counts and interned handles.
+    """
+    # Sources a field can be read from (see _sources). The tables are compiled into plain
+    # functions at import (_lookups, _subscripts below), so a field costs no loop or call.
+    LEGACY, RESULT, VIEWS, USER, USER_CORE, USER_LEGACY, AVATAR = range(7)
+
+    # field -> lookups tried in order, compiled into an `a.get(x) or b.get(y)` chain
+    POST_FIELDS = (
+        ("id", ((RESULT, 'rest_id'), (LEGACY, 'id_str'))),
+        ("created_at", ((LEGACY, 'created_at'), (RESULT, 'created_at'))),
+    )
+    AUTHOR_FIELDS = (
+        ("name", ((USER_CORE, 'name'), (USER, 'name'), (USER_LEGACY, 'name'))),
+        ("screen_name", ((USER_CORE, 'screen_name'), (USER, 'username'), (USER_LEGACY, 'screen_name'))),
+        ("rest_id", ((USER, 'rest_id'),)),
+        ("avatar_url", ((USER, 'profile_image_url'), (AVATAR, 'image_url'), (USER_LEGACY, 'profile_image_url_https'))),
+    )
+    METRIC_FIELDS = (
+        ("favorite_count", ((LEGACY, 'favorite_count'), (RESULT, 'favorite_count'))),
+        ("reply_count", ((LEGACY, 'reply_count'), (RESULT, 'reply_count'))),
+        ("retweet_count", ((LEGACY, 'retweet_count'), (RESULT, 'retweet_count'))),
+        ("quote_count", ((LEGACY, 'quote_count'), (RESULT, 'quote_count'))),
+        ("views_count", ((VIEWS, 'count'),)),
+    )
+    # Reply field -> (subscript path of the usual payload shape, generic lookup(result, legacy)).
+    # The paths are compiled into _comment_fast; a reply with a path missing or empty goes
+    # through the lookups instead (_comment_fields), which give the same value for the usual shape.
+    COMMENT_FIELDS = (
+        ("legacy", ('legacy',), lambda result, legacy: legacy),
+        ("text", ('legacy', 'full_text'),
+         lambda result, legacy: legacy.get('full_text') or TweetDetailParser._text(legacy, result)),
+        ("handle", ('core', 'user_results', 'result', 'core', 'screen_name'),
+         lambda result, legacy: TweetDetailParser._comment_handle(result, legacy)),
+        ("timestamp", ('legacy', 'created_at'),
+         lambda result, legacy: legacy.get('created_at') or TweetDetailParser._first_present(
+             (legacy, result), ('created_at',), bool)),
+        ("likes", ('legacy', 'favorite_count'), lambda result, legacy: legacy.get('favorite_count')),
+        ("reposts", ('legacy', 'retweet_count'), lambda result, legacy: legacy.get('retweet_count')),
+        ("views", ('views', 'count'), lambda result, legacy: TweetDetailParser._comment_views(result)),
+        ("id", ('rest_id',), lambda result, legacy: result.get('rest_id') or legacy.get('id_str')),
+    )
+    HANDLE_KEYS = ('screen_name', 'username', 'handle', 'user_name', 'user_commenter')
+    ENTITY_KEYS = ('hashtags', 'urls', 'user_mentions')
+    VIDEO_TYPES = ('video', 'animated_gif')
+
+    _EMPTY = {}
+
+    @staticmethod
+    def _unwrap(result, typename, key):
+        if result.get('__typename') == typename:
+            return result.get(key) or TweetDetailParser._EMPTY
+        return result
+
+    @staticmethod
+    def _sources(result, legacy):
+        """ The dicts the field tables refer to, resolved once per tweet. """
+        empty = TweetDetailParser._EMPTY
+        user = ((result.get('core') or empty).get('user_results') or empty).get('result') or empty
+        user = TweetDetailParser._unwrap(user, 'UserWithVisibilityResults', 'user')
+        return (
+            legacy,
+            result,
+            result.get('views') or empty,
+            user,
+            user.get('core') or empty,
+            user.get('legacy') or empty,
+            user.get('avatar') or empty,
+        )
+
+    @staticmethod
+    def _first_present(dicts, keys, done, default=None):
+        value = default
+        for d in dicts:
+            for k in keys:
+                if k in d:
+                    value = d[k]
+                    break
+            if done(value):
+                break
+        return value
+
+    @staticmethod
+    def _nonzero(value):
+        return value != 0
+
+    @staticmethod
+    def _text(legacy, result):
+        text = TweetDetailParser._first_present((legacy, result), ('full_text', 'text'), bool)
+        if not text:
+            note = (((result.get('note_tweet') or TweetDetailParser._EMPTY)
+                     .get('note_tweet_results') or TweetDetailParser._EMPTY)
+                    .get('result') or TweetDetailParser._EMPTY)
+            text = note.get('text') or note.get('full_text')
+        return text
+
+    @staticmethod
+    def _handle(sources):
+        return TweetDetailParser._first_present(
+            (sources[TweetDetailParser.USER_CORE], sources[TweetDetailParser.USER_LEGACY], sources[TweetDetailParser.USER]),
+            TweetDetailParser.HANDLE_KEYS, bool)
+
+    @staticmethod
+    def _media(legacy, result):
+        extended = legacy.get('extended_entities') or result.get('extended_entities')
+        if not extended:
+            return []
+        media_list = []
+        for m in extended.get('media', ()):
+            media_obj = Media(m.get('media_key') or m.get('id_str'), m.get('type'),
+                              m.get('media_url_https') or m.get('media_url'))
+            if media_obj.type in TweetDetailParser.VIDEO_TYPES:
+                video_info = m.get('video_info') or TweetDetailParser._EMPTY
+                media_obj.thumbnail = m.get('media_url_https') or video_info.get('poster')
+                media_obj.variants = [
+                    {"content_type": v.get('content_type'), "url": v.get('url')}
+                    for v in video_info.get('variants', ())
+                ]
+            media_list.append(media_obj)
+        return media_list
+
+    @staticmethod
+    def _post(result, legacy, sources, handle=None):
+        """ The structured post of parse_tweet_json, for the main, quoted or inner post. """
+        post_id, created_at = _post_fields(sources)
+        author = Author(*_author_fields(sources))
+        author.screen_name = intern(handle if handle is not None else author.screen_name)
+        metrics = Metrics(*[to_int(value) for value in _metric_fields(sources)])
+        entities = legacy.get('entities') or result.get('entities') or TweetDetailParser._EMPTY
+        return Tweet(post_id, created_at, TweetDetailParser._text(legacy, result), author, metrics,
+                     {k: entities.get(k, []) for k in TweetDetailParser.ENTITY_KEYS},
+                     TweetDetailParser._media(legacy, result))
+
+    @staticmethod
+    def _permalink(*dicts):
+        for d in dicts:
+            url = (d.get('quoted_status_permalink') or TweetDetailParser._EMPTY).get('expanded')
+            if url:
+                return url
+        return None
+
+    @staticmethod
+    def _x_url(url):
+        if url and 'twitter.com' in url:
+            url = url.replace('twitter.com', 'x.com')
+        return url
+
+    @staticmethod
+    def _main(result):
+        """ Main post and quoted repost of the focal tweet, as in parse_tweet_json. """
+        result = TweetDetailParser._unwrap(result, 'TweetWithVisibilityResults', 'tweet')
+        legacy = result.get('legacy') or TweetDetailParser._EMPTY
+        post = TweetDetailParser._post(result, legacy, TweetDetailParser._sources(result, legacy))
+
+        quoted_status_result = result.get('quoted_status_result')
+        quoted = quoted_status_result.get('result') if quoted_status_result else legacy.get('quoted_status')
+        if not quoted:
+            return post, None
+        quoted = TweetDetailParser._unwrap(quoted, 'TweetWithVisibilityResults', 'tweet')
+        quoted_legacy = quoted.get('legacy') or TweetDetailParser._EMPTY
+        repost_post = TweetDetailParser._post(quoted, quoted_legacy, TweetDetailParser._sources(quoted, quoted_legacy))
+        repost_url = TweetDetailParser._permalink(result, legacy, quoted, quoted_legacy)
+        return post, Repost(TweetDetailParser._x_url(repost_url), repost_post)
+
+    @staticmethod
+    def _first_photo_and_video(media):
+        img = None
+        video = None
+        video_seen = False
+        for m in media:
+            if img is None and m.type == 'photo':
+                img = m.media_url
+            elif not video_seen and m.type in TweetDetailParser.VIDEO_TYPES:
+                video_seen = True
+                if m.variants:
+                    video = max(m.variants, key=lambda v: v.get('bitrate', 0))['url']
+        return img, video
+
+    @staticmethod
+    def _comment_media(legacy, result):
+        """ (img, video) of a reply, as _first_photo_and_video(_media(...)) without building Media records. """
+        extended = legacy.get('extended_entities') or result.get('extended_entities')
+        img = video = None
+        if not extended:
+            return img, video
+        video_seen = False
+        for m in extended.get('media', ()):
+            media_type = m.get('type')
+            if img is None and media_type == 'photo':
+                img = m.get('media_url_https') or m.get('media_url')
+            elif not video_seen and media_type in TweetDetailParser.VIDEO_TYPES:
+                video_seen = True
+                variants = (m.get('video_info') or TweetDetailParser._EMPTY).get('variants')
+                if variants:
+                    # Media records keep no bitrate, so _first_photo_and_video picks the first variant too
+                    video = variants[0].get('url')
+        return img, video
+
+    @staticmethod
+    def _comment_handle(result, legacy):
+        try:
+            user = result['core']['user_results']['result']
+            handle = user['core']['screen_name'] if user['__typename'] != 'UserWithVisibilityResults' else None
+        except (KeyError, TypeError):
+            handle = None
+        return handle or TweetDetailParser._handle(TweetDetailParser._sources(result, legacy))
+
+    @staticmethod
+    def _comment_views(result):
+        views_obj = result.get('views') or result.get('view_count') or TweetDetailParser._EMPTY
+        return views_obj.get('count') or views_obj.get('value') or result.get('view_count') or ''
+
+    @staticmethod
+    def _comment_fields(result):
+        """ (result, *COMMENT_FIELDS values) of a reply, through the generic lookups. """
+        empty = TweetDetailParser._EMPTY
+        if result.get('__typename') == 'TweetWithVisibilityResults':
+            result = result.get('tweet') or empty
+        legacy = result.get('legacy') or empty
+        return (result, *[lookup(result, legacy) for _, _, lookup in TweetDetailParser.COMMENT_FIELDS])
+
+    @staticmethod
+    def _comment(result):
+        """ Comment with the fields of parse_comments_from_json, or None without user/text. """
+        # This runs for every reply, so the usual payload shape is read with the subscripts of
+        # _comment_fast; the generic lookups (same results) only run when a field is missing or empty.
+        try:
+            legacy, text, handle, timestamp, likes, reposts, views, comment_id = _comment_fast(result)
+            views = int(views)
+            usual = text and handle and timestamp and views and comment_id
+        except (KeyError, TypeError, ValueError):
+            usual = False
+        if not usual:
+            (result, legacy, text, handle, timestamp, likes, reposts, views,
+             comment_id) = TweetDetailParser._comment_fields(result)
+            if not (handle and text):
+                return None
+            views = to_int(views)
+
+        # A zero count in legacy falls through to the result keys, then stays 0
+        if likes == 0:
+            if 'favorite_count' in result or 'like_count' in result:
+                likes = result.get('favorite_count', result.get('like_count', 0))
+        elif not likes:
+            likes = TweetDetailParser._first_present((legacy, result), ('favorite_count', 'like_count'),
+                                                     TweetDetailParser._nonzero, 0)
+        if reposts == 0:
+            if 'retweet_count' in result or 'repost_count' in result:
+                reposts = result.get('retweet_count', result.get('repost_count', 0))
+        elif not reposts:
+            reposts = TweetDetailParser._first_present((legacy, result), ('retweet_count', 'repost_count'),
+                                                       TweetDetailParser._nonzero, 0)
+        # GraphQL counts are ints already, so to_int only sees the odd string
+        comment = Comment(_intern("https://x.com/" + handle), text, timestamp,
+                          likes if likes.__class__ is int else to_int(likes),
+                          reposts if reposts.__class__ is int else to_int(reposts),
+                          views, None, None, None, comment_id)
+
+        if 'extended_entities' in legacy or 'extended_entities' in result:
+            comment.img, comment.video = TweetDetailParser._comment_media(legacy, result)
+
+        # Reposted or quoted post inside the comment
+        if 'retweeted_status_result' in result:
+            inner = result['retweeted_status_result'].get('result', TweetDetailParser._EMPTY)
+        elif 'quoted_status_result' in result:
+            inner = result['quoted_status_result'].get('result', TweetDetailParser._EMPTY)
+        elif 'retweeted_status' in legacy or 'quoted_status' in legacy:
+            inner = legacy.get('retweeted_status') or legacy.get('quoted_status')
+        else:
+            return comment
+        if inner:
+            inner_legacy = inner['legacy'] if 'legacy' in inner else inner
+            inner_sources = TweetDetailParser._sources(inner, inner_legacy)
+            inner_handle = TweetDetailParser._handle(inner_sources)
+            repost_post = TweetDetailParser._post(inner, inner_legacy, inner_sources, handle=inner_handle)
+            repost_url = TweetDetailParser._permalink(legacy, inner)
+            if not repost_url and inner_handle and repost_post.id:
+                repost_url = f"https://x.com/{inner_handle}/status/{repost_post.id}"
+            comment.repost = Repost(TweetDetailParser._x_url(repost_url), repost_post)
+            inner_img, inner_video = TweetDetailParser._first_photo_and_video(repost_post.media)
+            if comment.img is None:
+                comment.img = inner_img
+            if comment.video is None:
+                comment.video = inner_video
+        return comment
+
+    @staticmethod
+    def parse(data, with_main: bool = True, index: CommentIndex = None) -> dict:
+        """
+        Parses one TweetDetail payload in a single pass.
+        Returns {"post", "repost", "comments", "cursor"}: the main post and its quoted post
+        (None when absent or with_main is False), the comments not yet in `index` (which they
+        are added to; a fresh one de-duplicates within this payload only), and the Bottom cursor
+        of the next comment page (see ScraperUtils.find_cursor).
+        """
+        parsed = {"post": None, "repost": None, "comments": [], "cursor": None}
+        data = LazyJson.resolve(data)
+        if not isinstance(data, dict):
+            return parsed
+        empty = TweetDetailParser._EMPTY
+        comment_of = TweetDetailParser._comment
+        instructions = (((data.get('data') or empty)
+                         .get('threaded_conversation_with_injections_v2') or empty)
+                        .get('instructions') or ())
+
+        index = CommentIndex() if index is None else index
+        comments = []
+        append = comments.append
+        # CommentIndex.add inlined (comment_key only for replies without id): this runs for every reply
+        keys = index.keys
+        cursor = None
+        main_found = not with_main
+        for instr in instructions:
+            add_entries = instr.get('type') == 'TimelineAddEntries'
+            main_checked = main_found
+            for entry in instr.get('entries', ()):
+                entry_id = entry.get('entryId', '')
+                content = entry.get('content') or empty
+
+                if add_entries and entry_id.startswith('conversationthread-'):
+                    for item in content.get('items', ()):
+                        try:
+                            result = item['item']['itemContent']['tweet_results']['result']
+                        except (KeyError, TypeError):
+                            result = ((((item.get('item') or empty).get('itemContent') or empty)
+                                       .get('tweet_results') or empty).get('result'))
+                        comment = comment_of(result or empty)
+                        if comment is not None:
+                            key = comment.id or comment_key(None, comment.user, comment.text)
+                            if key not in keys:
+                                keys.add(key)
+                                append(comment)
+                    continue
+
+                item_content = content.get('itemContent') or empty
+                if not main_checked and (item_content.get('itemType') == 'TimelineTweet' or entry_id.startswith('tweet-')):
+                    # Only the first candidate of an instruction counts, like parse_tweet_json
+                    main_checked = True
+                    result = (item_content.get('tweet_results') or empty).get('result')
+                    if result:
+                        main_found = True
+                        parsed["post"], parsed["repost"] = TweetDetailParser._main(result)
+
+                if cursor is None:
+                    # Top-level cursor entries carry the cursor on content, item cursors on itemContent
+                    for candidate in (content, item_content):
+                        if candidate.get('cursorType') == 'Bottom' and candidate.get('value'):
+                            cursor = candidate['value']
+                            break
+
+        index.comments.extend(comments)
+        parsed["comments"] = comments
+        parsed["cursor"] = cursor
+        return parsed
+
+    @staticmethod
+    def parse_comments(data, index: CommentIndex = None) -> list:
+        """ Comments only; skips building the main post. """
+        return TweetDetailParser.parse(data, with_main=False, index=index)["comments"]
+
+
+
+def _compile(source: str, name: str):
+    namespace = {}
+    exec(source, namespace)
+    return namespace[name]
+
+
+def _lookups(name: str, table):
+    """
+    Compiles a field table of TweetDetailParser into a function of the _sources tuple that
+    returns the field values in table (= model field) order. Each field is the chain
+    `sources[a].get(x) or sources[b].get(y)`: the first truthy value, else the last one.
+    """
+    used = sorted({source for _, lookups in table for source, _ in lookups})
+    lines = [f"def {name}(sources):"]
+    lines += [f"    _{source} = sources[{source}]" for source in used]
+    values = [" or ".join(f"_{source}.get({key!r})" for source, key in lookups) for _, lookups in table]
+    lines.append(f"    return ({', '.join(values)},)")
+    return _compile("\n".join(lines), name)
+
+
+def _subscripts(name: str, paths):
+    """
+    Compiles a function returning the values at `paths` (key tuples) of its argument as one
+    tuple, read with plain subscripts; it raises KeyError/TypeError when one is missing.
+    A first-level dict read by several paths is looked up once.
+    """
+    heads = [path[0] for path in paths]
+    shared = list(dict.fromkeys(head for head in heads if heads.count(head) > 1))
+    lines = [f"def {name}(result):"]
+    lines += [f"    _{i} = result[{head!r}]" for i, head in enumerate(shared)]
+    values = []
+    for path in paths:
+        value = f"_{shared.index(path[0])}" if path[0] in shared else f"result[{path[0]!r}]"
+        values.append(value + "".join(f"[{key!r}]" for key in path[1:]))
+    lines.append(f"    return ({', '.join(values)},)")
+    return _compile("\n".join(lines), name)
+
+
+_post_fields = _lookups("_post_fields", TweetDetailParser.POST_FIELDS)
+_author_fields = _lookups("_author_fields", TweetDetailParser.AUTHOR_FIELDS)
+_metric_fields = _lookups("_metric_fields", TweetDetailParser.METRIC_FIELDS)
+# The usual-shape reads of TweetDetailParser._comment
+_comment_fast = _subscripts("_comment_fast", [path for _, path, _ in TweetDetailParser.COMMENT_FIELDS])
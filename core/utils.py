@@ -8,11 +8,18 @@ from pathlib import Path
 from pprint import pprint
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 import re
+from core.waits import WaitUtils
+from core.tweet_parser import TweetDetailParser
+from core.decoding import LazyJson, loads
+from core.models import CommentIndex, Record
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 logger = logging.getLogger('scraper')
 
+# Buttons that reveal hidden replies in a conversation
+SHOW_BUTTON_SELECTORS = ["xpath=//button[contains(., 'Show probable spam')]", "div[role='button']:has-text('Show')"]
+
 
 class ScraperUtils:
     @staticmethod
@@ -40,6 +47,10 @@ class ScraperUtils:
         with open(path, 'w') as f:
             json.dump(cookies, f)
 
+    @staticmethod
+    def is_tweet_detail(response):
+        return response.status == 200 and 'graphql' in response.url and 'TweetDetail' in response.url
+
     @staticmethod
     def random_delay(min_delay=1.0, max_delay=3.0):
         time.sleep(random.uniform(min_delay, max_delay))
@@ -123,7 +134,9 @@ class ScraperUtils:
         """
         Extracts the main post and optional repost from given JSON data.
         Uses the reference logic provided to handle nested structures.
+        The scrapers use TweetDetailParser.parse, which returns this and the comments in one pass.
         """
+        data = LazyJson.resolve(data) or {}
         post = {
             "id": None,
             "created_at": None,
@@ -317,13 +330,14 @@ class ScraperUtils:
     def parse_comments_from_json(data):
         """
         Extracts comments from a single TweetDetail JSON response.
-        Returns a list of comment dictionaries.
+        Returns a list of comment dictionaries. Same output as TweetDetailParser.parse_comments.
         """
         comments = []
         seen = set()
 
         try:
-            data_dict = data if isinstance(data, dict) else json.loads(data)
+            data = LazyJson.resolve(data)
+            data_dict = data if isinstance(data, dict) else loads(data)
         except Exception:
             return comments
 
@@ -527,22 +541,109 @@ class ScraperUtils:
         return comments
 
     @staticmethod
-    def extract_comments(page, max_scrolls=30, max_no_change=3):
+    def find_cursor(data, cursor_type='Bottom'):
+        """
+        Returns the value of the first TimelineTimelineCursor of the given type in a
+        TweetDetail response, or None when the conversation has no further page.
+        """
+        data = LazyJson.resolve(data)
+        if not isinstance(data, dict):
+            return None
+        instructions = data.get('data', {}).get('threaded_conversation_with_injections_v2', {}).get('instructions', [])
+        for instr in instructions:
+            for entry in instr.get('entries', []):
+                content = entry.get('content', {})
+                # Top-level cursor entries carry the cursor on content, item cursors on itemContent
+                for candidate in (content, content.get('itemContent', {})):
+                    if candidate.get('cursorType') == cursor_type and candidate.get('value'):
+                        return candidate['value']
+        return None
+
+    @staticmethod
+    def last_cursor(bodies, cursor_type='Bottom'):
+        """ The cursor of the latest body that has one (None once the conversation is complete). """
+        for body in reversed(bodies or []):
+            cursor = ScraperUtils.find_cursor(body, cursor_type)
+            if cursor:
+                return cursor
+        return None
+
+    @staticmethod
+    def _paginate_comments(client, tweet_id, cursor, max_pages=30, max_comments=None, index=None):
         """
-        Extracts additional comments by scrolling page and intercepting GraphQL responses.
-        Returns a list of comment dictionaries.
+        Follows Bottom cursors with direct TweetDetail calls.
+        Returns the comments found that were not yet in `index`, or None if the very first call failed.
         """
         comments = []
-        seen = set()
+        index = CommentIndex() if index is None else index
+        pages = 0
+
+        while cursor and pages < max_pages:
+            body = client.fetch_tweet_detail(tweet_id, cursor)
+            if body is None:
+                if pages == 0:
+                    return None
+                break
+            pages += 1
+
+            parsed = TweetDetailParser.parse(body, with_main=False, index=index)
+            comments.extend(parsed["comments"])
+
+            if max_comments and len(comments) >= max_comments:
+                ScraperUtils.log_info(f"Comment budget of {max_comments} reached after {pages} pages.")
+                break
+            cursor = parsed["cursor"]
+
+        if max_comments:
+            comments = comments[:max_comments]
+        ScraperUtils.log_info(f"Fetched {len(comments)} additional comments over {pages} cursor pages.")
+        return comments
+
+    @staticmethod
+    def extract_comments(page, max_scrolls=30, max_no_change=3, captured=None, client=None, tweet_id=None,
+                         max_comments=None, scroll_timeout=3000, index=None):
+        """
+        Extracts comments beyond those in the already captured TweetDetail responses.
+
+        With a ready XGraphQLClient and the tweet id, the Bottom cursor of the captured
+        responses is followed with direct TweetDetail calls until it runs out (max_scrolls
+        caps the number of pages). Otherwise the page is scrolled and the GraphQL responses
+        it triggers are intercepted; each scroll waits for the next TweetDetail response, at
+        most scroll_timeout ms. Both stop as soon as max_comments are collected.
+        Comments already in `index` (a CommentIndex shared with the page-load comments) are
+        skipped, and new ones are added to it. Returns the list of new comments.
+        """
+        index = CommentIndex() if index is None else index
+        if client is not None and client.ready and tweet_id:
+            cursor = ScraperUtils.last_cursor(captured)
+            if not cursor:
+                ScraperUtils.log_info("No Bottom cursor in captured responses; conversation is complete.")
+                return []
+            paged = ScraperUtils._paginate_comments(client, tweet_id, cursor, max_pages=max_scrolls,
+                                                    max_comments=max_comments, index=index)
+            if paged is not None or page is None:
+                return paged or []
+            ScraperUtils.log_info("Cursor pagination failed; falling back to scrolling.")
+
+        comments = []
         captured = []
+        parsed_upto = 0
 
         def handle_response(response):
-            if response.status == 200 and 'graphql' in response.url and 'TweetDetail' in response.url:
+            if ScraperUtils.is_tweet_detail(response):
                 try:
-                    body = response.body()
-                    body_str = body.decode('utf-8') if isinstance(body, bytes) else body
-                    json_body = json.loads(body_str)
-                    captured.append(json_body)
+                    captured.append(LazyJson(response.body()))
+                except Exception:
+                    pass
+
+        def collect_new():
+            # Parse captured GraphQL JSONs for comments as they arrive
+            nonlocal parsed_upto
+            while parsed_upto < len(captured):
+                data = captured[parsed_upto]
+                parsed_upto += 1
+                try:
+                    comments.extend(TweetDetailParser.parse_comments(data, index=index))
                 except Exception:
                     pass
 
@@ -562,13 +663,13 @@ class ScraperUtils:
             while scrolls < max_scrolls and no_change_count < max_no_change:
                 # Scroll to bottom of page (whole page)
                 page.evaluate("window.scrollTo(0, document.body.scrollHeight);")
-                page.wait_for_timeout(2000)  # Wait for content to load
+                # Returns as soon as the next comment batch arrives; the timeout only bounds the last rounds
+                WaitUtils.wait_for_response(page, ScraperUtils.is_tweet_detail, timeout=scroll_timeout)
 
                 # Handle "Show" buttons (replies/spam)
                 try:
                     # prefer explicit xpath prefix for xpath selectors
-                    button_selectors = ["xpath=//button[contains(., 'Show probable spam')]", "div[role='button']:has-text('Show')"]
-                    for selector in button_selectors:
+                    for selector in SHOW_BUTTON_SELECTORS:
                         try:
                             locator = page.locator(selector)
                             count = locator.count()
@@ -577,7 +678,7 @@ class ScraperUtils:
                                     btn = locator.nth(i)
                                     if btn.is_visible():
                                         btn.click()
-                                        page.wait_for_timeout(500)
+                                        WaitUtils.wait_for_dom_mutation(page, timeout=500)
                                         no_change_count = 0
                                 except Exception:
                                     pass
@@ -596,6 +697,11 @@ class ScraperUtils:
                 scrolls += 1
                 progress.update(task_load, advance=1)
 
+                collect_new()
+                if max_comments and len(comments) >= max_comments:
+                    ScraperUtils.log_info(f"Comment budget of {max_comments} reached; stopping scroll.")
+                    break
+
         # Remove listener
         try:
             page.off("response", handle_response)
@@ -606,34 +712,21 @@ class ScraperUtils:
             except Exception:
                 pass
 
-        ScraperUtils.log_info(f"Scroll finished. Parsing {len(captured)} additional responses.")
-
-        # Parse captured GraphQL JSONs for comments
-        for data in captured:
-            try:
-                # Use the robust parser utility
-                batch_comments = ScraperUtils.parse_comments_from_json(data)
-                for c in batch_comments:
-                    # Dedup based on user + text snippet
-                    key = f"{c.get('user', '')}||{c.get('text', '')[:200]}"
-                    if key not in seen:
-                        seen.add(key)
-                        comments.append(c)
-            except Exception:
-                pass
+        collect_new()
+        ScraperUtils.log_info(f"Scroll finished. Parsed {len(captured)} additional responses.")
+        if max_comments:
+            comments = comments[:max_comments]
         ScraperUtils.log_info(f"Extracted {len(comments)} additional comments via scroll.")
         return comments
+
     @staticmethod
-    def _make_serializable(obj):
-        """ Recursively convert datetime to ISO string for JSON serialization. """
-        if isinstance(obj, dict):
-            return {k: ScraperUtils._make_serializable(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [ScraperUtils._make_serializable(i) for i in obj]
-        elif isinstance(obj, datetime):
+    def json_default(obj):
+        """ json.dump hook: converts values on the fly instead of copying the whole structure first. """
+        if isinstance(obj, datetime):
             return obj.isoformat()
-        else:
-            return obj
+        if isinstance(obj, Record):
+            return obj.to_dict()
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
     @staticmethod
     def save_json(path: str, data):
@@ -647,6 +740,5 @@ class ScraperUtils:
 
         path.parent.mkdir(parents=True, exist_ok=True)
 
-        serializable_data = ScraperUtils._make_serializable(data)
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(serializable_data, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+            json.dump(data, f, ensure_ascii=False, indent=2, default=ScraperUtils.json_default)
\ No newline at end of file
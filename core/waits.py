@@ -0,0 +1,206 @@
+import asyncio
+import functools
+import inspect
+import random
+import time
+
+
+class Pacing:
+    """
+    Deliberate human-like delays between actions, kept apart from the event waits in
+    WaitUtils. Each delay is a (min_sec, max_sec) range; (0, 0) disables it.
+
+        Pacing(between_posts=(0.5, 1.0))   # faster than the default
+        Pacing.none()                      # no pacing at all (e.g. replayed sessions)
+    """
+    DEFAULTS = {
+        "between_posts": (1.5, 3.0),   # after each post visit
+        "between_scrolls": (0.0, 0.0),  # after each feed scroll round, on top of the event wait
+        "feed_return": (0.0, 0.0),      # after navigating back to the feed
+    }
+
+    def __init__(self, **delays):
+        unknown = set(delays) - set(self.DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown pacing delays: {', '.join(sorted(unknown))}")
+        self.delays = {**self.DEFAULTS, **delays}
+
+    @classmethod
+    def none(cls):
+        return cls(**{name: (0.0, 0.0) for name in cls.DEFAULTS})
+
+    def delay(self, name: str) -> float:
+        """ A random duration for the named delay, in seconds (0 when disabled). """
+        min_sec, max_sec = self.delays[name]
+        return random.uniform(min_sec, max_sec) if max_sec > 0 else 0.0
+
+    def pause(self, name: str):
+        seconds = self.delay(name)
+        if seconds:
+            time.sleep(seconds)
+
+    async def async_pause(self, name: str):
+        seconds = self.delay(name)
+        if seconds:
+            await asyncio.sleep(seconds)
+
+
+def _count_query(selector: str):
+    """ (script, arg) of page.evaluate for the number of elements matching a CSS or 'xpath=' selector. """
+    if selector.startswith('xpath='):
+        return ("sel => document.evaluate(sel, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotLength",
+                selector[6:])
+    return "sel => document.querySelectorAll(sel).length", selector
+
+
+def _height_predicate(previous: int, handle=None):
+    """ (script, arg) of page.wait_for_function for the page (or handle's element) growing past previous. """
+    if handle is None:
+        return "prev => document.body.scrollHeight > prev", previous
+    return "([el, prev]) => el.scrollHeight > prev", [handle, previous]
+
+
+def _poll_intervals(timeout: int, interval: int):
+    """ The sleeps of a polling wait: one interval at a time until timeout (ms) is used up. """
+    waited = 0
+    while waited < timeout:
+        yield interval
+        waited += interval
+
+
+def _falsy_on_timeout(default):
+    """
+    Makes a wait return `default` instead of raising when Playwright times out (or the page
+    goes away meanwhile). Works on plain functions and coroutine functions alike.
+    """
+    def decorate(wait):
+        if inspect.iscoroutinefunction(wait):
+            async def run(*args, **kwargs):
+                try:
+                    return await wait(*args, **kwargs)
+                except Exception:
+                    return default
+        else:
+            def run(*args, **kwargs):
+                try:
+                    return wait(*args, **kwargs)
+                except Exception:
+                    return default
+        return functools.wraps(wait)(run)
+    return decorate
+
+
+class WaitUtils:
+    """
+    Waits that return as soon as the awaited event happens, with the timeout only as an
+    upper bound. All of them return a falsy value on timeout instead of raising.
+    """
+    _COUNT_JS = """
+        ([sel, prev]) => {
+            if (sel.startsWith('xpath=')) {
+                const res = document.evaluate(sel.slice(6), document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                return res.snapshotLength > prev;
+            }
+            return document.querySelectorAll(sel).length > prev;
+        }
+    """
+
+    _MUTATION_JS = """
+        ([el, timeout]) => new Promise(resolve => {
+            const target = el || document.body;
+            const observer = new MutationObserver(() => { observer.disconnect(); resolve(true); });
+            observer.observe(target, { childList: true, subtree: true, attributes: true });
+            setTimeout(() => { observer.disconnect(); resolve(false); }, timeout);
+        })
+    """
+
+    @staticmethod
+    def count(page, selector: str) -> int:
+        return page.evaluate(*_count_query(selector))
+
+    @staticmethod
+    def wait_until(page, condition, timeout: int = 10000, interval: int = 100) -> bool:
+        """
+        Polls a Python-side condition (e.g. a capture list filled by a response listener).
+        page.wait_for_timeout keeps Playwright's event dispatch running between checks.
+        """
+        if condition():
+            return True
+        for step in _poll_intervals(timeout, interval):
+            page.wait_for_timeout(step)
+            if condition():
+                return True
+        return False
+
+    @staticmethod
+    @_falsy_on_timeout(None)
+    def wait_for_response(page, predicate, timeout: int = 10000):
+        """ Waits for the next response whose object satisfies predicate. Returns it or None. """
+        return page.wait_for_event("response", predicate=predicate, timeout=timeout)
+
+    @staticmethod
+    @_falsy_on_timeout(False)
+    def wait_for_count_increase(page, selector: str, previous: int, timeout: int = 5000) -> bool:
+        """ Waits until more than `previous` elements match selector (CSS or 'xpath=' prefixed). """
+        page.wait_for_function(WaitUtils._COUNT_JS, arg=[selector, previous], timeout=timeout)
+        return True
+
+    @staticmethod
+    @_falsy_on_timeout(False)
+    def wait_for_height_increase(page, previous: int, locator=None, timeout: int = 5000) -> bool:
+        """ Waits until the scrollHeight of the page (or of locator's element) exceeds previous. """
+        handle = locator.element_handle(timeout=timeout) if locator is not None else None
+        script, arg = _height_predicate(previous, handle)
+        page.wait_for_function(script, arg=arg, timeout=timeout)
+        return True
+
+    @staticmethod
+    @_falsy_on_timeout(False)
+    def wait_for_dom_mutation(page, locator=None, timeout: int = 3000) -> bool:
+        """ Resolves on the first DOM mutation under locator's element (or document.body). """
+        handle = locator.element_handle(timeout=timeout) if locator is not None else None
+        return bool(page.evaluate(WaitUtils._MUTATION_JS, [handle, timeout]))
+
+
+class AsyncWaitUtils:
+    """ WaitUtils for async_api pages: the same waits, scripts and timeout handling, as coroutines. """
+
+    @staticmethod
+    async def count(page, selector: str) -> int:
+        return await page.evaluate(*_count_query(selector))
+
+    @staticmethod
+    async def wait_until(page, condition, timeout: int = 10000, interval: int = 100) -> bool:
+        """ Polls a Python-side condition; response listeners keep running while the loop sleeps. """
+        if condition():
+            return True
+        for step in _poll_intervals(timeout, interval):
+            await asyncio.sleep(step / 1000)
+            if condition():
+                return True
+        return False
+
+    @staticmethod
+    @_falsy_on_timeout(None)
+    async def wait_for_response(page, predicate, timeout: int = 10000):
+        return await page.wait_for_event("response", predicate=predicate, timeout=timeout)
+
+    @staticmethod
+    @_falsy_on_timeout(False)
+    async def wait_for_count_increase(page, selector: str, previous: int, timeout: int = 5000) -> bool:
+        await page.wait_for_function(WaitUtils._COUNT_JS, arg=[selector, previous], timeout=timeout)
+        return True
+
+    @staticmethod
+    @_falsy_on_timeout(False)
+    async def wait_for_height_increase(page, previous: int, locator=None, timeout: int = 5000) -> bool:
+        handle = await locator.element_handle(timeout=timeout) if locator is not None else None
+        script, arg = _height_predicate(previous, handle)
+        await page.wait_for_function(script, arg=arg, timeout=timeout)
+        return True
+
+    @staticmethod
+    @_falsy_on_timeout(False)
+    async def wait_for_dom_mutation(page, locator=None, timeout: int = 3000) -> bool:
+        handle = await locator.element_handle(timeout=timeout) if locator is not None else None
+        return bool(await page.evaluate(WaitUtils._MUTATION_JS, [handle, timeout]))
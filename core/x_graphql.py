@@ -0,0 +1,201 @@
+import json
+import re
+from urllib.parse import urlparse, parse_qsl, urlencode
+from core.utils import ScraperUtils
+from core.decoding import loads
+
+# Request headers copied from a browser TweetDetail call; cookies come from the context itself
+FORWARDED_HEADERS = {
+    'authorization',
+    'content-type',
+    'x-twitter-active-user',
+    'x-twitter-auth-type',
+    'x-twitter-client-language',
+}
+
+
+class XGraphQLClient:
+    """
+    Calls the TweetDetail GraphQL endpoint directly, without rendering the tweet page.
+
+    Requests go through context.request, the APIRequestContext of the persistent browser
+    context: it shares the logged-in cookie jar and keeps connections alive between calls.
+    The query id, feature flags and auth headers are learned from the first TweetDetail
+    request the browser makes (register `observe` on context "request" events), or can be
+    seeded with `learn(url, headers)`. `base_url` can point at a local stub server.
+    context.request does not pass through context.route, so a NetworkCache is consulted here.
+    """
+    def __init__(self, context, base_url: str = "https://x.com", timeout: int = 15000, network_cache=None):
+        self.context = context
+        self.network_cache = network_cache
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.path = None
+        self.query = {}
+        self.variables = {}
+        self.headers = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.path is not None
+
+    @staticmethod
+    def tweet_id_from_url(url: str) -> str | None:
+        match = re.search(r'/status/([0-9]+)', url or '')
+        return match.group(1) if match else None
+
+    def learn(self, url: str, headers: dict = None):
+        """ Stores the endpoint path, query params and headers of a TweetDetail request. """
+        parsed = urlparse(url)
+        query = dict(parse_qsl(parsed.query))
+        try:
+            variables = json.loads(query.pop('variables', '{}'))
+        except ValueError:
+            variables = {}
+        # Per-tweet keys are filled in on every call
+        variables.pop('focalTweetId', None)
+        variables.pop('cursor', None)
+
+        self.path = parsed.path
+        self.query = query
+        self.variables = variables
+        self.headers = {k: v for k, v in (headers or {}).items() if k.lower() in FORWARDED_HEADERS}
+        ScraperUtils.log_info(f"Learned TweetDetail endpoint: {self.path}")
+
+    def observe(self, request):
+        if self.ready:
+            return
+        try:
+            if 'graphql' in request.url and 'TweetDetail' in request.url:
+                self.learn(request.url, request.headers)
+        except Exception as e:
+            ScraperUtils.log_error(f"Could not learn TweetDetail request: {e}")
+
+    def _csrf_token(self):
+        try:
+            for cookie in self.context.cookies(self.base_url):
+                if cookie.get('name') == 'ct0':
+                    return cookie.get('value')
+        except Exception:
+            pass
+        return None
+
+    def _request(self, tweet_id: str, cursor: str = None, csrf: str = None):
+        """ URL and headers of a TweetDetail call; shared with AsyncXGraphQLClient. """
+        variables = dict(self.variables, focalTweetId=tweet_id)
+        if cursor:
+            variables['cursor'] = cursor
+        params = dict(self.query, variables=json.dumps(variables, separators=(',', ':')))
+
+        headers = dict(self.headers)
+        if csrf:
+            headers['x-csrf-token'] = csrf
+        return f"{self.base_url}{self.path}?{urlencode(params)}", headers
+
+    def _replayed(self, tweet_id: str, url: str):
+        """ (status, body) recorded for url, or None when there is no recording. """
+        recorded = self.network_cache.lookup("GET", url)
+        if recorded is None:
+            ScraperUtils.log_info(f"No recorded TweetDetail response for {tweet_id}")
+            return None
+        return recorded["status"], recorded["body"]
+
+    @staticmethod
+    def _decode(tweet_id: str, status: int, body: bytes) -> dict | None:
+        if not 200 <= status < 300:
+            ScraperUtils.log_error(f"TweetDetail request for {tweet_id} returned {status}")
+            return None
+        try:
+            return loads(body)
+        except Exception as e:
+            ScraperUtils.log_error(f"TweetDetail response for {tweet_id} is not JSON: {e}")
+            return None
+
+    def fetch_tweet_detail(self, tweet_id: str, cursor: str = None) -> dict | None:
+        if not self.ready:
+            return None
+        url, headers = self._request(tweet_id, cursor, self._csrf_token())
+        cache = self.network_cache
+        if cache is not None and cache.replaying:
+            recorded = self._replayed(tweet_id, url)
+            if recorded is None:
+                return None
+            status, body = recorded
+        else:
+            try:
+                response = self.context.request.get(url, headers=headers, timeout=self.timeout)
+                status, body = response.status, response.body()
+            except Exception as e:
+                ScraperUtils.log_error(f"TweetDetail request failed for {tweet_id}: {e}")
+                return None
+            if cache is not None:
+                cache.store("GET", url, None, status, response.headers, body)
+        return self._decode(tweet_id, status, body)
+
+    def fetch_conversation(self, tweet_id: str, max_pages: int = 10) -> list:
+        """
+        Fetches the first TweetDetail page and follows Bottom cursors until they run out
+        or max_pages is reached. Returns the list of response bodies.
+        """
+        bodies = []
+        cursor = None
+        for _ in range(max_pages):
+            body = self.fetch_tweet_detail(tweet_id, cursor)
+            if body is None:
+                break
+            bodies.append(body)
+            cursor = ScraperUtils.find_cursor(body, 'Bottom')
+            if not cursor:
+                break
+        return bodies
+
+
+class AsyncXGraphQLClient(XGraphQLClient):
+    """
+    XGraphQLClient for an async_api BrowserContext: the same endpoint learning (observe/learn),
+    request building and network cache, with fetch_tweet_detail and fetch_conversation as
+    coroutines.
+    """
+    async def _csrf_token(self):
+        try:
+            for cookie in await self.context.cookies(self.base_url):
+                if cookie.get('name') == 'ct0':
+                    return cookie.get('value')
+        except Exception:
+            pass
+        return None
+
+    async def fetch_tweet_detail(self, tweet_id: str, cursor: str = None) -> dict | None:
+        if not self.ready:
+            return None
+        url, headers = self._request(tweet_id, cursor, await self._csrf_token())
+        cache = self.network_cache
+        if cache is not None and cache.replaying:
+            recorded = self._replayed(tweet_id, url)
+            if recorded is None:
+                return None
+            status, body = recorded
+        else:
+            try:
+                response = await self.context.request.get(url, headers=headers, timeout=self.timeout)
+                status, body = response.status, await response.body()
+            except Exception as e:
+                ScraperUtils.log_error(f"TweetDetail request failed for {tweet_id}: {e}")
+                return None
+            if cache is not None:
+                cache.store("GET", url, None, status, response.headers, body)
+        return self._decode(tweet_id, status, body)
+
+    async def fetch_conversation(self, tweet_id: str, max_pages: int = 10) -> list:
+        """ See XGraphQLClient.fetch_conversation. """
+        bodies = []
+        cursor = None
+        for _ in range(max_pages):
+            body = await self.fetch_tweet_detail(tweet_id, cursor)
+            if body is None:
+                break
+            bodies.append(body)
+            cursor = ScraperUtils.find_cursor(body, 'Bottom')
+            if not cursor:
+                break
+        return bodies
@@ -1,5 +1,6 @@
 from platforms.universal_scraper import UniversalScraper
 from core.utils import ScraperUtils
+from core.sink import JsonlSink
 import json
 
 def main():
@@ -11,11 +12,26 @@ def main():
     # ScraperUtils.save_json("x_results.json", results)
     # print(f"Scraped {len(results)} X posts. Saved to x_results.json")
     # # print(json.dumps(results, indent=4))
+    # # Or upsert into MongoDB while scraping (from core.database import MongoSink):
+    # # results = x_scraper.run(max_posts=20, mode='search', search_text="PM Abiy Ahmed", sink=MongoSink(platform='x'))
+    # # Record a run once, then replay it offline (from core.network_cache import NetworkCache):
+    # # x_scraper = UniversalScraper(platform='x', network_cache=NetworkCache("data/network_cache/abiy", mode="record"))
+    # # x_scraper = UniversalScraper(platform='x', network_cache=NetworkCache("data/network_cache/abiy", mode="replay"))
+    # # Per-stage timings of each run, as Prometheus text (or JSON with a .json name):
+    # # x_scraper = UniversalScraper(platform='x', metrics_path="x_metrics.prom")
+    # # Resume an interrupted long run instead of starting over (same mode, query and max_posts):
+    # # x_scraper = UniversalScraper(platform='x', checkpoint_dir="data/checkpoints")
     insta = UniversalScraper(platform='instagram', headless=False)
-    results = insta.run(max_posts=2, mode='blind')
-    ScraperUtils.save_json("instagram_results.json", results)
-    print(f"Scraped {len(results)} Instagram posts. Saved to instagram_results.json")
+    # Each post is appended to data/instagram_results.jsonl as soon as it is scraped
+    count = insta.run_to_sink(JsonlSink("instagram_results.jsonl"), max_posts=2, mode='blind')
+    print(f"Scraped {count} Instagram posts. Saved to instagram_results.jsonl")
     # print(json.dumps(results, indent=4))
 
+    # Recurring queries (from core.job_queue import JobQueue; from platforms.scheduler import Scheduler):
+    # queue = JobQueue()
+    # queue.add('x', "PM Abiy Ahmed", interval=3600, priority=5, max_posts=20)
+    # queue.add('instagram', "#ethiopia", interval=6 * 3600)
+    # Scheduler(queue, concurrency={'x': 2, 'instagram': 1}, seen_index_path="data/seen.sqlite3").run()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,471 @@
+import asyncio
+import re
+from urllib.parse import urlparse
+from playwright.async_api import TimeoutError
+from core.async_browser import AsyncBrowserEngine
+from core.insta_utils import InstaUtils
+from core.decoding import LazyJson
+from core.models import InstaComment, InstaPost, to_int
+from core.waits import Pacing, AsyncWaitUtils
+from core.seen_index import SeenIndex
+from core.network_cache import NetworkCache
+from platforms.base import ScraperBase
+from platforms.instagram_scraper import (
+    InstagramScraper, PostPayloads, POST_LINKS, POST_HREFS_JS, EMBEDDED_JSON_JS, CAROUSEL_JS,
+    MEDIA_IMG_SELECTORS, LIKES_SELECTORS, COMMENT_SCROLL_SELECTORS, COMMENT_MAIN_SELECTORS,
+    COMMENT_CONTAINER_SELECTORS,
+)
+
+
+class AsyncInstagramScraper(ScraperBase):
+    """
+    asyncio version of InstagramScraper. Posts collected by search are visited up to
+    `concurrency` at a time, each on its own page. Like the sync scraper, a post is built from
+    its GraphQL payloads first and read from the DOM only when they are missing; selectors,
+    scripts, timeouts and href filtering are InstagramScraper's.
+
+    Usage:
+        scraper = AsyncInstagramScraper(headless=True)
+        await scraper.start()
+        await scraper.login()
+        posts = await scraper.search("#python", max_posts=20)
+        await scraper.close()
+    """
+    PLATFORM = InstagramScraper.PLATFORM
+    FEED_LOAD_TIMEOUT = InstagramScraper.FEED_LOAD_TIMEOUT
+    SCROLL_TIMEOUT = InstagramScraper.SCROLL_TIMEOUT
+    CAROUSEL_TIMEOUT = InstagramScraper.CAROUSEL_TIMEOUT
+    POST_LOAD_TIMEOUT = InstagramScraper.POST_LOAD_TIMEOUT
+    CAROUSEL_MAX_STEPS = InstagramScraper.CAROUSEL_MAX_STEPS
+    MAX_SCROLLS = InstagramScraper.MAX_SCROLLS
+
+    def __init__(self, headless: bool = True, user_data_dir: str = None, concurrency: int = 3,
+                 pacing: Pacing = None, seen_index: SeenIndex = None, block_resources="default",
+                 network_cache: NetworkCache = None):
+        super().__init__(headless=headless, user_data_dir=user_data_dir,
+                         pacing=pacing or Pacing(between_posts=(2.0, 4.0)))
+        # Posts scraped by earlier runs are skipped during collection (None = no persistence)
+        self.seen_index = seen_index
+        self.insta_utils = InstaUtils()
+        self.concurrency = max(1, concurrency)
+        # Stylesheets load, as in InstagramScraper
+        if block_resources == "default":
+            block_resources = "instagram"
+        self.browser = AsyncBrowserEngine(headless=headless, user_data_dir=user_data_dir,
+                                          block_resources=block_resources, network_cache=network_cache)
+        self.resource_blocker = self.browser.blocker
+        self.network_cache = network_cache
+        self.page = None
+        self.driver = None
+
+    async def start(self):
+        self.page = await self.browser.get_driver()
+        self.driver = self.page
+        return self
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        await self.browser.quit_driver()
+
+    @staticmethod
+    def _get_full_sel(by: str, sel: str):
+        if by == 'xpath':
+            return f"xpath={sel}"
+        elif by == 'css':
+            return f"css={sel}"
+        return sel
+
+    async def _find_element_with_selectors(self, page, selectors, by='xpath', timeout=10):
+        for sel in selectors:
+            full_sel = self._get_full_sel(by, sel)
+            try:
+                await page.wait_for_selector(full_sel, timeout=timeout * 1000)
+                return await page.query_selector(full_sel)
+            except TimeoutError:
+                continue
+        return None
+
+    async def _find_elements_with_selectors(self, page, selectors, by='xpath', timeout=10, wait=True):
+        for sel in selectors:
+            full_sel = self._get_full_sel(by, sel)
+            try:
+                if wait:
+                    await page.wait_for_selector(full_sel, timeout=timeout * 1000)
+                elements = await page.query_selector_all(full_sel)
+                if elements:
+                    return elements
+            except TimeoutError:
+                continue
+        return []
+
+    async def _find_child_element(self, parent, selectors, by='xpath'):
+        for sel in selectors:
+            try:
+                elem = await parent.query_selector(self._get_full_sel(by, sel))
+                if elem:
+                    return elem
+            except Exception:
+                continue
+        return None
+
+    async def _find_child_elements(self, parent, selectors, by='xpath'):
+        for sel in selectors:
+            try:
+                elements = await parent.query_selector_all(self._get_full_sel(by, sel))
+                if elements:
+                    return elements
+            except Exception:
+                continue
+        return []
+
+    @staticmethod
+    def _on_login_page(url: str) -> bool:
+        return "/accounts/login" in urlparse(url).path
+
+    async def login(self, username: str = None, password: str = None, manual_login_timeout: int = 60):
+        if self.page is None:
+            await self.start()
+        login_url = "https://www.instagram.com/accounts/login/"
+        try:
+            await self.page.goto(login_url, timeout=10000, wait_until='commit')
+        except Exception as e:
+            self.insta_utils.log_error(f"Cannot reach login page: {e}")
+            return False
+
+        if not self._on_login_page(self.page.url):
+            self.insta_utils.log_success("Already logged in (redirect detected after commit)")
+            return True
+
+        if username and password:
+            try:
+                user_input = await self._find_element_with_selectors(self.page, ["input[name='username']", "input[name='email']"], by='css', timeout=20)
+                pwd_input = await self._find_element_with_selectors(self.page, ["input[name='password']", "input[name='pass']"], by='css', timeout=20)
+                submit_btn = await self._find_element_with_selectors(self.page, ["button[type='submit']"], by='css', timeout=10)
+                await user_input.fill(username)
+                await pwd_input.fill(password)
+                if submit_btn:
+                    await submit_btn.click()
+                else:
+                    await pwd_input.press("Enter")
+                # Returns on the redirect away from the login form; the loop below verifies it
+                try:
+                    await self.page.wait_for_url(lambda url: not self._on_login_page(url), timeout=60000)
+                except TimeoutError:
+                    pass
+            except Exception as e:
+                self.insta_utils.log_error(f"Login failed: {e}")
+                return False
+        else:
+            try:
+                await self.page.wait_for_selector("svg[aria-label='Home']", timeout=manual_login_timeout * 1000)
+            except Exception:
+                if self._on_login_page(self.page.url):
+                    self.insta_utils.log_error("Manual login timeout")
+                    return False
+
+        for _ in range(5):
+            if not self._on_login_page(self.page.url):
+                self.insta_utils.log_success("Login successful")
+                return True
+            try:
+                await self.page.wait_for_url(lambda url: not self._on_login_page(url), timeout=3000)
+                continue
+            except Exception:
+                pass
+            try:
+                await self.page.reload(timeout=30000)
+            except Exception:
+                pass
+        self.insta_utils.log_error("Login failed after verification")
+        return False
+
+    async def _load_feed(self, url: str):
+        with self.metrics.span("navigation"):
+            await self.page.goto(url)
+        with self.metrics.span("wait"):
+            await AsyncWaitUtils.wait_for_count_increase(self.page, POST_LINKS, 0, timeout=self.FEED_LOAD_TIMEOUT)
+
+    async def blind_scrape(self, url: str = None, max_posts=10):
+        if url:
+            await self._load_feed(url)
+        return await self.search(text=None, max_posts=max_posts)
+
+    async def search(self, text: str = None, start_time: str = None, end_time: str = None, max_posts=5,
+                     concurrency: int = None):
+        if text:
+            target = self.insta_utils.prepare_target(text)
+            if not target:
+                self.insta_utils.log_error("Could not build target URL from text.")
+                return []
+            await self._load_feed(target)
+
+        post_hrefs = []
+        seen = set()
+        scroll_rounds = 0
+        while len(post_hrefs) < max_posts and scroll_rounds < self.MAX_SCROLLS:
+            await self._collect_round(seen, post_hrefs)
+            scroll_rounds += 1
+
+        target_posts = post_hrefs[:max_posts]
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        async def visit(href):
+            async with semaphore:
+                page = await self.browser.new_page()
+                post = None
+                try:
+                    post = await self._scrape_single_post(href, page)
+                except Exception as e:
+                    self.insta_utils.log_error(f"Error scraping post {href}: {e}")
+                finally:
+                    await page.close()
+                if post is not None:
+                    await self.async_pause("between_posts")
+                return post
+
+        posts = await asyncio.gather(*(visit(href) for href in target_posts))
+
+        results = []
+        for href, post in zip(target_posts, posts):
+            if post is None:
+                self.insta_utils.log_error(f"Failed to scrape post {href}, continuing with the next one.")
+                continue
+            if not self._within_date_range(post, start_time, end_time):
+                continue
+            # Only posts within the date range are marked, so a later run with another range still visits the rest
+            if self.seen_index is not None:
+                with self.metrics.span("persist"):
+                    self.seen_index.mark(href, post)
+            self.metrics.count_post(post)
+            results.append(post)
+        return results
+
+    async def _collect_round(self, seen: set, post_hrefs: list) -> int:
+        """ InstagramScraper._collect_round on the async feed page. """
+        try:
+            hrefs = await self.page.evaluate(POST_HREFS_JS)
+        except Exception:
+            hrefs = []
+        found = InstagramScraper._accept_hrefs(hrefs, seen, post_hrefs, self.seen_index)
+        with self.metrics.span("scroll"):
+            for _ in range(2):
+                height = await self.page.evaluate("document.body.scrollHeight")
+                await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                await AsyncWaitUtils.wait_for_height_increase(self.page, height, timeout=self.SCROLL_TIMEOUT)
+        await self.async_pause("between_scrolls")
+        return found
+
+    @staticmethod
+    def _graphql_listener(captured: list, metrics=None):
+        async def handle_response(response):
+            try:
+                if InstaUtils.is_graphql(response):
+                    if metrics is None:
+                        body = await response.body()
+                    else:
+                        with metrics.span("interception"):
+                            body = await response.body()
+                        metrics.add("responses_intercepted")
+                        metrics.add("bytes_intercepted", len(body))
+                    # Decoded only when the parser reads it
+                    captured.append(LazyJson(body))
+            except Exception:
+                pass
+        return handle_response
+
+    async def _scrape_single_post(self, href: str, page) -> InstaPost | None:
+        """ GraphQL payloads first, the DOM as fallback (see InstagramScraper._finish_visit). """
+        captured = []
+        listener = self._graphql_listener(captured, self.metrics)
+        page.on("response", listener)
+        try:
+            try:
+                with self.metrics.span("navigation"):
+                    # The inlined post JSON is part of the document
+                    await page.goto(href, wait_until="domcontentloaded", timeout=self.POST_LOAD_TIMEOUT * 2)
+            except Exception as e:
+                self.insta_utils.log_error(f"Navigation failed for {href}: {e}")
+                return None
+            post = await self._scrape_post_graphql(page, href, captured)
+        finally:
+            page.remove_listener("response", listener)
+        if post is not None:
+            return post
+        self.insta_utils.log_info("GraphQL data missing, falling back to DOM extraction...")
+        with self.metrics.span("parse"):
+            return await self._scrape_post_dom(page, href)
+
+    async def _scrape_post_graphql(self, page, href: str, captured: list) -> InstaPost | None:
+        """ InstagramScraper._scrape_post_graphql on an async page. """
+        payloads = PostPayloads(href)
+        with self.metrics.span("parse"):
+            try:
+                embedded = InstagramScraper._payloads_from_scripts(await page.evaluate(EMBEDDED_JSON_JS))
+            except Exception:
+                embedded = []
+            found = payloads.add(embedded)
+        if not found:
+            with self.metrics.span("wait"):
+                found = await AsyncWaitUtils.wait_until(page, lambda: payloads.follow(captured),
+                                                        timeout=self.POST_LOAD_TIMEOUT)
+            if not found:
+                return None
+        with self.metrics.span("scroll"):
+            await self._scroll_comments(page)
+        with self.metrics.span("parse"):
+            payloads.follow(captured)
+            post = payloads.post()
+        self.metrics.add("responses_parsed", len(embedded) + len(captured))
+        if post is not None:
+            self.insta_utils.log_success(f"Parsed post and {len(post['comments'])} comments from GraphQL")
+        return post
+
+    async def _scrape_post_dom(self, page, href: str) -> InstaPost | None:
+        data = InstaPost(url=href)
+        try:
+            main = await self._find_element_with_selectors(page, ["//main[1]//hr[1]/following::div[1]"], by='xpath')
+            if not main:
+                raise TimeoutError("Main container not found.")
+
+            top_blocks = await self._find_elements_with_selectors(page, ["//main[1]//hr[1]/following::div[1]/div[1]"], by='xpath')
+            if len(top_blocks) >= 2:
+                target = await self._find_child_element(top_blocks[0], ["./div[1]/div[1]/div[2]/div[1]/span[1]/div[1]"])
+                if not target:
+                    raise ValueError("Target element not found.")
+                author_el = await self._find_child_element(target, [".//a[1]//span[1]"])
+                data["author"] = (await author_el.text_content()).strip() if author_el else None
+                time_tag = await self._find_child_element(target, ["time"], by='tag')
+                data["timestamp"] = await time_tag.get_attribute("datetime") if time_tag else None
+                caption_el = await self._find_child_element(target, ["./span[1]"])
+                text = (await caption_el.text_content()).strip() if caption_el else None
+                data["caption"] = text
+                if text:
+                    data["mentions"] = re.findall(r'@\w+', text)
+                    data["hashtags"] = re.findall(r'#\w+', text)
+
+            likes_el = await self._find_element_with_selectors(page, LIKES_SELECTORS, by='xpath', timeout=5)
+            data["likes"] = to_int((await likes_el.text_content()).strip()) if likes_el else 0
+
+            # Media: the whole carousel is read inside the page in one call
+            try:
+                carousel = await page.evaluate(CAROUSEL_JS, [MEDIA_IMG_SELECTORS, self.CAROUSEL_TIMEOUT,
+                                                             self.CAROUSEL_MAX_STEPS])
+                data["media"] = carousel["urls"]
+            except Exception as e:
+                self.insta_utils.log_error(f"Carousel extraction failed: {e}")
+
+            data["comments"] = await self._extract_comments(page)
+            return data
+        except Exception as e:
+            self.insta_utils.log_error(f"_scrape_single_post failed for {href}: {e}")
+            return None
+
+    async def _scroll_until_end(self, page, locator, pause=3, max_tries=3):
+        """ InstaUtils.scroll_until_end: each step waits for the list to change, at most `pause` seconds. """
+        await locator.wait_for(state="visible", timeout=2000)
+        tries = 0
+        while tries < max_tries:
+            load_more = locator.locator('div[role="button"]:has-text("View hidden comments")')
+            if await load_more.count() > 0:
+                try:
+                    await load_more.first.click()
+                    await AsyncWaitUtils.wait_for_dom_mutation(page, locator, timeout=3000)
+                    tries = 0
+                    continue
+                except Exception as e:
+                    print(f"Error clicking view hidden: {e}")
+            total_height = await locator.evaluate("el => el.scrollHeight")
+            await locator.evaluate("el => el.scrollTo(0, el.scrollHeight)")
+            grew = await AsyncWaitUtils.wait_for_height_increase(page, total_height, locator=locator,
+                                                                 timeout=int(pause * 1000))
+            tries = 0 if grew else tries + 1
+        return True
+
+    async def _scroll_comments(self, page) -> bool:
+        for sel in COMMENT_SCROLL_SELECTORS:
+            try:
+                if await self._scroll_until_end(page, page.locator(f"xpath={sel}")):
+                    return True
+            except Exception:
+                continue
+        self.insta_utils.log_info("Could not scroll comments section with any selector.")
+        return False
+
+    async def _extract_comments(self, page):
+        comments = []
+        with self.metrics.span("scroll"):
+            await self._scroll_comments(page)
+
+        main = await self._find_element_with_selectors(page, COMMENT_MAIN_SELECTORS, by='xpath')
+        if not main:
+            return comments
+        blocks = await self._find_child_elements(main, ["./div", "./section", "./ul"])
+        if not blocks:
+            return comments
+        target_block = blocks[-1]
+        h2 = await self._find_child_element(target_block, [".//h2"])
+        if h2 and "No comments yet." in (await h2.text_content()).strip():
+            return []
+        containers = await self._find_child_elements(target_block, COMMENT_CONTAINER_SELECTORS)
+        for container in containers:
+            try:
+                parsed = await self._parse_comment(container)
+                if parsed:
+                    comments.append(InstaComment.from_dict(parsed))
+            except Exception as e:
+                self.insta_utils.log_error(f"Error processing comment container: {e}")
+        self.insta_utils.log_info(f"Extracted {len(comments)} comments from the DOM")
+        return comments
+
+    @staticmethod
+    async def _parse_comment(container):
+        """ Async port of InstaUtils.parse_instagram_comment. """
+        link_el = await container.query_selector("xpath=.//a[@role='link' and @tabindex='0']")
+        username = await link_el.get_attribute("href") if link_el else None
+
+        time_el = await container.query_selector("xpath=.//time[@title] | .//span[@title]")
+        comment_time = (await time_el.get_attribute("datetime") or await time_el.get_attribute("title")) if time_el else None
+        if comment_time is None:
+            return None
+
+        message_el = await container.query_selector(
+            "xpath=.//time/ancestor::div[1]/following-sibling::*[self::span or self::div][1]"
+        ) or await container.query_selector(
+            "xpath=.//time/ancestor::div[2]/descendant::span[normalize-space()][last()]"
+        )
+        message = (await message_el.text_content()).strip() if message_el else None
+
+        likes = 0
+        like_el = await container.query_selector(
+            "xpath=.//*[contains(translate(normalize-space(.), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'like')]"
+        )
+        if like_el:
+            match = re.search(r'(\d+)', (await like_el.text_content()).strip().replace('\xa0', ' '))
+            if match:
+                likes = int(match.group(1))
+
+        num_replies = 0
+        reply_el = await container.query_selector("xpath=.//div[@role='button' and @tabindex='0' and contains(., 'View all')]")
+        if reply_el:
+            match = re.search(r'View all (\d+) replies', (await reply_el.text_content()).strip())
+            if match:
+                num_replies = int(match.group(1))
+
+        media_el = await container.query_selector("xpath=.//img[contains(@src, '/media/')]")
+        media = await media_el.get_attribute("src") if media_el else None
+
+        parsed = {
+            "username": f"@{username.strip('/').split('/')[0]}" if username else None,
+            "time": comment_time,
+            "message": message,
+            "likes": likes,
+            "replies": num_replies
+        }
+        if media:
+            parsed["media"] = media
+        return parsed
@@ -0,0 +1,480 @@
+import asyncio
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from core.async_browser import AsyncBrowserEngine
+from core.utils import ScraperUtils, SHOW_BUTTON_SELECTORS
+from core.tweet_parser import TweetDetailParser
+from core.decoding import LazyJson
+from core.models import CommentIndex, Post
+from core.waits import Pacing, AsyncWaitUtils
+from core.seen_index import SeenIndex
+from core.network_cache import NetworkCache
+from core.x_graphql import AsyncXGraphQLClient, XGraphQLClient
+from platforms.base import ScraperBase
+from platforms.x_scraper import XScraper, STATUS_LINKS, STATUS_HREFS_JS, SINGLE_POST_URL, POST_DOM_JS
+
+
+class AsyncXScraper(ScraperBase):
+    """
+    asyncio version of XScraper. Phase 2 of search visits up to `concurrency` posts at
+    once, each on its own page with its own TweetDetail listener. Parsing, href filtering,
+    timeouts and the GraphQL client setup are XScraper's.
+
+    Usage:
+        scraper = AsyncXScraper(headless=True)
+        await scraper.start()
+        await scraper.login()
+        posts = await scraper.search("#Python", max_posts=20)
+        await scraper.close()
+    """
+    PLATFORM = XScraper.PLATFORM
+    FEED_LOAD_TIMEOUT = XScraper.FEED_LOAD_TIMEOUT
+    SCROLL_TIMEOUT = XScraper.SCROLL_TIMEOUT
+    POST_LOAD_TIMEOUT = XScraper.POST_LOAD_TIMEOUT
+    MAX_SCROLLS = XScraper.MAX_SCROLLS
+
+    def __init__(self, headless: bool = True, user_data_dir: str = None, concurrency: int = 5,
+                 graphql_mode: bool = False, graphql_max_pages: int = 10, max_comments: int = None,
+                 pacing: Pacing = None, seen_index: SeenIndex = None, block_resources="default",
+                 network_cache: NetworkCache = None):
+        super().__init__(headless=headless, user_data_dir=user_data_dir, pacing=pacing)
+        # Posts scraped by earlier runs are skipped during collection (None = no persistence)
+        self.seen_index = seen_index
+        self.concurrency = max(1, concurrency)
+        self.browser_engine = AsyncBrowserEngine(headless=headless, user_data_dir=user_data_dir,
+                                                 block_resources=block_resources, network_cache=network_cache)
+        self.resource_blocker = self.browser_engine.blocker
+        self.network_cache = network_cache
+        # Direct TweetDetail calls (see XScraper); the client needs the context, so start() creates it
+        self.graphql_mode = graphql_mode
+        self.graphql_max_pages = graphql_max_pages
+        self.graphql = None
+        # Upper bound on comments kept per post (None = no limit)
+        self.max_comments = max_comments
+        self.page = None
+        self.context = None
+        self.driver = None
+
+    async def start(self):
+        self.page = await self.browser_engine.create_driver()
+        self.context = self.browser_engine.context
+        self.driver = self.page
+        self.graphql = AsyncXGraphQLClient(self.context, network_cache=self.network_cache)
+        self.context.on("request", self.graphql.observe)
+        return self
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _find_element_with_selectors(self, selectors, timeout=10, page=None):
+        page = page or self.page
+        for sel in selectors:
+            try:
+                locator = page.locator(sel)
+                await locator.wait_for(state='visible', timeout=timeout * 1000)
+                return locator
+            except PlaywrightTimeoutError:
+                continue
+            except Exception:
+                continue
+        return None
+
+    async def _retry_goto(self, url, max_retries=3, timeout=120000):
+        for attempt in range(max_retries):
+            try:
+                with self.metrics.span("navigation"):
+                    await self.page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+                return True
+            except Exception as e:
+                ScraperUtils.log_error(f"Attempt {attempt+1} failed for {url}: {e}")
+                if attempt == max_retries - 1:
+                    return False
+                await asyncio.sleep(5.0)
+        return False
+
+    @staticmethod
+    async def _wait_for_next_step(locator, timeout=10000):
+        # The login flow replaces the input of the finished step
+        try:
+            await locator.wait_for(state='detached', timeout=timeout)
+        except Exception:
+            pass
+
+    async def login(self, username: str = None, password: str = None):
+        home_selectors = ['div[data-testid="primaryColumn"]', 'div[data-testid="HomeTimeline"]']
+
+        if not await self._retry_goto("https://x.com/home"):
+            return False
+
+        current_url = self.page.url
+        if "/home" in current_url and await self._find_element_with_selectors(home_selectors, timeout=15000):
+            ScraperUtils.log_success("Already logged in via persistent session.")
+            return True
+
+        ScraperUtils.log_info(f"Not logged in; at {current_url}. Proceeding to login.")
+        if not (username and password):
+            ScraperUtils.log_error("Async scraper needs credentials or an already logged-in profile.")
+            return False
+
+        if "/login" not in current_url and "/i/flow/login" not in current_url:
+            if not await self._retry_goto("https://x.com/i/flow/login"):
+                return False
+
+        username_selectors = ['input[name="text"][autocomplete="username"]', 'input[name="text"]']
+        next_button_selectors = [
+            'div[role="button"]:has-text("Next")',
+            'xpath=//button[.//span[contains(text(), "Next")]]'
+        ]
+        password_selectors = ['input[name="password"][autocomplete="current-password"]', 'input[name="password"]']
+        login_button_selectors = [
+            'div[role="button"]:has-text("Log in")',
+            'xpath=//button[.//span[contains(text(), "Log in")]]'
+        ]
+        try:
+            username_input = await self._find_element_with_selectors(username_selectors, timeout=30000)
+            if not username_input:
+                raise PlaywrightTimeoutError("Username input not found.")
+            await username_input.fill(username)
+            next_btn = await self._find_element_with_selectors(next_button_selectors, timeout=10000)
+            if not next_btn:
+                raise PlaywrightTimeoutError("Next button not found.")
+            await next_btn.click()
+            await self._wait_for_next_step(username_input)
+
+            unusual_input = await self._find_element_with_selectors(username_selectors, timeout=5000)
+            if unusual_input:
+                await unusual_input.fill(username.split('@')[0] if '@' in username else username)
+                confirm_btn = await self._find_element_with_selectors(next_button_selectors, timeout=10000)
+                if confirm_btn:
+                    await confirm_btn.click()
+                    await self._wait_for_next_step(unusual_input)
+
+            password_input = await self._find_element_with_selectors(password_selectors, timeout=30000)
+            if not password_input:
+                raise PlaywrightTimeoutError("Password input not found.")
+            await password_input.fill(password)
+            login_btn = await self._find_element_with_selectors(login_button_selectors, timeout=10000)
+            if not login_btn:
+                raise PlaywrightTimeoutError("Login button not found.")
+            await login_btn.click()
+            try:
+                await self.page.wait_for_url(lambda url: "/login" not in url and "/i/flow" not in url, timeout=15000)
+            except PlaywrightTimeoutError:
+                ScraperUtils.log_info("URL check timeout, but proceeding...")
+        except Exception as e:
+            ScraperUtils.log_error(f"Auto login failed: {e}")
+            return False
+
+        if not await self._retry_goto("https://x.com/home"):
+            return False
+        if await self._find_element_with_selectors(home_selectors, timeout=15000):
+            ScraperUtils.log_success("Login verified.")
+            return True
+        ScraperUtils.log_error(f"Login verification failed. Current URL: {self.page.url}")
+        return False
+
+    async def _load_feed(self, url: str):
+        with self.metrics.span("navigation"):
+            await self.page.goto(url, wait_until="domcontentloaded")
+        with self.metrics.span("wait"):
+            await AsyncWaitUtils.wait_for_count_increase(self.page, STATUS_LINKS, 0, timeout=self.FEED_LOAD_TIMEOUT)
+
+    async def blind_scrape(self, url: str = None, max_posts=10):
+        if url:
+            await self._load_feed(url)
+        return await self.search(text=None, max_posts=max_posts, current_url=self.page.url)
+
+    async def search(self, text: str = None, start_time: str = None, end_time: str = None, max_posts=5,
+                     current_url: str = None, concurrency: int = None):
+        if text and SINGLE_POST_URL.match(text):
+            post = await self._scrape_single_post(text)
+            return [post] if post else []
+
+        if text:
+            target = XScraper.prepare_target(text)
+            if not target:
+                ScraperUtils.log_error("Could not build target URL from text.")
+                return []
+            await self._load_feed(target)
+            current_url = self.page.url
+        elif not current_url:
+            current_url = self.page.url
+
+        ScraperUtils.log_info(f"Starting scrape on: {current_url}")
+
+        # PHASE 1: Collect URLs
+        post_hrefs = []
+        seen = set()
+        skipped_known = 0
+        scroll_rounds = 0
+
+        while len(post_hrefs) < max_posts and scroll_rounds < self.MAX_SCROLLS:
+            scroll_rounds += 1
+            _, skipped = await self._collect_round(seen, post_hrefs)
+            skipped_known += skipped
+
+        print(f"--- Collection Complete. Total: {len(post_hrefs)} ---")
+        if skipped_known:
+            ScraperUtils.log_info(f"Skipped {skipped_known} posts already in the seen index.")
+
+        # PHASE 2: Visit and Extract (concurrently, one page per in-flight post)
+        target_posts = post_hrefs[:max_posts]
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        async def visit(i, href):
+            async with semaphore:
+                print(f"[{i+1}/{len(target_posts)}] Visiting: {href}")
+                post = await self._scrape_post_direct(href)
+                if post:
+                    return post
+                page = await self.browser_engine.new_page()
+                post = None
+                try:
+                    post = await self._render_post(href, page)
+                except Exception as e:
+                    ScraperUtils.log_error(f"Error scraping post {href}: {e}")
+                finally:
+                    await page.close()
+                await self.async_pause("between_posts")
+                return post
+
+        posts = await asyncio.gather(*(visit(i, href) for i, href in enumerate(target_posts)))
+
+        results = []
+        for href, post in zip(target_posts, posts):
+            if not post:
+                print(f"Failed to extract data for {href}")
+                continue
+            if not self._within_date_range(post, start_time, end_time):
+                print("Skipping post due to date filter.")
+                continue
+            # Only posts within the date range are marked, so a later run with another range still visits the rest
+            if self.seen_index is not None:
+                with self.metrics.span("persist"):
+                    self.seen_index.mark(href, post)
+            self.metrics.count_post(post)
+            results.append(post)
+        return results
+
+    async def _collect_round(self, seen: set, post_hrefs: list):
+        """ XScraper._collect_round on the async feed page. """
+        with self.metrics.span("scroll"):
+            height = await self.page.evaluate("document.body.scrollHeight")
+            await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            await AsyncWaitUtils.wait_for_height_increase(self.page, height, timeout=self.SCROLL_TIMEOUT)
+        await self.async_pause("between_scrolls")
+
+        try:
+            anchors_hrefs = await self.page.evaluate(STATUS_HREFS_JS)
+        except Exception as e:
+            print(f"[DEBUG] JS Evaluation failed: {e}")
+            anchors_hrefs = []
+        return XScraper._accept_hrefs(anchors_hrefs, seen, post_hrefs, self.seen_index)
+
+    @staticmethod
+    def _tweet_detail_listener(captured: list, metrics=None):
+        async def handle_response(response):
+            try:
+                if ScraperUtils.is_tweet_detail(response):
+                    if metrics is None:
+                        body = await response.body()
+                    else:
+                        with metrics.span("interception"):
+                            body = await response.body()
+                        metrics.add("responses_intercepted")
+                        metrics.add("bytes_intercepted", len(body))
+                    # Decoded only when a parser reads it
+                    captured.append(LazyJson(body))
+            except Exception as e:
+                print(f"[ERROR] Failed to parse response: {e}")
+        return handle_response
+
+    async def _scrape_post_direct(self, href: str) -> Post | None:
+        """ XScraper._scrape_post_direct with the async client. """
+        if not (self.graphql_mode and self.graphql is not None and self.graphql.ready):
+            return None
+        tweet_id = XGraphQLClient.tweet_id_from_url(href)
+        if not tweet_id:
+            return None
+
+        with self.metrics.span("fetch"):
+            first_page = await self.graphql.fetch_tweet_detail(tweet_id)
+        if first_page is None:
+            ScraperUtils.log_info(f"Direct GraphQL replay failed for {href}; rendering page instead.")
+            return None
+        with self.metrics.span("parse"):
+            data, index = XScraper._parse_captured(href, [first_page])
+        self.metrics.add("responses_parsed")
+        if data is None or not data.get("id"):
+            return None
+        data["comments"] = await self._collect_comments(None, [first_page], data["id"], index,
+                                                        max_pages=self.graphql_max_pages)
+        return data
+
+    async def _scrape_single_post(self, href: str, page=None) -> Post | None:
+        post = await self._scrape_post_direct(href)
+        if post:
+            return post
+        return await self._render_post(href, page or self.page)
+
+    async def _render_post(self, href: str, page) -> Post | None:
+        captured = []
+        handle_response = self._tweet_detail_listener(captured, self.metrics)
+        page.on("response", handle_response)
+        try:
+            try:
+                with self.metrics.span("navigation"):
+                    await page.goto(href, wait_until="domcontentloaded")
+                # The first TweetDetail body carries the post and the first comment page
+                with self.metrics.span("wait"):
+                    loaded = await AsyncWaitUtils.wait_until(page, lambda: captured, timeout=self.POST_LOAD_TIMEOUT)
+                if not loaded:
+                    ScraperUtils.log_info("No TweetDetail response before timeout.")
+            except Exception as e:
+                ScraperUtils.log_error(f"Navigation failed: {e}")
+                return None
+        finally:
+            page.remove_listener("response", handle_response)
+
+        return await self._build_post(href, captured, page)
+
+    async def _build_post(self, href: str, captured: list, page) -> Post | None:
+        with self.metrics.span("parse"):
+            data, index = XScraper._parse_captured(href, captured)
+        self.metrics.add("responses_parsed", len(captured))
+
+        if data is not None:
+            ScraperUtils.log_info("Starting additional comment extraction...")
+            data["comments"] = await self._collect_comments(page, captured, data.get("id"), index)
+            return data
+
+        ScraperUtils.log_info("GraphQL data missing, attempting DOM extraction...")
+        try:
+            return XScraper._post_from_dom(href, await page.evaluate(POST_DOM_JS))
+        except Exception as e:
+            ScraperUtils.log_error(f"DOM Fallback failed: {e}")
+            return None
+
+    async def _collect_comments(self, page, captured, tweet_id, index: CommentIndex, max_pages=30):
+        """ XScraper._collect_comments: comments past the captured responses, within max_comments. """
+        budget = None
+        if self.max_comments:
+            budget = self.max_comments - len(index)
+            if budget <= 0:
+                ScraperUtils.log_info(f"Comment budget of {self.max_comments} met by initial responses.")
+                return index.comments[:self.max_comments]
+
+        with self.metrics.span("scroll"):
+            await self.extract_comments(page, max_scrolls=max_pages, captured=captured, tweet_id=tweet_id,
+                                        max_comments=budget, index=index)
+        ScraperUtils.log_info(f"Total comments extracted: {len(index)}.")
+        return index.comments[:self.max_comments] if self.max_comments else index.comments
+
+    async def _paginate_comments(self, tweet_id, cursor, max_pages=30, max_comments=None, index=None):
+        """ ScraperUtils._paginate_comments with the async client. """
+        comments = []
+        index = CommentIndex() if index is None else index
+        pages = 0
+
+        while cursor and pages < max_pages:
+            body = await self.graphql.fetch_tweet_detail(tweet_id, cursor)
+            if body is None:
+                if pages == 0:
+                    return None
+                break
+            pages += 1
+
+            parsed = TweetDetailParser.parse(body, with_main=False, index=index)
+            comments.extend(parsed["comments"])
+
+            if max_comments and len(comments) >= max_comments:
+                ScraperUtils.log_info(f"Comment budget of {max_comments} reached after {pages} pages.")
+                break
+            cursor = parsed["cursor"]
+
+        if max_comments:
+            comments = comments[:max_comments]
+        ScraperUtils.log_info(f"Fetched {len(comments)} additional comments over {pages} cursor pages.")
+        return comments
+
+    async def extract_comments(self, page, max_scrolls=30, max_no_change=3, index: CommentIndex = None,
+                               captured=None, tweet_id=None, max_comments=None, scroll_timeout=3000):
+        """
+        Async port of ScraperUtils.extract_comments: follows the Bottom cursor of the captured
+        responses with direct calls when the client is ready, otherwise scrolls `page` and parses
+        the TweetDetail responses it triggers, each scroll waiting for the next one.
+        """
+        index = CommentIndex() if index is None else index
+        if self.graphql is not None and self.graphql.ready and tweet_id:
+            cursor = ScraperUtils.last_cursor(captured)
+            if not cursor:
+                ScraperUtils.log_info("No Bottom cursor in captured responses; conversation is complete.")
+                return []
+            paged = await self._paginate_comments(tweet_id, cursor, max_pages=max_scrolls,
+                                                  max_comments=max_comments, index=index)
+            if paged is not None or page is None:
+                return paged or []
+            ScraperUtils.log_info("Cursor pagination failed; falling back to scrolling.")
+
+        comments = []
+        captured = []
+        parsed_upto = 0
+
+        def collect_new():
+            nonlocal parsed_upto
+            while parsed_upto < len(captured):
+                data = captured[parsed_upto]
+                parsed_upto += 1
+                try:
+                    comments.extend(TweetDetailParser.parse_comments(data, index=index))
+                except Exception:
+                    pass
+
+        handle_response = self._tweet_detail_listener(captured)
+        page.on("response", handle_response)
+        try:
+            last_height = await page.evaluate("document.body.scrollHeight")
+            scrolls = 0
+            no_change_count = 0
+            while scrolls < max_scrolls and no_change_count < max_no_change:
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight);")
+                # Returns as soon as the next comment batch arrives
+                await AsyncWaitUtils.wait_for_response(page, ScraperUtils.is_tweet_detail, timeout=scroll_timeout)
+
+                for selector in SHOW_BUTTON_SELECTORS:
+                    try:
+                        locator = page.locator(selector)
+                        for i in range(await locator.count()):
+                            btn = locator.nth(i)
+                            if await btn.is_visible():
+                                await btn.click()
+                                await AsyncWaitUtils.wait_for_dom_mutation(page, timeout=500)
+                                no_change_count = 0
+                    except Exception:
+                        pass
+
+                new_height = await page.evaluate("document.body.scrollHeight")
+                if new_height == last_height:
+                    no_change_count += 1
+                else:
+                    no_change_count = 0
+                    last_height = new_height
+                scrolls += 1
+
+                collect_new()
+                if max_comments and len(comments) >= max_comments:
+                    ScraperUtils.log_info(f"Comment budget of {max_comments} reached; stopping scroll.")
+                    break
+        finally:
+            page.remove_listener("response", handle_response)
+
+        collect_new()
+        if max_comments:
+            comments = comments[:max_comments]
+        ScraperUtils.log_info(f"Extracted {len(comments)} additional comments via scroll.")
+        return comments
+
+    async def close(self):
+        await self.browser_engine.quit_driver()
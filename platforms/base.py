@@ -1,12 +1,73 @@
+from datetime import datetime, timezone
 from core.utils import ScraperUtils
 from core.insta_utils import InstaUtils
+from core.waits import Pacing, WaitUtils
+from core.metrics import RunMetrics
 
 class ScraperBase:
-    def __init__(self, headless: bool = True, user_data_dir: str = None):
+    # Platform name used in metrics labels
+    PLATFORM = None
+
+    def __init__(self, headless: bool = True, user_data_dir: str = None, pacing: Pacing = None):
         self.headless = headless
         self.user_data_dir = user_data_dir
         self.utils = ScraperUtils
         self.insta_utils = InstaUtils
+        self.waits = WaitUtils
+        self.pacing = pacing or Pacing()
+        # ResourceBlocker of the browser engine, set by the platform scrapers (None = nothing blocked)
+        self.resource_blocker = None
+        # NetworkCache of the browser engine, set by the platform scrapers (None = live network)
+        self.network_cache = None
+        # Stage timings and counters of the current run (see RunMetrics.STAGES)
+        self.metrics = RunMetrics(platform=self.PLATFORM)
+
+    def pause(self, name: str):
+        """ Pacing delay, timed as the 'delay' stage. """
+        with self.metrics.span("delay"):
+            self.pacing.pause(name)
+
+    async def async_pause(self, name: str):
+        """ pause() for the async scrapers. """
+        with self.metrics.span("delay"):
+            await self.pacing.async_pause(name)
+
+    @staticmethod
+    def _to_datetime(value):
+        # X timestamps look like "Wed Oct 10 20:19:24 +0000 2018", Instagram's are ISO 8601 and
+        # filters may be plain dates; naive values are taken as UTC so all of them compare
+        if isinstance(value, datetime):
+            dt = value
+        else:
+            dt = None
+            for convert in (ScraperUtils.convert_date, InstaUtils.convert_date):
+                try:
+                    dt = convert(value)
+                except Exception:
+                    dt = None
+                if dt is not None:
+                    break
+        if dt is not None and dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt
+
+    @staticmethod
+    def _within_date_range(post, start_time: str = None, end_time: str = None) -> bool:
+        post_time = post.get("timestamp")
+        if not post_time or not (start_time or end_time):
+            return True
+        post_time_dt = ScraperBase._to_datetime(post_time)
+        if post_time_dt is None:
+            return True
+        if start_time:
+            st = ScraperBase._to_datetime(start_time)
+            if st and post_time_dt < st:
+                return False
+        if end_time:
+            et = ScraperBase._to_datetime(end_time)
+            if et and post_time_dt > et:
+                return False
+        return True
 
     def close(self):
-        pass
\ No newline at end of file
+        pass
@@ -1,17 +1,174 @@
 import time
 import re
-from tqdm import tqdm
+import msgspec
+from collections import deque
+from contextlib import contextmanager
 from urllib.parse import urlparse
 from playwright.sync_api import TimeoutError, ElementHandle
 from platforms.base import ScraperBase
 from core.browser import BrowserEngine
 from core.insta_utils import InstaUtils
+from core.insta_parser import InstaGraphQLParser
+from core.decoding import LazyJson, loads
+from core.waits import Pacing, WaitUtils
+from core.seen_index import SeenIndex
+from core.network_cache import NetworkCache
+from core.checkpoint import Checkpoint
+from core.models import InstaComment, InstaPost, to_int
+
+POST_LINKS = "xpath=//a[contains(@href, '/p/') or contains(@href, '/reel/')]"
+SHORTCODE = re.compile(r'/(?:p|reel)/([A-Za-z0-9_-]+)')
+POST_URL = re.compile(r'^https?://www\.instagram\.com/(p|reel)/[A-Za-z0-9_-]+/?$')
+# Absolute hrefs of the post links on a feed, read in one round trip
+POST_HREFS_JS = """
+() => Array.from(document.querySelectorAll('a[href*="/p/"], a[href*="/reel/"]')).map(a => a.href)
+"""
+# DOM fallback selectors, shared with AsyncInstagramScraper
+MEDIA_IMG_SELECTORS = ["//main//div//ul//img", "//main/div[1]/div[1]/div[1]/div[1]/div[1]//img",
+                       "//main/div[1]/div[1]//div[@role='button']/div//img[1]"]
+LIKES_SELECTORS = ["//main[1]//section[1]/div[1]/span[2]",
+                   "//main[1]//section[2]/div[1]/div[1]/span[1]/a[1]/span[1]/span[1]"]
+COMMENT_SCROLL_SELECTORS = ["//main//hr[1]/following-sibling::div[1]", "//div[contains(@class, 'comments')]"]
+COMMENT_MAIN_SELECTORS = ["//main//hr[1]/following::div[1]/div[1]", "//article//section/following-sibling::div[1]/div[1]",
+                          "//div[contains(@class, 'comments')]/div[1]"]
+COMMENT_CONTAINER_SELECTORS = ["./div", "./ul/li", "./div[contains(@role, 'presentation')]/div"]
+# Texts of the JSON script bundles that carry server-rendered query results, in one round trip
+EMBEDDED_JSON_JS = """
+() => Array.from(document.querySelectorAll('script[type="application/json"]'))
+    .map(s => s.textContent)
+    .filter(t => t.includes('xdt_api__v1__media'))
+"""
+# Collects every img/video URL of the post's carousel, like _carousel_media_stepwise but in one
+# round trip. Next is clicked until it is gone or after maxSteps clicks; each click waits for the
+# slide list to change (new slide or src), at most `timeout` ms, instead of a fixed delay.
+CAROUSEL_JS = r"""
+async ([imgSelectors, timeout, maxSteps]) => {
+    const all = xpath => {
+        const result = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        return Array.from({length: result.snapshotLength}, (_, i) => result.snapshotItem(i));
+    };
+    const urls = [];
+    const seen = new Set();
+    const add = src => {
+        if (src && src.startsWith("https://") && !seen.has(src)) {
+            seen.add(src);
+            urls.push(src);
+        }
+    };
+    const collect = () => {
+        for (const selector of imgSelectors) {
+            const imgs = all(selector);
+            if (imgs.length) {
+                imgs.forEach(img => add(img.getAttribute("src")));
+                break;
+            }
+        }
+        for (const video of all("//video")) {
+            add(video.getAttribute("src"));
+            video.querySelectorAll("source").forEach(source => add(source.getAttribute("src")));
+        }
+    };
+    const changed = target => new Promise(resolve => {
+        const observer = new MutationObserver(() => { observer.disconnect(); resolve(true); });
+        observer.observe(target, {subtree: true, childList: true, attributes: true, attributeFilter: ["src"]});
+        setTimeout(() => { observer.disconnect(); resolve(false); }, timeout);
+    });
+
+    collect();
+    let clicks = 0;
+    while (clicks < maxSteps) {
+        const next = all("//button[@aria-label='Next' and ancestor::main]")[0];
+        if (!next) break;
+        const mutation = changed(document.querySelector("main ul") || document.body);
+        next.click();
+        clicks++;
+        await mutation;
+        collect();
+    }
+    return {urls, clicks};
+}
+"""
+
+
+class PostPayloads:
+    """
+    The post of one href and its comments, collected from GraphQL bodies as they arrive. add()
+    parses the bodies it is given; follow() parses only the bodies appended to a capture list
+    since its last call. Both return whether the post has been found.
+    """
+    def __init__(self, href: str):
+        match = SHORTCODE.search(href)
+        self.href = href
+        self.code_url = InstaGraphQLParser.POST_URL.format(code=match.group(1)) if match else None
+        self._post = None
+        self._comments = []
+        self._followed = 0
+
+    def add(self, bodies) -> bool:
+        for body in bodies:
+            parsed = InstaGraphQLParser.parse(body)
+            if self._post is None:
+                self._post = next((p for p in parsed["posts"] if p.url == self.code_url), None)
+            self._comments.extend(parsed["comments"])
+        return self._post is not None
+
+    def follow(self, captured: list) -> bool:
+        new = captured[self._followed:]
+        self._followed += len(new)
+        return self.add(new)
+
+    def post(self) -> InstaPost | None:
+        """ The post with its inlined and paged comments, de-duplicated; None if it was not found. """
+        if self._post is None:
+            return None
+        seen = set()
+        merged = []
+        for c in self._post.comments + self._comments:
+            key = (c.username, c.time, c.message)
+            if key not in seen:
+                seen.add(key)
+                merged.append(c)
+        return msgspec.structs.replace(self._post, url=self.href, comments=merged)
+
 
 class InstagramScraper(ScraperBase):
-    def __init__(self, headless: bool = True, user_data_dir: str = None):
-        super().__init__(headless=headless, user_data_dir=user_data_dir)
+    PLATFORM = 'instagram'
+    # Upper bounds for event waits; they return as soon as the event arrives
+    FEED_LOAD_TIMEOUT = 10000
+    SCROLL_TIMEOUT = 3000
+    CAROUSEL_TIMEOUT = 2000
+    POST_LOAD_TIMEOUT = 8000
+    CAROUSEL_MAX_STEPS = 50
+    MAX_SCROLLS = 30
+
+    def __init__(self, headless: bool = True, user_data_dir: str = None, pacing: Pacing = None,
+                 seen_index: SeenIndex = None, block_resources="default", network_cache: NetworkCache = None,
+                 concurrency: int = 1, pipeline: bool = True, detail_tab: bool = True,
+                 batch_comments: bool = True):
+        super().__init__(headless=headless, user_data_dir=user_data_dir,
+                         pacing=pacing or Pacing(between_posts=(2.0, 4.0)))
+        # Posts scraped by earlier runs are skipped during collection (None = no persistence)
+        self.seen_index = seen_index
         self.insta_utils = InstaUtils()
-        self.browser = BrowserEngine(headless=headless, user_data_dir=user_data_dir)
+        # Media src attributes are still read from the DOM; the files themselves are not downloaded.
+        # Stylesheets load: the XPath selectors depend on the rendered layout
+        if block_resources == "default":
+            block_resources = "instagram"
+        self.browser = BrowserEngine(headless=headless, user_data_dir=user_data_dir,
+                                     block_resources=block_resources, network_cache=network_cache)
+        self.resource_blocker = self.browser.blocker
+        self.network_cache = network_cache
+        # Tabs visiting posts while the feed is scrolled (pipeline), or posts visited one by one
+        # on the feed tab after collection (pipeline=False)
+        self.concurrency = max(1, concurrency)
+        self.pipeline = pipeline
+        # Without the pipeline, posts open in a second, reused tab so the feed is never reloaded
+        # (False = visit on the feed tab and navigate back to the feed at the end)
+        self.detail_tab = detail_tab
+        self._detail_page = None
+        # DOM comments read in one page.evaluate (COMMENTS_JS); False (or a failed or empty
+        # batch) reads the containers element by element
+        self.batch_comments = batch_comments
 
         self.page = None
 
@@ -202,97 +359,394 @@ class InstagramScraper(ScraperBase):
         return False
 
     def blind_scrape(self, url: str = None, max_posts=10):
+        return list(self.iter_blind_scrape(url=url, max_posts=max_posts))
+
+    def iter_blind_scrape(self, url: str = None, max_posts=10, checkpoint: Checkpoint = None):
         self.setup_page()
-        self.page.goto(url)
-        result = self.search(text=None, max_posts=max_posts)
-        return result
+        if not (checkpoint is not None and checkpoint.collection_done):
+            with self.metrics.span("navigation"):
+                self.page.goto(url)
+        yield from self.iter_search(text=None, max_posts=max_posts, checkpoint=checkpoint)
+
     def extract_posts(self):
         result = self.search(text=None)
         return result
 
-    def search(self, text: str = None, start_time: str = None, end_time: str = None, max_posts=5):
+    def search(self, text: str = None, start_time: str = None, end_time: str = None, max_posts=5,
+               checkpoint: Checkpoint = None):
+        # Posts completed before a crash are only in the checkpoint
+        earlier = checkpoint.posts() if checkpoint is not None else []
+        return earlier + list(self.iter_search(text=text, start_time=start_time, end_time=end_time,
+                                               max_posts=max_posts, checkpoint=checkpoint))
+
+    def iter_search(self, text: str = None, start_time: str = None, end_time: str = None, max_posts=5,
+                    checkpoint: Checkpoint = None):
+        """
+        Generator version of search: yields each post as soon as it is scraped.
+        With checkpoint, progress is saved after every scroll round and post; a run that stopped
+        early resumes with its collected hrefs and scroll position and only visits the posts not
+        done yet. A post that fails is logged and skipped (and retried on resume).
+        """
         self.setup_page()
-        if text:
+        collecting = checkpoint is None or not checkpoint.collection_done
+        if not collecting:
+            # Phase 1 already finished: no need to load the feed again
+            self.insta_utils.log_info(f"Resuming with {len(checkpoint.pending(checkpoint.hrefs))} posts left to visit")
+        elif text:
             target = self.insta_utils.prepare_target(text)
             if not target:
                 self.insta_utils.log_error("Could not build target URL from text.")
-                return []
-            self.page.goto(target)
-            time.sleep(3)
+                return
+            with self.metrics.span("navigation"):
+                self.page.goto(target)
+            with self.metrics.span("wait"):
+                WaitUtils.wait_for_count_increase(self.page, POST_LINKS, 0, timeout=self.FEED_LOAD_TIMEOUT)
         try:
             _ = self.page.url
         except Exception:
             self.insta_utils.log_error("No target and page not initialized.")
-            return []
-        try:
+            return
+        if collecting:
+            try:
 
-            article_selectors = ["article"]
-            self._find_element_with_selectors(article_selectors, by='tag')
-        except Exception:
-            pass
+                article_selectors = ["article"]
+                self._find_element_with_selectors(article_selectors, by='tag')
+            except Exception:
+                pass
         post_hrefs = []
         seen = set()
         scroll_rounds = 0
         current_url = self.page.url
-        post_anchor_selectors = ["//a[contains(@href, '/p/') or contains(@href, '/reel/')]"]
-        while len(post_hrefs) < max_posts and scroll_rounds < 30:
-            anchors = self._find_elements_with_selectors(post_anchor_selectors, by='xpath')
-            for a in anchors:
-                try:
-                    href = a.get_attribute("href")
-                    if href.startswith('/'):
-                        href = 'https://www.instagram.com' + href
-                    if href and re.match(r'^https?://www\.instagram\.com/(p|reel)/[A-Za-z0-9_-]+/?$', href) and href not in seen:
-                        seen.add(href)
-                        post_hrefs.append(href)
-                except:
+        if checkpoint is not None:
+            post_hrefs = list(checkpoint.hrefs)
+            seen.update(post_hrefs)
+            scroll_rounds = checkpoint.scroll_rounds
+            current_url = checkpoint.url or current_url
+            if collecting and post_hrefs:
+                self.insta_utils.log_info(f"Resuming collection at scroll round {scroll_rounds} with {len(post_hrefs)} posts")
+                with self.metrics.span("scroll"):
+                    self.page.evaluate("y => window.scrollTo(0, y)", checkpoint.scroll_y)
+        if self.pipeline:
+            # Posts are visited on separate tabs while the feed is still scrolled
+            visited = self._scrape_posts_pipelined(current_url, post_hrefs, seen, scroll_rounds, max_posts,
+                                                   checkpoint=checkpoint, collecting=collecting)
+        else:
+            while collecting and len(post_hrefs) < max_posts and scroll_rounds < self.MAX_SCROLLS:
+                self._collect_round(seen, post_hrefs)
+                scroll_rounds += 1
+                if checkpoint is not None:
+                    checkpoint.collected(current_url, post_hrefs, scroll_rounds, self.page.evaluate("window.scrollY"))
+            targets = post_hrefs[:max_posts]
+            if checkpoint is not None:
+                if collecting:
+                    checkpoint.collected(current_url, post_hrefs, scroll_rounds, checkpoint.scroll_y, finished=True)
+                targets = checkpoint.pending(targets)
+            visited = self._scrape_posts_sequential(targets)
+        for href, post in visited:
+            if post is None:
+                self.insta_utils.log_error(f"Failed to scrape post {href}, continuing with the next one.")
+                if checkpoint is not None:
+                    checkpoint.post_failed(href)
+                continue
+            if not self._within_date_range(post, start_time, end_time):
+                if checkpoint is not None:
+                    checkpoint.post_done(href)
+                continue
+            self.metrics.count_post(post)
+            yield post
+            # Only once the consumer has taken the post; a post outside the date range stays
+            # unseen, so a later run with another range still visits it
+            if self.seen_index is not None:
+                with self.metrics.span("persist"):
+                    self.seen_index.mark(href, post)
+            if checkpoint is not None:
+                with self.metrics.span("persist"):
+                    checkpoint.post_done(href, post)
+        if checkpoint is not None:
+            checkpoint.finish()
+        if not (self.pipeline or self.detail_tab):
+            with self.metrics.span("navigation"):
+                self.page.goto(current_url)
+            self.pause("feed_return")
+
+    def _collect_round(self, seen: set, post_hrefs: list) -> int:
+        """ Reads the post links on the feed, then scrolls it once. Returns the number of new hrefs. """
+        try:
+            hrefs = self.page.evaluate(POST_HREFS_JS)
+        except Exception:
+            hrefs = []
+        found = self._accept_hrefs(hrefs, seen, post_hrefs, self.seen_index)
+        with self.metrics.span("scroll"):
+            self.insta_utils.scroll_page(self.page, pause=self.SCROLL_TIMEOUT / 1000, max_scrolls=2)
+        self.pause("between_scrolls")
+        return found
+
+    @staticmethod
+    def _accept_hrefs(hrefs, seen: set, post_hrefs: list, seen_index: SeenIndex = None) -> int:
+        """ Appends the post hrefs not seen before to post_hrefs; shared with AsyncInstagramScraper. """
+        found = 0
+        for href in hrefs:
+            if href and POST_URL.match(href) and href not in seen:
+                seen.add(href)
+                if seen_index is not None and not seen_index.should_visit(href):
                     continue
-            self.insta_utils.random_delay(1.0, 2.0)
-            self.insta_utils.scroll_page(self.page, pause=1.5, max_scrolls=2)
-            scroll_rounds += 1
-        results = []
-        for href in post_hrefs[:max_posts]:
+                post_hrefs.append(href)
+                found += 1
+        return found
+
+    def _detail(self):
+        """ The tab posts are opened in when detail_tab is on; created on first use, kept between runs. """
+        if self._detail_page is None or self._detail_page.is_closed():
+            self._detail_page = self.browser.new_page()
+        return self._detail_page
+
+    def _scrape_posts_sequential(self, hrefs):
+        """
+        Visits the posts one by one, in the detail tab or on self.page (detail_tab=False).
+        Yields (href, post); post is None when scraping failed.
+        """
+        page = self._detail() if self.detail_tab else self.page
+        try:
+            page.bring_to_front()
+            for href in hrefs:
+                try:
+                    post = self._scrape_single_post(href, page=page)
+                except Exception as e:
+                    post = None
+                    self.insta_utils.log_error(f"Error scraping post {href}: {e}")
+                yield href, post
+                if post is not None:
+                    self.pause("between_posts")
+        finally:
+            if page is not self.page:
+                try:
+                    self.page.bring_to_front()
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _page_ready(page, captured: list) -> bool:
+        if captured:
+            return True
+        try:
+            return page.evaluate("document.readyState") != "loading"
+        except Exception:
+            # Still navigating
+            return False
+
+    def _scrape_posts_pipelined(self, current_url, post_hrefs, seen, scroll_rounds, max_posts,
+                                checkpoint: Checkpoint = None, collecting: bool = True):
+        """
+        Collection and visits overlapped as producer/consumer: self.page keeps scrolling the feed
+        and queues the post hrefs it finds, while `concurrency` extra tabs visit them. Navigations
+        only wait for "commit", so posts load inside the browser during the next scroll rounds; a
+        tab is parsed once its document or first GraphQL body is in. The queue holds at most two
+        hrefs per tab and the feed only scrolls while it has room. The feed tab never navigates
+        away, so there is no reload of the feed between posts.
+        Yields (href, post) as posts finish; post is None when scraping failed.
+        """
+        pending = post_hrefs[:max_posts]
+        queue = deque(checkpoint.pending(pending) if checkpoint is not None else pending)
+        queue_size = 2 * self.concurrency
+        timeout = self.POST_LOAD_TIMEOUT / 1000
+        pages = []
+        in_flight = []
+        try:
+            for _ in range(self.concurrency):
+                pages.append(self.browser.new_page())
+            idle = list(pages)
+
+            while True:
+                if collecting and (len(post_hrefs) >= max_posts or scroll_rounds >= self.MAX_SCROLLS):
+                    collecting = False
+                    self.insta_utils.log_info(f"Collection complete: {len(post_hrefs)} posts")
+                    if checkpoint is not None:
+                        checkpoint.collected(current_url, post_hrefs, scroll_rounds, checkpoint.scroll_y, finished=True)
+
+                # Consumer: start loading queued hrefs on idle tabs
+                while idle and queue:
+                    href = queue.popleft()
+                    page = idle.pop()
+                    try:
+                        captured, listener = self._start_visit(page, href)
+                        in_flight.append((page, href, captured, listener, time.monotonic()))
+                    except Exception as e:
+                        self.insta_utils.log_error(f"Navigation failed for {href}: {e}")
+                        idle.append(page)
+                        yield href, None
+
+                # Producer: one feed round while the queue has room
+                if collecting and len(queue) < queue_size:
+                    before = len(post_hrefs)
+                    try:
+                        self.page.bring_to_front()
+                    except Exception:
+                        pass
+                    self._collect_round(seen, post_hrefs)
+                    scroll_rounds += 1
+                    queue.extend(post_hrefs[before:max_posts])
+                    if checkpoint is not None:
+                        checkpoint.collected(current_url, post_hrefs, scroll_rounds, self.page.evaluate("window.scrollY"))
+                    now = time.monotonic()
+                    ready = [e for e in in_flight if now - e[4] > timeout or self._page_ready(e[0], e[2])]
+                elif in_flight:
+                    now = time.monotonic()
+                    ready = [e for e in in_flight if now - e[4] > timeout or self._page_ready(e[0], e[2])]
+                    ready = ready or in_flight[:1]
+                else:
+                    break
+
+                for entry in ready:
+                    page, href, captured, listener, _ = entry
+                    in_flight.remove(entry)
+                    post = None
+                    try:
+                        page.bring_to_front()
+                        post = self._finish_visit(page, href, captured, listener)
+                    except Exception as e:
+                        self.insta_utils.log_error(f"Error scraping post {href}: {e}")
+                    idle.append(page)
+                    yield href, post
+                    if post is not None:
+                        self.pause("between_posts")
+        finally:
+            for page, _, _, listener, _ in in_flight:
+                try:
+                    page.remove_listener("response", listener)
+                except Exception:
+                    pass
+            for page in pages:
+                try:
+                    page.close()
+                except Exception:
+                    pass
             try:
-                post = self._scrape_single_post(href)
-                if post is None:
-                    self.insta_utils.log_error(f"Failed to scrape post {href}, saving scraped posts so far.")
-                    return results
-                post_time = post.get("timestamp")
-                if post_time and (start_time or end_time):
-                    keep = True
-                    if start_time:
-                        st = self.insta_utils.convert_date(start_time)
-                        if st and post_time < st:
-                            keep = False
-                    if end_time:
-                        et = self.insta_utils.convert_date(end_time)
-                        if et and post_time > et:
-                            keep = False
-                    if not keep:
-                        continue
-                results.append(post)
-                self.insta_utils.random_delay(2.0, 4.0)
-            except Exception as e:
-                self.insta_utils.log_error(f"Error scraping post {href}: {e}")
-                return results
-        self.page.goto(current_url)
-        self.insta_utils.random_delay(1.0, 2.0)
-        return results
-    def _scrape_single_post(self, href: str) -> dict | None:
-        data = {
-            "url": href,
-            "likes": None,
-            "timestamp": None,
-            "author": None,
-            "caption": None,
-            "mentions": [],
-            "hashtags": [],
-            "media": [],
-            "comments": []
-        }
+                self.page.bring_to_front()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _graphql_listener(captured: list, metrics=None):
+        def handle_response(response):
+            try:
+                if InstaUtils.is_graphql(response):
+                    if metrics is None:
+                        body = response.body()
+                    else:
+                        with metrics.span("interception"):
+                            body = response.body()
+                        metrics.add("responses_intercepted")
+                        metrics.add("bytes_intercepted", len(body))
+                    # Decoded only when the parser reads it
+                    captured.append(LazyJson(body))
+            except Exception:
+                pass
+        return handle_response
+
+    def _remove_listener(self, listener):
+        try:
+            self.page.remove_listener("response", listener)
+        except Exception:
+            pass
+
+    def _embedded_payloads(self) -> list:
+        """ Post/comment query results the server inlined in the page instead of fetching them. """
+        try:
+            texts = self.page.evaluate(EMBEDDED_JSON_JS)
+        except Exception:
+            return []
+        return self._payloads_from_scripts(texts)
+
+    @staticmethod
+    def _payloads_from_scripts(texts) -> list:
+        """ The GraphQL payloads in the EMBEDDED_JSON_JS script texts. """
+        payloads = []
+        for text in texts:
+            try:
+                InstaGraphQLParser.find_payloads(loads(text), payloads)
+            except Exception:
+                continue
+        return payloads
+
+    def _scrape_post_graphql(self, href: str, captured: list) -> InstaPost | None:
+        """
+        Builds the post from its GraphQL payloads: inlined in the page or intercepted while it loads.
+        The comment list is then scrolled so Instagram fetches the remaining comment pages, which
+        are parsed from the captured bodies instead of being read element by element. Every body
+        is parsed once, however often the wait polls.
+        """
+        payloads = PostPayloads(href)
+        with self.metrics.span("parse"):
+            embedded = self._embedded_payloads()
+            found = payloads.add(embedded)
+        if not found:
+            with self.metrics.span("wait"):
+                found = WaitUtils.wait_until(self.page, lambda: payloads.follow(captured),
+                                             timeout=self.POST_LOAD_TIMEOUT)
+            if not found:
+                return None
+        with self.metrics.span("scroll"):
+            self._scroll_comments()
+        with self.metrics.span("parse"):
+            payloads.follow(captured)
+            post = payloads.post()
+        self.metrics.add("responses_parsed", len(embedded) + len(captured))
+        if post is not None:
+            self.insta_utils.log_success(f"Parsed post and {len(post['comments'])} comments from GraphQL")
+        return post
+
+    @contextmanager
+    def _using_page(self, page):
+        """ Points the element helpers (which work on self.page) at another tab for a while. """
+        feed_page = self.page
+        self.page = page
+        try:
+            yield page
+        finally:
+            self.page = feed_page
+
+    def _start_visit(self, page, href: str):
+        """ Starts loading href on page with a GraphQL listener. Returns (captured, listener). """
+        captured = []
+        listener = self._graphql_listener(captured, self.metrics)
+        page.on("response", listener)
+        try:
+            with self.metrics.span("navigation"):
+                page.goto(href, wait_until="commit")
+        except Exception:
+            page.remove_listener("response", listener)
+            raise
+        return captured, listener
+
+    def _finish_visit(self, page, href: str, captured: list, listener) -> InstaPost | None:
+        """ Builds the post loading on page: GraphQL payloads first, the DOM as fallback. """
+        with self._using_page(page):
+            try:
+                with self.metrics.span("wait"):
+                    # The inlined post JSON is part of the document
+                    page.wait_for_load_state("domcontentloaded", timeout=self.POST_LOAD_TIMEOUT * 2)
+                post = self._scrape_post_graphql(href, captured)
+            finally:
+                self._remove_listener(listener)
+            if post is not None:
+                return post
+            self.insta_utils.log_info("GraphQL data missing, falling back to DOM extraction...")
+            with self.metrics.span("parse"):
+                return self._scrape_post_dom(href)
+
+    def _scrape_single_post(self, href: str, page=None) -> InstaPost | None:
+        page = page or self.page
+        try:
+            captured, listener = self._start_visit(page, href)
+        except Exception as e:
+            self.insta_utils.log_error(f"Navigation failed for {href}: {e}")
+            return None
+        return self._finish_visit(page, href, captured, listener)
+
+    def _scrape_post_dom(self, href: str) -> InstaPost | None:
+        data = InstaPost(url=href)
         try:
-            self.page.goto(href)
-            self.insta_utils.random_delay(2.0, 4.0)
+            # The main container lookup below waits for the post to render
             main_selectors = ["//main[1]//hr[1]/following::div[1]"]
             main = self._find_element_with_selectors(main_selectors, by='xpath')
             if not main:
@@ -331,61 +785,11 @@ class InstagramScraper(ScraperBase):
                     data["timestamp"] = time_tag.get_attribute("datetime") or None
 
             # Likes
-            likes_selectors = ["//main[1]//section[1]/div[1]/span[2]", "//main[1]//section[2]/div[1]/div[1]/span[1]/a[1]/span[1]/span[1]"]
-
-            likes_el = self._find_element_with_selectors(likes_selectors, by='xpath', timeout=5)
-            data["likes"] = likes_el.text_content().strip() if likes_el else "0"
+            likes_el = self._find_element_with_selectors(LIKES_SELECTORS, by='xpath', timeout=5)
+            data["likes"] = to_int(likes_el.text_content().strip()) if likes_el else 0
 
             # Media
-            media_urls = []
-            media_set = set()
-            max_steps = 50
-            steps = 0
-
-            while steps < max_steps:
-
-                steps += 1
-                img_selectors = ["//main//div//ul//img","//main/div[1]/div[1]/div[1]/div[1]/div[1]//img","//main/div[1]/div[1]//div[@role='button']/div//img[1]"]
-                imgs = self._find_elements_with_selectors(img_selectors, by='xpath',retries=1, wait=False)
-                for im in imgs:
-                    try:
-                        src = im.get_attribute("src")
-                        if src and src.startswith("https://") and src not in media_set:
-                            media_set.add(src)
-                            media_urls.append(src)
-                    except:
-                        continue
-                vid_selectors = ["//video"]
-                vids = self._find_elements_with_selectors(vid_selectors, by='xpath',retries=1, wait=False)
-                for v in vids:
-                    try:
-                        src = v.get_attribute("src")
-                        if src and src.startswith("https://") and src not in media_set:
-                            media_set.add(src)
-                            media_urls.append(src)
-                    except:
-                        continue
-                    source_selectors = ["source"]
-                    sources = self._find_child_elements(v, source_selectors, by='tag')
-                    for s in sources:
-                        try:
-                            ssrc = s.get_attribute("src")
-                            if ssrc and ssrc.startswith("https://") and ssrc not in media_set:
-                                media_set.add(ssrc)
-                                media_urls.append(ssrc)
-                        except:
-                            continue
-                # Next button
-                next_selectors = ["//button[@aria-label='Next' and ancestor::main]"]
-                next_btn = self._find_element_with_selectors(next_selectors, by='xpath', wait=False,retries=1)
-                if not next_btn:
-                    break
-                try:
-                    next_btn.click()
-                except Exception:
-                    self.page.evaluate("btn => btn.click()", next_btn)
-                self.insta_utils.random_delay(1.0, 2.0)
-            data["media"] = media_urls
+            data["media"] = self._carousel_media()
             # Comments
             data["comments"] = self._extract_comments(href)
             return data
@@ -393,22 +797,67 @@ class InstagramScraper(ScraperBase):
             self.insta_utils.log_error(f"_scrape_single_post failed for {href}: {e}")
             return None
 
-    def _extract_comments(self, href: str):
-        comments = []
-        seen = set()
-        # Scroll to load comments (try multiple selectors until success)
-        comment_scroll_selectors = ["//main//hr[1]/following-sibling::div[1]", "//div[contains(@class, 'comments')]"]
-        scrolled = False
+    def _carousel_media(self) -> list:
+        """ The carousel media read inside the page in one call; a failed or empty read walks it step by step. """
+        try:
+            carousel = self.page.evaluate(CAROUSEL_JS, [MEDIA_IMG_SELECTORS, self.CAROUSEL_TIMEOUT,
+                                                        self.CAROUSEL_MAX_STEPS])
+            if carousel["urls"]:
+                if carousel["clicks"]:
+                    self.insta_utils.log_info(f"Carousel: {len(carousel['urls'])} media after {carousel['clicks']} slides")
+                return carousel["urls"]
+        except Exception as e:
+            self.insta_utils.log_error(f"In-page carousel extraction failed, stepping through it: {e}")
+        return self._carousel_media_stepwise(self.page, self.CAROUSEL_TIMEOUT, self.CAROUSEL_MAX_STEPS)
 
-        for sel in comment_scroll_selectors:
-            locator = self.page.locator(f"xpath={sel}")  # Create Locator here
-            if self.insta_utils.scroll_until_end(self.page, locator):
-                scrolled = True
+    @staticmethod
+    def _carousel_media_stepwise(page, timeout: int, max_steps: int) -> list:
+        """ The carousel walked from Python: collect the rendered media, click Next, wait for the slide. """
+        media_urls = []
+
+        def add(src):
+            if src and src.startswith("https://") and src not in media_urls:
+                media_urls.append(src)
+
+        for _ in range(max_steps):
+            for selector in MEDIA_IMG_SELECTORS:
+                imgs = page.query_selector_all(f"xpath={selector}")
+                if imgs:
+                    for img in imgs:
+                        add(img.get_attribute("src"))
+                    break
+            for video in page.query_selector_all("xpath=//video"):
+                add(video.get_attribute("src"))
+                for source in video.query_selector_all("source"):
+                    add(source.get_attribute("src"))
+            next_btn = page.query_selector("xpath=//button[@aria-label='Next' and ancestor::main]")
+            if not next_btn:
                 break
-        if not scrolled:
-            self.insta_utils.log_info("Could not scroll comments section with any selector.")
-        main_selectors = ["//main//hr[1]/following::div[1]/div[1]", "//article//section/following-sibling::div[1]/div[1]", "//div[contains(@class, 'comments')]/div[1]"]
-        main = self._find_element_with_selectors(main_selectors, by='xpath')
+            try:
+                next_btn.click()
+            except Exception:
+                page.evaluate("btn => btn.click()", next_btn)
+            # The carousel slides (style/src changes) right after the click
+            WaitUtils.wait_for_dom_mutation(page, page.locator("main ul").first, timeout=timeout)
+        return media_urls
+
+    def _scroll_comments(self) -> bool:
+        # Scroll to load comments (try multiple selectors until success)
+        for sel in COMMENT_SCROLL_SELECTORS:
+            locator = self.page.locator(f"xpath={sel}")  # Create Locator here
+            try:
+                if self.insta_utils.scroll_until_end(self.page, locator):
+                    return True
+            except Exception:
+                continue
+        self.insta_utils.log_info("Could not scroll comments section with any selector.")
+        return False
+
+    def _extract_comments(self, href: str):
+        comments = []
+        with self.metrics.span("scroll"):
+            self._scroll_comments()
+        main = self._find_element_with_selectors(COMMENT_MAIN_SELECTORS, by='xpath')
         if not main:
             return comments
         block_selectors = ["./div", "./section", "./ul"]
@@ -423,14 +872,25 @@ class InstagramScraper(ScraperBase):
                 return []
         except:
             pass
-        container_selectors = ["./div", "./ul/li", "./div[contains(@role, 'presentation')]/div"]
+        container_selectors = COMMENT_CONTAINER_SELECTORS
+        if self.batch_comments:
+            try:
+                # All containers are parsed inside the page: one round trip however many comments there are
+                comments = [InstaComment.from_dict(c) for c in
+                            self.insta_utils.parse_instagram_comments(self.page, target_block, container_selectors)]
+            except Exception as e:
+                self.insta_utils.log_error(f"In-page comment extraction failed, reading containers one by one: {e}")
+            if comments:
+                self.insta_utils.log_info(f"Extracted {len(comments)} comments from the DOM")
+                return comments
         containers = self._find_child_elements(target_block, container_selectors, by='xpath')
-        for container in tqdm(containers, desc="Processing comments"):
+        for container in containers:
             try:
                 parsed = self.insta_utils.parse_instagram_comment(container)
                 if parsed:
-                    comments.append(parsed)
+                    comments.append(InstaComment.from_dict(parsed))
             except Exception as e:
                 self.insta_utils.log_error(f"Error processing comment container: {e}")
                 continue
-        return comments
\ No newline at end of file
+        self.insta_utils.log_info(f"Extracted {len(comments)} comments from the DOM")
+        return comments
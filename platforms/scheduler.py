@@ -0,0 +1,192 @@
+# platforms/scheduler.py
+import os
+import threading
+import time
+from core.job_queue import Job, JobQueue
+from core.sink import JsonlSink
+from core.utils import ScraperUtils
+from platforms.scraper_pool import SCRAPERS, ScraperPool
+from platforms.universal_scraper import UniversalScraper
+
+
+class _JobSink:
+    """ A job's view of its platform's shared sink: writes under the lock, close() only flushes. """
+    def __init__(self, sink: JsonlSink, lock: threading.Lock):
+        self._sink = sink
+        self._lock = lock
+        self.count = 0
+
+    def write(self, post):
+        with self._lock:
+            self._sink.write(post)
+        self.count += 1
+
+    def close(self):
+        with self._lock:
+            self._sink.flush()
+
+
+class PlatformSinks:
+    """
+    The default sink factory: one JSON Lines file per platform under data/ (<platform>_jobs.jsonl).
+
+    All workers of a platform write through the same JsonlSink behind a lock, so concurrent jobs
+    never interleave partial lines and the file is rotated by one writer only. Each job gets a
+    handle whose close() flushes the shared file; close() on the factory closes the files.
+    """
+    def __init__(self, **sink_options):
+        """ :param sink_options: JsonlSink keyword arguments (batch_size, max_bytes) """
+        self.sink_options = sink_options
+        self._sinks = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def __call__(self, job: Job) -> _JobSink:
+        with self._guard:
+            if job.platform not in self._sinks:
+                self._sinks[job.platform] = JsonlSink(f"{job.platform}_jobs.jsonl", **self.sink_options)
+                self._locks[job.platform] = threading.Lock()
+            return _JobSink(self._sinks[job.platform], self._locks[job.platform])
+
+    def close(self):
+        with self._guard:
+            for platform, sink in self._sinks.items():
+                with self._locks[platform]:
+                    sink.close()
+            self._sinks.clear()
+            self._locks.clear()
+
+
+class Scheduler:
+    """
+    Runs the jobs of a JobQueue on warm, pooled scrapers until stopped, instead of cron loops.
+
+    Each platform gets concurrency[platform] worker threads; that is its cap on parallel
+    browsers. A worker owns one ScraperPool (sync Playwright objects belong to the thread that
+    created them), starts its browser on its first job and keeps it logged in between jobs.
+    Workers claim due jobs from the queue, highest priority first; failures are retried by the
+    queue with backoff. Persistent profiles cannot be shared, so worker n of a platform uses
+    {user_data_dir}_{platform}_{n}; the first run logs each profile in once.
+
+        queue = JobQueue()
+        queue.add('x', '#Python', interval=3600, priority=5)
+        queue.add('instagram', '@nasa', interval=6 * 3600)
+        Scheduler(queue, concurrency={'x': 2, 'instagram': 1},
+                  pool_options={'x': {'headless': True, 'graphql_mode': True}}).run()
+    """
+    def __init__(self, queue: JobQueue, concurrency: dict = None, credentials: dict = None,
+                 pool_options: dict = None, sink_factory=None, seen_index_path: str = None,
+                 refresh_after: float = None, poll_interval: float = 5.0, user_data_dir: str = None):
+        """
+        :param concurrency: Worker threads per platform, e.g. {'x': 2, 'instagram': 1}
+        :param credentials: (username, password) per platform; None means the saved profile session
+        :param pool_options: ScraperPool/scraper keyword arguments per platform (headless, max_jobs, ...)
+        :param sink_factory: Called with each Job; returns the sink its posts are written to. It runs
+                             on the worker threads, so sinks it shares between jobs must be thread-safe.
+                             Default: PlatformSinks(), closed by join() once every worker has stopped
+        :param seen_index_path: SQLite file of scraped posts, so recurring queries only visit new posts
+        :param refresh_after: Seconds after which a seen post is scraped again (None = never)
+        :param poll_interval: Longest sleep of an idle worker before it checks the queue again
+        """
+        self.queue = queue
+        self.concurrency = {p.lower(): n for p, n in (concurrency or {'x': 1}).items() if n > 0}
+        for platform in self.concurrency:
+            if platform not in SCRAPERS:
+                raise ValueError(f"Unsupported platform: {platform}")
+        self.credentials = credentials or {}
+        self.pool_options = pool_options or {}
+        self.sink_factory = sink_factory if sink_factory is not None else PlatformSinks()
+        self.seen_index_path = seen_index_path
+        self.refresh_after = refresh_after
+        self.poll_interval = poll_interval
+        self.user_data_dir = user_data_dir or os.path.join(os.getcwd(), "chrome_profile")
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _idle_wait(self, platform: str) -> float:
+        next_due = self.queue.next_due(platform)
+        if next_due is None:
+            return self.poll_interval
+        return min(self.poll_interval, max(0.5, next_due - time.time()))
+
+    @staticmethod
+    def _target(job: Job) -> dict:
+        if job.mode == 'single':
+            return {"single_href": job.query}
+        if job.mode == 'blind':
+            return {"blind_url": job.query or None}
+        return {"search_text": job.query}
+
+    def _run_job(self, runner: UniversalScraper, job: Job, name: str):
+        ScraperUtils.log_info(f"[{name}] Job {job.id}: {job.mode} '{job.query}' (priority {job.priority})")
+        start = time.time()
+        try:
+            written = runner.run_to_sink(self.sink_factory(job), max_posts=job.max_posts, mode=job.mode,
+                                         **self._target(job))
+            if runner.last_error is not None:
+                raise runner.last_error
+        except Exception as e:
+            delay = self.queue.fail(job, e)
+            ScraperUtils.log_error(f"[{name}] Job {job.id} failed: {e}; next attempt in {delay:.0f}s")
+            return
+        self.queue.complete(job, written)
+        ScraperUtils.log_success(f"[{name}] Job {job.id}: {written} posts in {time.time() - start:.1f}s")
+
+    def _worker(self, platform: str, number: int):
+        name = f"{platform}-{number}"
+        username, password = self.credentials.get(platform, (None, None))
+        options = dict(self.pool_options.get(platform, {}))
+        options.setdefault("user_data_dir", f"{self.user_data_dir}_{platform}_{number}")
+        pool = None
+        runner = None
+        try:
+            while not self._stop.is_set():
+                job = self.queue.claim(platform)
+                if job is None:
+                    self._stop.wait(self._idle_wait(platform))
+                    continue
+                if pool is None:
+                    # Browsers start with the first job, not with the scheduler
+                    pool = ScraperPool(platform, username, password, size=1, **options)
+                    runner = UniversalScraper(pool=pool, seen_index_path=self.seen_index_path,
+                                              refresh_after=self.refresh_after)
+                self._run_job(runner, job, name)
+        finally:
+            if pool is not None:
+                pool.close()
+            if runner is not None and runner.seen_index is not None:
+                runner.seen_index.close()
+            ScraperUtils.log_info(f"[{name}] Worker stopped")
+
+    def start(self):
+        self._stop.clear()
+        for platform, workers in self.concurrency.items():
+            for number in range(workers):
+                thread = threading.Thread(target=self._worker, args=(platform, number),
+                                          name=f"scheduler-{platform}-{number}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        ScraperUtils.log_info(f"Scheduler started: {self.concurrency}, queue {self.queue.stats()}")
+
+    def stop(self):
+        """ Workers finish their current job, then exit. """
+        self._stop.set()
+
+    def join(self, timeout: float = None):
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = [t for t in self._threads if t.is_alive()]
+        if not self._threads and hasattr(self.sink_factory, "close"):
+            self.sink_factory.close()
+
+    def run(self):
+        """ Blocks until Ctrl+C; running jobs are finished before the workers exit. """
+        self.start()
+        try:
+            while any(t.is_alive() for t in self._threads):
+                time.sleep(1)
+        except KeyboardInterrupt:
+            ScraperUtils.log_info("Stopping scheduler after the running jobs...")
+            self.stop()
+        self.join()
+        ScraperUtils.log_info(f"Scheduler stopped: {self.queue.stats()}")
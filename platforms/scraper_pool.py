@@ -0,0 +1,166 @@
+# platforms/scraper_pool.py
+import os
+import time
+from platforms.instagram_scraper import InstagramScraper
+from platforms.x_scraper import XScraper
+from core.utils import ScraperUtils
+
+SCRAPERS = {
+    'x': XScraper,
+    'instagram': InstagramScraper,
+}
+
+
+class PooledScraper:
+    """ A logged-in scraper kept by ScraperPool, with the bookkeeping used to decide when to recycle it. """
+    def __init__(self, scraper, slot: int):
+        self.scraper = scraper
+        self.slot = slot
+        self.jobs = 0
+        self.created = time.time()
+        self.baseline_heap = ScraperPool.heap_size(scraper.page)
+
+
+class ScraperPool:
+    """
+    Keeps logged-in scrapers warm between runs, so a query no longer pays for a browser launch
+    and a login round trip.
+
+    Scrapers are created lazily (one per slot, up to `size`) and handed out with lease().
+    Before a lease the scraper is health-checked; after max_jobs leases, or once its JS heap
+    has grown by more than max_heap_growth_mb since login, it is closed and rebuilt.
+    Sync Playwright objects belong to the thread that created them, so use one pool per thread.
+    Slots after the first get their own profile dir (user_data_dir_1, ...) because two
+    persistent contexts cannot share one.
+
+        pool = ScraperPool('x', headless=True, size=1, max_jobs=20)
+        for query in queries:
+            results = UniversalScraper(pool=pool).run(search_text=query, max_posts=10)
+        pool.close()
+    """
+    def __init__(self, platform: str = 'x', username: str = None, password: str = None, size: int = 1,
+                 max_jobs: int = 50, max_heap_growth_mb: float = 512, user_data_dir: str = None,
+                 scraper_factory=None, **scraper_kwargs):
+        self.platform = platform.lower()
+        if self.platform not in SCRAPERS:
+            raise ValueError(f"Unsupported platform: {self.platform}")
+        # Builds each scraper from (user_data_dir=..., **scraper_kwargs); the platform's scraper class by default
+        self.scraper_factory = scraper_factory or SCRAPERS[self.platform]
+        self.username = username
+        self.password = password
+        self.size = max(1, size)
+        self.max_jobs = max_jobs
+        self.max_heap_growth_mb = max_heap_growth_mb
+        self.user_data_dir = user_data_dir
+        self.scraper_kwargs = scraper_kwargs
+        self._idle = []
+        self._busy = set()
+        self.stats = {"created": 0, "recycled": 0, "leases": 0}
+
+    @staticmethod
+    def heap_size(page) -> int:
+        """ Used JS heap of the page in bytes (Chromium only), 0 if unavailable. """
+        try:
+            return page.evaluate("() => (performance.memory && performance.memory.usedJSHeapSize) || 0")
+        except Exception:
+            return 0
+
+    def _profile_dir(self, slot: int):
+        if slot == 0:
+            return self.user_data_dir
+        return f"{self.user_data_dir or os.path.join(os.getcwd(), 'chrome_profile')}_{slot}"
+
+    def _free_slot(self) -> int:
+        used = {entry.slot for entry in self._idle} | {entry.slot for entry in self._busy}
+        return next(slot for slot in range(self.size) if slot not in used)
+
+    def _create(self, slot: int) -> PooledScraper:
+        scraper = self.scraper_factory(user_data_dir=self._profile_dir(slot), **self.scraper_kwargs)
+        if not scraper.login(username=self.username, password=self.password):
+            scraper.close()
+            raise Exception(f"{self.platform.capitalize()} login failed. Check credentials or network connection.")
+        self.stats["created"] += 1
+        ScraperUtils.log_info(f"Pool: started {self.platform} scraper in slot {slot}")
+        return PooledScraper(scraper, slot)
+
+    def _discard(self, entry: PooledScraper, reason: str):
+        ScraperUtils.log_info(f"Pool: recycling slot {entry.slot} after {entry.jobs} jobs ({reason})")
+        self.stats["recycled"] += 1
+        try:
+            entry.scraper.close()
+        except Exception as e:
+            ScraperUtils.log_error(f"Pool: closing slot {entry.slot} failed: {e}")
+
+    @staticmethod
+    def is_healthy(entry: PooledScraper) -> bool:
+        page = entry.scraper.page
+        try:
+            return page is not None and not page.is_closed() and page.evaluate("() => 1") == 1
+        except Exception:
+            return False
+
+    def _recycle_reason(self, entry: PooledScraper) -> str | None:
+        if self.max_jobs and entry.jobs >= self.max_jobs:
+            return "job limit"
+        if self.max_heap_growth_mb:
+            growth = self.heap_size(entry.scraper.page) - entry.baseline_heap
+            if growth > self.max_heap_growth_mb * 1024 * 1024:
+                return f"heap grew {growth / 1024 / 1024:.0f} MB"
+        return None
+
+    def acquire(self) -> PooledScraper:
+        while self._idle:
+            entry = self._idle.pop()
+            if self.is_healthy(entry):
+                break
+            self._discard(entry, "failed health check")
+        else:
+            if len(self._busy) >= self.size:
+                raise RuntimeError(f"All {self.size} pooled {self.platform} scrapers are in use")
+            entry = self._create(self._free_slot())
+        self._busy.add(entry)
+        self.stats["leases"] += 1
+        return entry
+
+    def release(self, entry: PooledScraper, failed: bool = False):
+        self._busy.discard(entry)
+        entry.jobs += 1
+        entry.scraper.seen_index = None
+        reason = "run failed" if failed and not self.is_healthy(entry) else self._recycle_reason(entry)
+        if reason:
+            self._discard(entry, reason)
+        else:
+            self._idle.append(entry)
+
+    def lease(self):
+        """ Context manager yielding a logged-in scraper that goes back to the pool afterwards. """
+        return _Lease(self)
+
+    def close(self):
+        for entry in self._idle + list(self._busy):
+            try:
+                entry.scraper.close()
+            except Exception:
+                pass
+        self._idle = []
+        self._busy = set()
+        ScraperUtils.log_info(f"Pool closed: {self.stats}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _Lease:
+    def __init__(self, pool: ScraperPool):
+        self.pool = pool
+        self.entry = None
+
+    def __enter__(self):
+        self.entry = self.pool.acquire()
+        return self.entry.scraper
+
+    def __exit__(self, exc_type, exc, tb):
+        self.pool.release(self.entry, failed=exc_type is not None)
@@ -0,0 +1,161 @@
+# platforms/sharded_runner.py
+import multiprocessing
+import os
+import queue as queue_module
+import socket
+from core.job_queue import JobQueue
+from core.sharding import HashRing, clone_profile
+from core.utils import ScraperUtils
+
+
+def _shard_worker(platform, shard, items, mode, max_posts, profile_dir, username, password,
+                  seen_index_path, pool_options, results):
+    """ Runs in its own process: one warm browser for all items of the shard, posts sent back on results. """
+    # Imported here so the parent process never loads Playwright
+    from platforms.scraper_pool import ScraperPool
+    from platforms.universal_scraper import UniversalScraper
+
+    target = {'single': 'single_href', 'blind': 'blind_url'}.get(mode, 'search_text')
+    written, errors = 0, []
+    try:
+        with ScraperPool(platform, username, password, size=1, user_data_dir=profile_dir, **pool_options) as pool:
+            runner = UniversalScraper(pool=pool, seen_index_path=seen_index_path)
+            for item in items:
+                for post in runner.iter_run(max_posts=max_posts, mode=mode, **{target: item}):
+                    results.put(("post", shard, post))
+                    written += 1
+                if runner.last_error is not None:
+                    errors.append(f"{item}: {runner.last_error}")
+            if runner.seen_index is not None:
+                runner.seen_index.close()
+    except Exception as e:
+        errors.append(str(e))
+    results.put(("done", shard, written, errors))
+
+
+class ShardedRunner:
+    """
+    Splits a list of queries (or post/page URLs) across browser worker processes, so one box
+    uses all its cores and several boxes can share one list.
+
+    Items are assigned by consistent hashing (HashRing) over the shards "<node>/<worker>", so a
+    query lands on the same worker every run. Each worker process gets its own profile dir under
+    profile_root (persistent profiles cannot be shared), cloned from template_profile, a
+    logged-in profile such as ./chrome_profile, when one is given. Posts from all workers are
+    merged into the caller's sink by the parent process, so any sink works (JsonlSink, MongoSink).
+
+    With several hosts, list them all in nodes and set node to this host: every host computes
+    the same partition and runs (or enqueue()s into its local JobQueue) only its own share.
+
+        runner = ShardedRunner('x', workers=4, template_profile="chrome_profile", headless=True)
+        runner.run_to_sink(JsonlSink("x_sharded.jsonl"), ["#Python", "#Rust", "#Go"], max_posts=20)
+    """
+    def __init__(self, platform: str = 'x', workers: int = None, node: str = None, nodes=None,
+                 template_profile: str = None, profile_root: str = None, username: str = None,
+                 password: str = None, seen_index_path: str = None, **pool_options):
+        """
+        :param workers: Worker processes on this host (default: one per CPU core)
+        :param node: Name of this host in nodes (default: the hostname)
+        :param nodes: All hosts sharing the item list; each runs the same number of workers
+        :param template_profile: Logged-in Chrome profile copied into each new worker profile
+        :param profile_root: Directory of the worker profiles (default: ./chrome_profiles)
+        :param seen_index_path: SQLite seen index shared by the workers of this host
+        :param pool_options: ScraperPool/scraper options for each worker (headless, graphql_mode, ...,
+                             or a picklable scraper_factory)
+        """
+        self.platform = platform.lower()
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.node = node or socket.gethostname()
+        self.nodes = list(nodes or [self.node])
+        if self.node not in self.nodes:
+            raise ValueError(f"Node {self.node} is not in {self.nodes}")
+        self.template_profile = template_profile
+        self.profile_root = profile_root or os.path.join(os.getcwd(), "chrome_profiles")
+        self.username = username
+        self.password = password
+        self.seen_index_path = seen_index_path
+        self.pool_options = pool_options
+        self.ring = HashRing(f"{host}/{worker}" for host in self.nodes for worker in range(self.workers))
+
+    def local_shards(self, items) -> dict:
+        """ {shard: [items]} of this node's workers, empty shards left out. """
+        prefix = f"{self.node}/"
+        return {shard: shard_items for shard, shard_items in self.ring.partition(items).items()
+                if shard.startswith(prefix) and shard_items}
+
+    def _profile_dir(self, shard: str) -> str:
+        profile_dir = os.path.join(self.profile_root, f"{self.platform}_{shard.rsplit('/', 1)[1]}")
+        if self.template_profile:
+            clone_profile(self.template_profile, profile_dir)
+        return profile_dir
+
+    def iter_run(self, items, mode: str = 'search', max_posts: int = 10):
+        """ Yields the posts of this node's share of items as the workers produce them. """
+        shards = self.local_shards(items)
+        if not shards:
+            ScraperUtils.log_info(f"No items for node {self.node}")
+            return
+        # spawn: forking a process that already runs Playwright's event loop is not safe
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue(maxsize=1000)
+        processes = {}
+        for shard, shard_items in shards.items():
+            process = context.Process(
+                target=_shard_worker, name=f"shard-{shard}", daemon=True,
+                args=(self.platform, shard, shard_items, mode, max_posts, self._profile_dir(shard),
+                      self.username, self.password, self.seen_index_path, self.pool_options, results),
+            )
+            process.start()
+            processes[shard] = process
+            ScraperUtils.log_info(f"Shard {shard}: {len(shard_items)} items (pid {process.pid})")
+
+        running = set(processes)
+        try:
+            while running:
+                try:
+                    message = results.get(timeout=5)
+                except queue_module.Empty:
+                    for shard in [s for s in running if not processes[s].is_alive()]:
+                        ScraperUtils.log_error(f"Shard {shard} exited with code {processes[shard].exitcode}")
+                        running.discard(shard)
+                    continue
+                if message[0] == "post":
+                    yield message[2]
+                    continue
+                _, shard, written, errors = message
+                running.discard(shard)
+                for error in errors:
+                    ScraperUtils.log_error(f"Shard {shard}: {error}")
+                ScraperUtils.log_success(f"Shard {shard} done: {written} posts")
+        finally:
+            for process in processes.values():
+                process.join(timeout=30)
+                if process.is_alive():
+                    process.terminate()
+
+    def run(self, items, mode: str = 'search', max_posts: int = 10) -> list:
+        return list(self.iter_run(items, mode=mode, max_posts=max_posts))
+
+    def run_to_sink(self, sink, items, mode: str = 'search', max_posts: int = 10) -> int:
+        """ Writes the posts of all workers into one sink; returns the number written. """
+        written = 0
+        try:
+            for post in self.iter_run(items, mode=mode, max_posts=max_posts):
+                sink.write(post)
+                written += 1
+        finally:
+            sink.close()
+        return written
+
+    def enqueue(self, queue: JobQueue, items, interval: float, mode: str = 'search', max_posts: int = 10,
+                priority: int = 0) -> int:
+        """
+        Adds this node's share of items to its local JobQueue as recurring jobs (run them with
+        platforms.scheduler.Scheduler). Returns the number of jobs added.
+        """
+        added = 0
+        for shard_items in self.local_shards(items).values():
+            for item in shard_items:
+                queue.add(self.platform, item, interval=interval, priority=priority, mode=mode, max_posts=max_posts)
+                added += 1
+        return added
@@ -2,12 +2,21 @@
 from platforms.instagram_scraper import InstagramScraper
 from platforms.x_scraper import XScraper
 from core.utils import ScraperUtils
+from core.waits import Pacing
+from core.seen_index import SeenIndex
+from platforms.scraper_pool import ScraperPool
+from core.network_cache import NetworkCache
+from core.checkpoint import Checkpoint
 
 class UniversalScraper:
     """
     Unified scraper class for Instagram and X platforms with flexible modes.
     """
-    def __init__(self, platform: str = 'x', username: str = None, password: str = None, headless: bool = False, user_data_dir: str = None):
+    def __init__(self, platform: str = 'x', username: str = None, password: str = None, headless: bool = False, user_data_dir: str = None,
+                 concurrency: int = 1, graphql_mode: bool = False, max_comments: int = None,
+                 pacing: Pacing = None, seen_index_path: str = None, refresh_after: float = None,
+                 pool: ScraperPool = None, block_resources="default", network_cache: NetworkCache = None,
+                 metrics_path: str = None, checkpoint_dir: str = None, pipeline: bool = True):
         """
         Initialize the scraper with platform and credentials.
 
@@ -16,20 +25,66 @@ class UniversalScraper:
         :param password: Login password
         :param headless: Whether to run browser in headless mode
         :param user_data_dir: Path to Chrome user data dir for speed (optional, defaults to system)
+        :param concurrency: Number of pages used to visit posts in parallel
+        :param pipeline: Visit posts while the feed is still being scrolled, instead of collecting
+                         every post URL first
+        :param graphql_mode: Fetch X posts via direct TweetDetail calls, rendering only as fallback
+        :param max_comments: Stop collecting comments for an X post once this many are found
+        :param pacing: Delays between posts/scrolls (Pacing); defaults are per platform
+        :param seen_index_path: SQLite file of already scraped posts; reruns only visit new posts
+        :param refresh_after: Seconds after which a seen post is scraped again (None = never)
+        :param block_resources: Blocking profile for images/media/fonts/stylesheets/telemetry
+                                ('default', 'media', 'none', a custom dict, or None); 'default'
+                                keeps stylesheets on Instagram, whose selectors depend on the layout
+        :param network_cache: NetworkCache that records the run's responses to disk, or replays a
+                              recorded run offline (mode='replay')
+        :param metrics_path: File under data/ the stage timings and counters of each run are exported
+                             to: Prometheus text for a .prom name, JSON otherwise (None = log only)
+        :param checkpoint_dir: Directory of search/blind run checkpoints (e.g. 'data/checkpoints');
+                               a run that crashed or was killed resumes where it stopped when it is
+                               started again with the same mode, target and max_posts
+        :param pool: ScraperPool to borrow a warm, logged-in scraper from for each run; the browser
+                     options above are then taken from the pool and the browser stays open after run()
         """
-        self.platform = platform.lower()
+        self.pool = pool
+        self.platform = pool.platform if pool else platform.lower()
         self.username = username
         self.password = password
         self.headless = headless
         self.user_data_dir = user_data_dir
+        self.concurrency = concurrency
+        self.pipeline = pipeline
+        self.graphql_mode = graphql_mode
+        self.max_comments = max_comments
+        self.pacing = pacing
+        self.block_resources = block_resources
+        self.network_cache = network_cache
+        self.metrics_path = metrics_path
+        self.checkpoint_dir = checkpoint_dir
+        # Posts completed by an earlier, interrupted attempt of the last run (checkpoint_dir only)
+        self.resumed_posts = []
+        # RunMetrics.summary() of the last run
+        self.last_metrics = None
+        self.seen_index = SeenIndex(seen_index_path, platform=self.platform, refresh_after=refresh_after) if seen_index_path else None
         self.scraper = None
-        self._initialize_scraper()
+        # Error that ended the last run early; run() keeps the posts yielded before it
+        self.last_error = None
+        if self.pool is None:
+            self._initialize_scraper()
 
     def _initialize_scraper(self):
         if self.platform == 'instagram':
-            self.scraper = InstagramScraper(headless=self.headless, user_data_dir=self.user_data_dir)
+            self.scraper = InstagramScraper(headless=self.headless, user_data_dir=self.user_data_dir,
+                                            pacing=self.pacing, seen_index=self.seen_index,
+                                            block_resources=self.block_resources,
+                                            network_cache=self.network_cache,
+                                            concurrency=self.concurrency, pipeline=self.pipeline)
         elif self.platform == 'x':
-            self.scraper = XScraper(headless=self.headless, user_data_dir=self.user_data_dir)
+            self.scraper = XScraper(headless=self.headless, user_data_dir=self.user_data_dir,
+                                    concurrency=self.concurrency, graphql_mode=self.graphql_mode,
+                                    max_comments=self.max_comments, pacing=self.pacing,
+                                    seen_index=self.seen_index, block_resources=self.block_resources,
+                                    network_cache=self.network_cache, pipeline=self.pipeline)
         else:
             raise ValueError(f"Unsupported platform: {self.platform}")
 
@@ -38,16 +93,88 @@ class UniversalScraper:
             raise Exception(f"{self.platform.capitalize()} login failed. Check credentials or network connection.")
 
     def run(self, search_text: str = "#Python", max_posts: int = 2,
-            mode: str = 'search', single_href: str = None, blind_url: str = None) -> list:
-        results = []
+            mode: str = 'search', single_href: str = None, blind_url: str = None, sink=None) -> list:
+        """
+        Runs the scraper and returns all posts. With sink (e.g. MongoSink), every post is also
+        written to it while the run is still going, and the sink is closed at the end.
+        A resumed run also returns the posts of its interrupted attempts (they already went to the sink).
+        """
+        posts = []
+        try:
+            for post in self.iter_run(search_text=search_text, max_posts=max_posts, mode=mode,
+                                      single_href=single_href, blind_url=blind_url):
+                if sink is not None:
+                    self._write(sink, post)
+                posts.append(post)
+        finally:
+            if sink is not None:
+                sink.close()
+        return self.resumed_posts + posts
+
+    def run_to_sink(self, sink, search_text: str = "#Python", max_posts: int = 2,
+                    mode: str = 'search', single_href: str = None, blind_url: str = None) -> int:
+        """
+        Streams every post into sink (anything with write/close, e.g. JsonlSink or MongoSink) as soon as
+        it is scraped, without keeping the run in memory. Returns the number of posts written.
+        """
+        written = 0
+        try:
+            for post in self.iter_run(search_text=search_text, max_posts=max_posts, mode=mode,
+                                      single_href=single_href, blind_url=blind_url):
+                self._write(sink, post)
+                written += 1
+        finally:
+            sink.close()
+        return written
+
+    def _checkpoint(self, mode: str, target: str, max_posts: int):
+        if not self.checkpoint_dir:
+            return None
+        checkpoint = Checkpoint.for_run(self.platform, f"{mode}:{target}", max_posts, directory=self.checkpoint_dir)
+        self.resumed_posts = checkpoint.posts()
+        return checkpoint
+
+    def _write(self, sink, post):
+        if self.scraper is None:
+            sink.write(post)
+            return
+        with self.scraper.metrics.span("persist"):
+            sink.write(post)
+
+    def iter_run(self, search_text: str = "#Python", max_posts: int = 2,
+                 mode: str = 'search', single_href: str = None, blind_url: str = None):
+        """
+        Generator version of run: yields posts one by one. The browser is closed at the end,
+        or handed back to the pool when there is one.
+        """
+        if self.pool is None:
+            yield from self._iter_mode(search_text, max_posts, mode, single_href, blind_url)
+            return
+
+        entry = self.pool.acquire()
+        entry.scraper.seen_index = self.seen_index
+        self.scraper = entry.scraper
+        try:
+            yield from self._iter_mode(search_text, max_posts, mode, single_href, blind_url)
+        finally:
+            self.scraper = None
+            # _iter_mode keeps a failure in last_error instead of raising it
+            self.pool.release(entry, failed=self.last_error is not None)
+
+    def _iter_mode(self, search_text, max_posts, mode, single_href, blind_url):
+        self.last_error = None
+        self.resumed_posts = []
+        if self.scraper is not None:
+            self.scraper.metrics.reset()
         try:
             if mode == 'search':
-                results = self.scraper.search(text=search_text, max_posts=max_posts)
+                yield from self.scraper.iter_search(text=search_text, max_posts=max_posts,
+                                                    checkpoint=self._checkpoint(mode, search_text, max_posts))
 
             elif mode == 'single':
                 if not single_href:
                     raise ValueError("single_href is required for 'single' mode")
-                results = self.scraper.search(text=single_href)
+                yield from self.scraper.iter_search(text=single_href)
 
             elif mode == 'blind':
                 # Determine target URL. If blind_url is provided, use it.
@@ -56,18 +183,35 @@ class UniversalScraper:
 
                 # Pass the URL directly to blind_scrape to avoid double navigation
                 # (The scraper handles the goto internally)
-                results = self.scraper.blind_scrape(url=target_url, max_posts=max_posts)
+                yield from self.scraper.iter_blind_scrape(url=target_url, max_posts=max_posts,
+                                                          checkpoint=self._checkpoint(mode, target_url, max_posts))
 
             else:
                 raise ValueError(f"Unsupported mode: {mode}")
 
         except Exception as e:
             ScraperUtils.log_error(f"Scraper run failed for {self.platform} in {mode} mode: {e}")
-            # Re-raise or handle as necessary. Currently returning empty list on failure.
+            self.last_error = e
+            # Posts yielded before the failure are kept by the caller.
 
         finally:
-            # Ensure the browser is closed after the run
-            if self.scraper:
+            if self.scraper is not None:
+                self.last_metrics = self.scraper.metrics.log_summary()
+                if self.metrics_path:
+                    ScraperUtils.log_info(f"Metrics exported to {self.scraper.metrics.export(self.metrics_path)}")
+            blocker = self.scraper.resource_blocker if self.scraper else None
+            if blocker is not None:
+                ScraperUtils.log_info(f"Blocked resources: {blocker.report()}")
+                blocker.reset()
+            cache = self.scraper.network_cache if self.scraper else None
+            if cache is not None:
+                ScraperUtils.log_info(f"Network cache: {cache.report()}")
+                cache.reset()
+            # Ensure the browser is closed after the run (pooled browsers stay warm)
+            if self.scraper and self.pool is None:
                 self.scraper.close()
-
-        return results
\ No newline at end of file
+            if self.seen_index is not None:
+                ScraperUtils.log_info(f"Seen index: {self.seen_index.stats()}")
+                # With a pool the same UniversalScraper may run again, so the index stays open
+                if self.pool is None:
+                    self.seen_index.close()
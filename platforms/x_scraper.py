@@ -2,20 +2,85 @@ from core.browser import BrowserEngine
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from platforms.base import ScraperBase
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
-import json
 import re
+import time
+from collections import deque
 
 from core.utils import ScraperUtils
+from core.x_graphql import XGraphQLClient
+from core.tweet_parser import TweetDetailParser
+from core.decoding import LazyJson
+from core.models import CommentIndex, Post, intern
+from core.waits import Pacing, WaitUtils
+from core.seen_index import SeenIndex
+from core.network_cache import NetworkCache
+from core.checkpoint import Checkpoint
+
+STATUS_LINKS = 'a[href*="/status/"]'
+STATUS_URL = re.compile(r'^https?://(www\.)?x\.com/.+/status/[0-9]+(?:\?.*)?$')
+# A search text that is itself a post URL
+SINGLE_POST_URL = re.compile(r'^https?://x\.com/.+/status/[0-9]+$')
+STATUS_HREFS_JS = """
+() => Array.from(document.querySelectorAll('a[href*="/status/"]')).map(a => a.href)
+"""
+# Main tweet fields for the DOM fallback, read in one round trip
+POST_DOM_JS = """
+() => {
+    const text = document.querySelector('div[data-testid="tweetText"]');
+    const user = document.querySelector('div[data-testid="User-Name"] a');
+    const time = document.querySelector('time');
+    return {
+        text: text ? text.innerText : null,
+        user_href: user ? user.getAttribute('href') : null,
+        timestamp: time ? time.getAttribute('datetime') : null,
+    };
+}
+"""
 
 
 class XScraper(ScraperBase):
-    def __init__(self, headless: bool = True, user_data_dir: str = None):
-        super().__init__(headless=headless, user_data_dir=user_data_dir)
-        self.browser_engine = BrowserEngine(headless=headless, user_data_dir=user_data_dir)
+    PLATFORM = 'x'
+    # Upper bounds for event waits; they return as soon as the event arrives
+    FEED_LOAD_TIMEOUT = 10000
+    SCROLL_TIMEOUT = 5000
+    POST_LOAD_TIMEOUT = 15000
+    MAX_SCROLLS = 50
+
+    def __init__(self, headless: bool = True, user_data_dir: str = None, concurrency: int = 1,
+                 graphql_mode: bool = False, graphql_max_pages: int = 10, max_comments: int = None,
+                 pacing: Pacing = None, seen_index: SeenIndex = None, block_resources="default",
+                 network_cache: NetworkCache = None, pipeline: bool = True, detail_tab: bool = True):
+        super().__init__(headless=headless, user_data_dir=user_data_dir, pacing=pacing)
+        # Posts scraped by earlier runs are skipped during collection (None = no persistence)
+        self.seen_index = seen_index
+        # Number of tabs used to visit posts in phase 2 of search (1 = sequential on self.page without pipeline)
+        self.concurrency = max(1, concurrency)
+        # Visit posts on `concurrency` extra tabs while the feed is still being scrolled, instead
+        # of collecting every href first (see _scrape_posts_pipelined)
+        self.pipeline = pipeline
+        # Sequential visits open posts in a second tab that is reused, so the feed tab is never
+        # reloaded between posts (False = visit on self.page and navigate back each time)
+        self.detail_tab = detail_tab
+        self._detail_page = None
+        # Post data comes from the GraphQL bodies, so images/media/fonts are not downloaded
+        self.browser_engine = BrowserEngine(headless=headless, user_data_dir=user_data_dir,
+                                            block_resources=block_resources, network_cache=network_cache)
+        self.resource_blocker = self.browser_engine.blocker
+        self.network_cache = network_cache
         self.page = self.browser_engine.create_driver()
         self.context = self.browser_engine.context
         self.driver = self.page
 
+        # Direct TweetDetail calls; page rendering is only the fallback (and teaches the client the endpoint).
+        # The client is always trained so comment pagination can follow cursors even in render mode.
+        self.graphql_mode = graphql_mode
+        self.graphql_max_pages = graphql_max_pages
+        self.graphql = XGraphQLClient(self.context, network_cache=network_cache)
+        self.context.on("request", self.graphql.observe)
+
+        # Upper bound on comments kept per post (None = no limit)
+        self.max_comments = max_comments
+
     def _find_element_with_selectors(self, selectors, timeout=10):
         """
         Try multiple selectors. Waits for the first visible one to appear and returns its locator.
@@ -215,23 +280,52 @@ class XScraper(ScraperBase):
         return f"https://x.com/{text}"
 
     def blind_scrape(self, url: str = None, max_posts=10):
-        if url:
-            self.page.goto(url, wait_until="domcontentloaded")
-            self.page.wait_for_timeout(2000)
-        return self.search(text=None, max_posts=max_posts, current_url=self.page.url)
-
-    def search(self, text: str = None, start_time: str = None, end_time: str = None, max_posts=5, current_url: str = None):
-        if text and re.match(r'^https?://x\.com/.+/status/[0-9]+$', text):
+        return list(self.iter_blind_scrape(url=url, max_posts=max_posts))
+
+    def iter_blind_scrape(self, url: str = None, max_posts=10, checkpoint: Checkpoint = None):
+        if url and not (checkpoint is not None and checkpoint.collection_done):
+            with self.metrics.span("navigation"):
+                self.page.goto(url, wait_until="domcontentloaded")
+            with self.metrics.span("wait"):
+                WaitUtils.wait_for_count_increase(self.page, STATUS_LINKS, 0, timeout=self.FEED_LOAD_TIMEOUT)
+        yield from self.iter_search(text=None, max_posts=max_posts, current_url=self.page.url,
+                                    checkpoint=checkpoint)
+
+    def search(self, text: str = None, start_time: str = None, end_time: str = None, max_posts=5, current_url: str = None,
+               concurrency: int = None, checkpoint: Checkpoint = None):
+        # Posts completed before a crash are only in the checkpoint
+        earlier = checkpoint.posts() if checkpoint is not None else []
+        return earlier + list(self.iter_search(text=text, start_time=start_time, end_time=end_time, max_posts=max_posts,
+                                               current_url=current_url, concurrency=concurrency, checkpoint=checkpoint))
+
+    def iter_search(self, text: str = None, start_time: str = None, end_time: str = None, max_posts=5,
+                    current_url: str = None, concurrency: int = None, checkpoint: Checkpoint = None):
+        """
+        Generator version of search: yields each post as soon as it is scraped, so callers
+        can stream results to a sink instead of holding the whole run in memory.
+        With checkpoint, progress is saved after every scroll round and post, and a run that
+        stopped early resumes from it: collected hrefs and scroll position are restored and
+        only the posts not done yet are visited (and yielded).
+        """
+        if text and SINGLE_POST_URL.match(text):
             post = self._scrape_single_post(text)
-            return [post] if post else []
-
-        if text:
+            if post:
+                yield post
+            return
+
+        resume_collection = checkpoint is not None and checkpoint.hrefs and not checkpoint.collection_done
+        if checkpoint is not None and checkpoint.collection_done:
+            # Phase 1 already finished: no need to load the feed again
+            current_url = checkpoint.url or current_url
+        elif text:
             target = self.prepare_target(text)
             if not target:
                 ScraperUtils.log_error("Could not build target URL from text.")
-                return []
-            self.page.goto(target, wait_until="domcontentloaded")
-            self.page.wait_for_timeout(2000)
+                return
+            with self.metrics.span("navigation"):
+                self.page.goto(target, wait_until="domcontentloaded")
+            with self.metrics.span("wait"):
+                WaitUtils.wait_for_count_increase(self.page, STATUS_LINKS, 0, timeout=self.FEED_LOAD_TIMEOUT)
             current_url = self.page.url
         elif not current_url:
             current_url = self.page.url
@@ -241,97 +335,378 @@ class XScraper(ScraperBase):
         # PHASE 1: Collect URLs
         post_hrefs = []
         seen = set()
+        skipped_known = 0
         scroll_rounds = 0
-        url_pattern = re.compile(r'^https?://(www\.)?x\.com/.+/status/[0-9]+(?:\?.*)?$')
-        max_scrolls = 50
 
-        while len(post_hrefs) < max_posts and scroll_rounds < max_scrolls:
-            scroll_rounds += 1
-            print(f"[DEBUG] Scroll Round {scroll_rounds}/{max_scrolls} | Current Posts: {len(post_hrefs)}")
+        if checkpoint is not None:
+            post_hrefs = list(checkpoint.hrefs)
+            seen.update(post_hrefs)
+            scroll_rounds = checkpoint.scroll_rounds
+        if resume_collection:
+            ScraperUtils.log_info(f"Resuming collection at scroll round {scroll_rounds} with {len(post_hrefs)} posts")
+            with self.metrics.span("scroll"):
+                self.page.evaluate("y => window.scrollTo(0, y)", checkpoint.scroll_y)
+
+        collecting = checkpoint is None or not checkpoint.collection_done
+        workers = max(1, concurrency or self.concurrency)
+        if self.pipeline:
+            # Phase 1 and 2 run together: posts are visited while the feed is still scrolled
+            total = max_posts
+            visited_factory = lambda advance: self._scrape_posts_pipelined(
+                current_url, post_hrefs, seen, scroll_rounds, max_posts, workers,
+                checkpoint=checkpoint, collecting=collecting, on_done=advance)
+        else:
+            while collecting and len(post_hrefs) < max_posts and scroll_rounds < self.MAX_SCROLLS:
+                scroll_rounds += 1
+                print(f"[DEBUG] Scroll Round {scroll_rounds}/{self.MAX_SCROLLS} | Current Posts: {len(post_hrefs)}")
 
-            self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            self.page.wait_for_timeout(1500)
+                found_new_this_round, skipped = self._collect_round(seen, post_hrefs)
+                skipped_known += skipped
 
-            try:
-                anchors_hrefs = self.page.evaluate("""
-                    () => Array.from(document.querySelectorAll('a[href*="/status/"]')).map(a => a.href)
-                """)
-            except Exception as e:
-                print(f"[DEBUG] JS Evaluation failed: {e}")
-                anchors_hrefs = []
+                if checkpoint is not None:
+                    checkpoint.collected(current_url, post_hrefs, scroll_rounds, self.page.evaluate("window.scrollY"))
 
-            # Check for immediate stop condition INSIDE loop processing anchors
-            found_new_this_round = 0
-            for i, href in enumerate(anchors_hrefs):
-                if href in seen:
-                    continue
+                # FIX: Break immediately if we hit max_posts
+                if len(post_hrefs) >= max_posts:
+                    print(f"[DEBUG] Target reached ({len(post_hrefs)}). Breaking scroll loop immediately.")
+                    break
 
-                if url_pattern.match(href):
-                    seen.add(href)
-                    post_hrefs.append(href)
-                    found_new_this_round += 1
+                if found_new_this_round > 0:
+                    print(f"[SUCCESS] Found {found_new_this_round} new posts. Total: {len(post_hrefs)}")
+
+            print(f"--- Collection Complete. Total: {len(post_hrefs)} ---")
+            if skipped_known:
+                ScraperUtils.log_info(f"Skipped {skipped_known} posts already in the seen index.")
+
+            # PHASE 2: Visit and Extract
+            print(f"--- Phase 2: Visiting posts ---")
+
+            target_posts = post_hrefs[:max_posts]
+            if checkpoint is not None:
+                if collecting:
+                    checkpoint.collected(current_url, post_hrefs, scroll_rounds, checkpoint.scroll_y, finished=True)
+                target_posts = checkpoint.pending(target_posts)
+            total = len(target_posts)
+            workers = min(workers, total)
+            if workers > 1:
+                print(f"[DEBUG] Visiting {total} posts on {workers} pages")
+                visited_factory = lambda advance: self._scrape_posts_pooled(target_posts, workers, on_done=advance)
+            else:
+                visited_factory = lambda advance: self._scrape_posts_sequential(target_posts, current_url, on_done=advance)
 
-            # FIX: Break immediately if we hit max_posts
-            if len(post_hrefs) >= max_posts:
-                print(f"[DEBUG] Target reached ({len(post_hrefs)}). Breaking scroll loop immediately.")
-                break
+        if checkpoint is not None and checkpoint.done:
+            ScraperUtils.log_info(f"Skipping {len(checkpoint.done)} posts done before the checkpoint")
 
-            if found_new_this_round > 0:
-                print(f"[SUCCESS] Found {found_new_this_round} new posts. Total: {len(post_hrefs)}")
+        with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(), TextColumn("[progress.percentage]{task.percentage:>3.0f}%")) as progress:
+            task_scrape = progress.add_task("[cyan]Scraping posts...", total=total)
+            advance = lambda: progress.update(task_scrape, advance=1)
+
+            for href, post in visited_factory(advance):
+                if not post:
+                    print(f"Failed to extract data for {href}")
+                    if checkpoint is not None:
+                        checkpoint.post_failed(href)
+                    continue
+                if not self._within_date_range(post, start_time, end_time):
+                    print("Skipping post due to date filter.")
+                    if checkpoint is not None:
+                        checkpoint.post_done(href)
+                    continue
+                self.metrics.count_post(post)
+                yield post
+                # Only once the consumer has taken the post; a post outside the date range stays
+                # unseen, so a later run with another range still visits it
+                if self.seen_index is not None:
+                    with self.metrics.span("persist"):
+                        self.seen_index.mark(href, post)
+                if checkpoint is not None:
+                    with self.metrics.span("persist"):
+                        checkpoint.post_done(href, post)
+
+        if checkpoint is not None:
+            checkpoint.finish()
+
+    def _collect_round(self, seen: set, post_hrefs: list):
+        """
+        One feed scroll on self.page: appends the status hrefs not seen before to post_hrefs.
+        Returns (new hrefs, hrefs skipped because the seen index has them).
+        """
+        with self.metrics.span("scroll"):
+            height = self.page.evaluate("document.body.scrollHeight")
+            self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            # The virtualized timeline grows as soon as the next batch is rendered
+            WaitUtils.wait_for_height_increase(self.page, height, timeout=self.SCROLL_TIMEOUT)
+        self.pause("between_scrolls")
 
-        print(f"--- Collection Complete. Total: {len(post_hrefs)} ---")
+        try:
+            anchors_hrefs = self.page.evaluate(STATUS_HREFS_JS)
+        except Exception as e:
+            print(f"[DEBUG] JS Evaluation failed: {e}")
+            anchors_hrefs = []
+        return self._accept_hrefs(anchors_hrefs, seen, post_hrefs, self.seen_index)
 
-        # PHASE 2: Visit and Extract
-        results = []
-        print(f"--- Phase 2: Visiting posts ---")
+    @staticmethod
+    def _accept_hrefs(hrefs, seen: set, post_hrefs: list, seen_index: SeenIndex = None):
+        """
+        Appends the post hrefs not seen before to post_hrefs; shared with AsyncXScraper.
+        Returns (new hrefs, hrefs skipped because the seen index has them).
+        """
+        found, skipped = 0, 0
+        for href in hrefs:
+            if href in seen:
+                continue
 
-        target_posts = post_hrefs[:max_posts]
+            if STATUS_URL.match(href):
+                seen.add(href)
+                if seen_index is not None and not seen_index.should_visit(href):
+                    skipped += 1
+                    continue
+                post_hrefs.append(href)
+                found += 1
+        return found, skipped
 
-        with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(), TextColumn("[progress.percentage]{task.percentage:>3.0f}%")) as progress:
-            task_scrape = progress.add_task("[cyan]Scraping posts...", total=len(target_posts))
+    def _scrape_posts_pipelined(self, current_url, post_hrefs, seen, scroll_rounds, max_posts, concurrency,
+                                checkpoint: Checkpoint = None, collecting: bool = True, on_done=None):
+        """
+        Phases 1 and 2 overlapped as producer/consumer: self.page keeps scrolling the feed and
+        queues the hrefs it finds, while `concurrency` extra pages of the same context visit them.
+        Navigations only wait for "commit", so posts load inside the browser during the next
+        scroll rounds; a page is parsed once its TweetDetail body has arrived. The queue holds
+        at most two hrefs per page and the feed only scrolls while it has room, so collection
+        never runs far ahead of the visits. When there is nothing left to scroll, the oldest
+        visit is waited on. Yields (href, post) as posts finish; post is None when scraping failed.
+        """
+        pending = post_hrefs[:max_posts]
+        queue = deque(checkpoint.pending(pending) if checkpoint is not None else pending)
+        queue_size = 2 * concurrency
+        skipped_known = 0
+        timeout = self.POST_LOAD_TIMEOUT / 1000
+        pages = []
+        in_flight = []
+        try:
+            for _ in range(concurrency):
+                pages.append(self.browser_engine.new_page())
+            idle = list(pages)
+
+            while True:
+                if collecting and (len(post_hrefs) >= max_posts or scroll_rounds >= self.MAX_SCROLLS):
+                    collecting = False
+                    print(f"--- Collection Complete. Total: {len(post_hrefs)} ---")
+                    if checkpoint is not None:
+                        checkpoint.collected(current_url, post_hrefs, scroll_rounds, checkpoint.scroll_y, finished=True)
+
+                # Consumer: hand queued hrefs to idle pages
+                while idle and queue:
+                    href = queue.popleft()
+                    post = self._scrape_post_direct(href)
+                    if post:
+                        if on_done:
+                            on_done()
+                        yield href, post
+                        continue
+                    page = idle.pop()
+                    captured = []
+                    listener = self._tweet_detail_listener(captured, self.metrics)
+                    page.on("response", listener)
+                    try:
+                        with self.metrics.span("navigation"):
+                            page.goto(href, wait_until="commit")
+                        in_flight.append((page, href, captured, listener, time.monotonic()))
+                    except Exception as e:
+                        ScraperUtils.log_error(f"Navigation failed for {href}: {e}")
+                        self._remove_listener(page, listener)
+                        idle.append(page)
+                        if on_done:
+                            on_done()
+                        yield href, None
+
+                # Producer: one scroll round while the queue has room
+                if collecting and len(queue) < queue_size:
+                    scroll_rounds += 1
+                    before = len(post_hrefs)
+                    try:
+                        self.page.bring_to_front()
+                    except Exception:
+                        pass
+                    found, skipped = self._collect_round(seen, post_hrefs)
+                    skipped_known += skipped
+                    queue.extend(post_hrefs[before:max_posts])
+                    if checkpoint is not None:
+                        checkpoint.collected(current_url, post_hrefs, scroll_rounds, self.page.evaluate("window.scrollY"))
+                    if found:
+                        print(f"[SUCCESS] Round {scroll_rounds}: {found} new posts. Total: {len(post_hrefs)}")
+                    now = time.monotonic()
+                    ready = [entry for entry in in_flight if entry[2] or now - entry[4] > timeout]
+                elif in_flight:
+                    now = time.monotonic()
+                    ready = [entry for entry in in_flight if entry[2] or now - entry[4] > timeout] or in_flight[:1]
+                else:
+                    break
 
-            for i, href in enumerate(target_posts):
-                print(f"[{i+1}/{len(target_posts)}] Visiting: {href}")
+                for entry in ready:
+                    page, href, captured, listener, _ = entry
+                    in_flight.remove(entry)
+                    try:
+                        self._wait_for_post_load(page, captured)
+                    finally:
+                        self._remove_listener(page, listener)
+                    post = None
+                    try:
+                        # Background tabs throttle timers and lazy loading; comment scrolling needs focus
+                        page.bring_to_front()
+                        post = self._build_post(href, captured, page)
+                    except Exception as e:
+                        ScraperUtils.log_error(f"Error scraping post {href}: {e}")
+                    idle.append(page)
+                    if on_done:
+                        on_done()
+                    yield href, post
+                    self.pause("between_posts")
+        finally:
+            for page, _, _, listener, _ in in_flight:
+                self._remove_listener(page, listener)
+            for page in pages:
                 try:
-                    post = self._scrape_single_post(href)
+                    page.close()
+                except Exception:
+                    pass
+            try:
+                self.page.bring_to_front()
+            except Exception:
+                pass
+        if skipped_known:
+            ScraperUtils.log_info(f"Skipped {skipped_known} posts already in the seen index.")
 
-                    if post:
-                        if post_time := post.get("timestamp"):
-                            if start_time or end_time:
-                                post_time_dt = ScraperUtils.convert_date(post_time)
-                                keep = True
-                                if start_time:
-                                    st = ScraperUtils.convert_date(start_time)
-                                    if st and post_time_dt < st: keep = False
-                                if end_time:
-                                    et = ScraperUtils.convert_date(end_time)
-                                    if et and post_time_dt > et: keep = False
-                                if not keep:
-                                    print("Skipping post due to date filter.")
-                                    continue
-                        results.append(post)
-                    else:
-                        print(f"Failed to extract data for {href}")
+    def _detail(self):
+        """ The tab posts are opened in when detail_tab is on; created on first use, kept between runs. """
+        if self._detail_page is None or self._detail_page.is_closed():
+            self._detail_page = self.browser_engine.new_page()
+        return self._detail_page
 
-                    if self.page.url != current_url:
-                        print(f"Returning to base: {current_url}")
-                        try:
-                            self.page.goto(current_url, timeout=60000)
-                            self.page.wait_for_timeout(1000)
-                        except Exception:
-                            pass
+    def _scrape_posts_sequential(self, hrefs, current_url, on_done=None):
+        """
+        Visit posts one by one in the detail tab, or on self.page returning to current_url after
+        each (detail_tab=False). Yields (href, post) in order; post is None when scraping failed.
+        """
+        if self.detail_tab:
+            yield from self._scrape_posts_in_detail_tab(hrefs, on_done=on_done)
+            return
+        for i, href in enumerate(hrefs):
+            print(f"[{i+1}/{len(hrefs)}] Visiting: {href}")
+            post = None
+            try:
+                post = self._scrape_single_post(href)
 
-                except Exception as e:
-                    ScraperUtils.log_error(f"Error scraping post {href}: {e}")
+                if self.page.url != current_url:
+                    print(f"Returning to base: {current_url}")
                     try:
-                        self.page.goto(current_url, timeout=60000)
+                        with self.metrics.span("navigation"):
+                            self.page.goto(current_url, timeout=60000)
+                        self.pause("feed_return")
                     except Exception:
                         pass
 
-                ScraperUtils.random_delay(1.5, 3.0)
-                progress.update(task_scrape, advance=1)
+            except Exception as e:
+                ScraperUtils.log_error(f"Error scraping post {href}: {e}")
+                try:
+                    self.page.goto(current_url, timeout=60000)
+                except Exception:
+                    pass
 
-        return results
+            if on_done:
+                on_done()
+            yield href, post
+            self.pause("between_posts")
+
+    def _scrape_posts_in_detail_tab(self, hrefs, on_done=None):
+        # The feed tab keeps its page and scroll position: one navigation per post instead of two
+        try:
+            page = self._detail()
+            # Comment scrolling needs the focused tab
+            page.bring_to_front()
+            for i, href in enumerate(hrefs):
+                print(f"[{i+1}/{len(hrefs)}] Visiting: {href}")
+                post = None
+                try:
+                    post = self._scrape_single_post(href, page=page)
+                except Exception as e:
+                    ScraperUtils.log_error(f"Error scraping post {href}: {e}")
+                if on_done:
+                    on_done()
+                yield href, post
+                self.pause("between_posts")
+        finally:
+            try:
+                self.page.bring_to_front()
+            except Exception:
+                pass
+
+    def _scrape_posts_pooled(self, hrefs, concurrency, on_done=None):
+        """
+        Visit posts on `concurrency` extra pages of the same persistent context.
+
+        Each batch starts every navigation first, so the pages load in parallel inside
+        the browser, then waits on and parses each page in turn. A batch costs about as
+        much as its slowest post. Every page has its own response listener and capture
+        list. Yields (href, post) in the order of hrefs, one batch at a time; post is None
+        when scraping failed.
+        """
+        pages = []
+        try:
+            for _ in range(concurrency):
+                pages.append(self.browser_engine.new_page())
+
+            for start in range(0, len(hrefs), len(pages)):
+                end = min(start + len(pages), len(hrefs))
+                posts = {}
+                batch = []
+                for page, idx in zip(pages, range(start, end)):
+                    print(f"[{idx+1}/{len(hrefs)}] Visiting: {hrefs[idx]}")
+                    posts[idx] = self._scrape_post_direct(hrefs[idx])
+                    if posts[idx]:
+                        if on_done:
+                            on_done()
+                        continue
+                    captured = []
+                    listener = self._tweet_detail_listener(captured, self.metrics)
+                    page.on("response", listener)
+                    try:
+                        with self.metrics.span("navigation"):
+                            page.goto(hrefs[idx], wait_until="commit")
+                        batch.append((page, idx, captured, listener))
+                    except Exception as e:
+                        ScraperUtils.log_error(f"Navigation failed for {hrefs[idx]}: {e}")
+                        self._remove_listener(page, listener)
+                        if on_done:
+                            on_done()
+
+                for page, idx, captured, listener in batch:
+                    try:
+                        self._wait_for_post_load(page, captured)
+                    finally:
+                        self._remove_listener(page, listener)
+                    try:
+                        # Background tabs throttle timers and lazy loading; comment scrolling needs focus
+                        page.bring_to_front()
+                        posts[idx] = self._build_post(hrefs[idx], captured, page)
+                    except Exception as e:
+                        ScraperUtils.log_error(f"Error scraping post {hrefs[idx]}: {e}")
+                    if on_done:
+                        on_done()
+
+                for idx in range(start, end):
+                    yield hrefs[idx], posts.get(idx)
+                self.pause("between_posts")
+        finally:
+            for page in pages:
+                try:
+                    page.close()
+                except Exception:
+                    pass
+            try:
+                self.page.bring_to_front()
+            except Exception:
+                pass
 
     def _extract_main_post_from_dom(self):
         try:
@@ -367,157 +742,209 @@ class XScraper(ScraperBase):
             ScraperUtils.log_error(f"DOM Fallback failed: {e}")
             return None
 
-    def _scrape_single_post(self, href: str) -> dict | None:
-        data = {
-            "url": href, "likes": "0", "retweets": "0", "replies": "0",
-            "timestamp": None, "author": None, "text": None,
-            "mentions": [], "hashtags": [], "media": [], "comments": []
-        }
-
-        captured = []
-
+    @staticmethod
+    def _tweet_detail_listener(captured: list, metrics=None):
         def handle_response(response):
             # Intercept all TweetDetail responses
             try:
-                if response.status == 200 and 'graphql' in response.url and 'TweetDetail' in response.url:
-                    body = response.body()
-                    body_str = body.decode('utf-8') if isinstance(body, bytes) else body
-                    json_body = json.loads(body_str)
-                    captured.append(json_body)
+                if ScraperUtils.is_tweet_detail(response):
+                    if metrics is None:
+                        body = response.body()
+                    else:
+                        with metrics.span("interception"):
+                            body = response.body()
+                        metrics.add("responses_intercepted")
+                        metrics.add("bytes_intercepted", len(body))
+                    # Decoded only when a parser reads it
+                    captured.append(LazyJson(body))
             except Exception as e:
                 print(f"[ERROR] Failed to parse response: {e}")
+        return handle_response
+
+    @staticmethod
+    def _remove_listener(page, listener):
+        try:
+            page.off("response", listener)
+        except Exception:
+            try:
+                # older fallback name if present
+                page.remove_listener("response", listener)
+            except Exception:
+                pass
+
+    def _wait_for_post_load(self, page, captured: list):
+        # The first TweetDetail body carries the post and the first comment page; no need for networkidle.
+        # Polling the capture list (rather than waiting for the event) also covers bodies that landed
+        # before this call and bodies the listener is still reading.
+        with self.metrics.span("wait"):
+            loaded = WaitUtils.wait_until(page, lambda: captured, timeout=self.POST_LOAD_TIMEOUT)
+        if not loaded:
+            ScraperUtils.log_info("No TweetDetail response before timeout.")
+
+    def _scrape_post_direct(self, href: str) -> Post | None:
+        """
+        Builds the post from direct TweetDetail calls (graphql_mode only).
+        Returns None when the client is not ready or the replay fails, so callers render instead.
+        """
+        if not (self.graphql_mode and self.graphql.ready):
+            return None
+        tweet_id = XGraphQLClient.tweet_id_from_url(href)
+        if not tweet_id:
+            return None
+
+        with self.metrics.span("fetch"):
+            first_page = self.graphql.fetch_tweet_detail(tweet_id)
+        if first_page is None:
+            ScraperUtils.log_info(f"Direct GraphQL replay failed for {href}; rendering page instead.")
+            return None
+        with self.metrics.span("parse"):
+            data, index = self._parse_captured(href, [first_page])
+        self.metrics.add("responses_parsed")
+        if data is None or not data.get("id"):
+            return None
+        data["comments"] = self._collect_comments(None, [first_page], data["id"], index,
+                                                  max_pages=self.graphql_max_pages)
+        return data
+
+    def _collect_comments(self, page, captured, tweet_id, index: CommentIndex, max_pages=30):
+        """
+        Adds comments past the captured responses (cursor pagination, or scrolling `page`)
+        to `index` and applies the max_comments budget.
+        """
+        budget = None
+        if self.max_comments:
+            budget = self.max_comments - len(index)
+            if budget <= 0:
+                ScraperUtils.log_info(f"Comment budget of {self.max_comments} met by initial responses.")
+                return index.comments[:self.max_comments]
+
+        # Scrolling the page, or following cursors with direct calls, until the comments run out
+        with self.metrics.span("scroll"):
+            ScraperUtils.extract_comments(page, max_scrolls=max_pages, captured=captured, client=self.graphql,
+                                          tweet_id=tweet_id, max_comments=budget, index=index)
+        ScraperUtils.log_info(f"Total comments extracted: {len(index)}.")
+        return index.comments[:self.max_comments] if self.max_comments else index.comments
+
+    def _scrape_single_post(self, href: str, page=None) -> Post | None:
+        post = self._scrape_post_direct(href)
+        if post:
+            return post
+
+        page = page or self.page
+        captured = []
+        handle_response = self._tweet_detail_listener(captured, self.metrics)
 
         # Register listener
-        self.page.on("response", handle_response)
+        page.on("response", handle_response)
 
         try:
             try:
-                self.page.goto(href, wait_until="domcontentloaded")
-                # Wait for network idle to ensure all initial requests (including comments) finish
-                try:
-                    self.page.wait_for_load_state('networkidle', timeout=15000)
-                except Exception:
-                    self.page.wait_for_timeout(2000)
+                with self.metrics.span("navigation"):
+                    page.goto(href, wait_until="domcontentloaded")
+                self._wait_for_post_load(page, captured)
             except Exception as e:
                 ScraperUtils.log_error(f"Navigation failed: {e}")
                 return None
         finally:
             # Always remove the listener
-            try:
-                self.page.off("response", handle_response)
-            except Exception:
-                try:
-                    # older fallback name if present
-                    self.page.remove_listener("response", handle_response)
-                except Exception:
-                    pass
+            self._remove_listener(page, handle_response)
 
-        ScraperUtils.log_info(f"Parsing {len(captured)} captured responses.")
+        return self._build_post(href, captured, page)
 
-        # --- NEW LOGIC: EXTRACT INITIAL COMMENTS ---
-        initial_comments = []
+    @staticmethod
+    def _empty_post(href: str) -> Post:
+        return Post(url=href)
 
-        for body in captured:
-            try:
-                batch_comments = ScraperUtils.parse_comments_from_json(body)
-                for c in batch_comments:
-                    if c not in initial_comments:
-                        initial_comments.append(c)
-            except Exception as e:
-                ScraperUtils.log_error(f"Error parsing initial comments from JSON: {e}")
+    @staticmethod
+    def _parse_captured(href: str, captured: list):
+        """
+        Map captured TweetDetail bodies onto a Post.
+        Returns (data, index): the CommentIndex holding the comments of all bodies, to be
+        extended by later batches; data is None when no body could be parsed.
+        Page-independent, so the sync and async scrapers share it.
+        """
+        data = XScraper._empty_post(href)
 
-        ScraperUtils.log_info(f"Found {len(initial_comments)} initial comments in page load.")
+        ScraperUtils.log_info(f"Parsing {len(captured)} captured responses.")
 
-        # --- MAIN POST EXTRACTION ---
+        # One pass per body yields the main post, its quoted post and the comments
+        index = CommentIndex()
         extracted = None
+
         for body in captured:
             try:
-                extracted = ScraperUtils.parse_tweet_json(body)
-                if extracted.get("post", {}).get("id"):
-                    ScraperUtils.log_success("Main tweet extracted successfully.")
-                    break
+                parsed = TweetDetailParser.parse(body, with_main=extracted is None, index=index)
             except Exception as e:
-                # skip malformed capture
+                ScraperUtils.log_error(f"Error parsing captured TweetDetail JSON: {e}")
                 continue
+            if extracted is None and parsed["post"] and parsed["post"].id:
+                extracted = parsed
+                ScraperUtils.log_success("Main tweet extracted successfully.")
 
-        if extracted and extracted.get("post"):
-            post_data = extracted["post"]
-
-            # Map structured data to flat 'data' dict
-            data["id"] = post_data["id"]
-            data["timestamp"] = post_data["created_at"]
-            data["text"] = post_data["text"]
+        ScraperUtils.log_info(f"Found {len(index)} initial comments in page load.")
 
-            if data["text"]:
-                data["mentions"] = re.findall(r'@\w+', data["text"])
-                data["hashtags"] = re.findall(r'#\w+', data["text"])
+        if extracted is None:
+            return None, index
 
-            # Author mapping
-            author = post_data.get("author", {})
-            screen_name = author.get("screen_name")
-            data["author"] = f"https://x.com/{screen_name}" if screen_name else None
+        post_data = extracted["post"]
 
-            # Metrics mapping
-            metrics = post_data.get("metrics", {})
-            data["likes"] = str(metrics.get("favorite_count") or 0)
-            data["replies"] = str(metrics.get("reply_count") or 0)
-            data["retweets"] = str(metrics.get("retweet_count") or 0)
-            data["quote_count"] = str(metrics.get("quote_count") or 0)
-            data["views"] = str(metrics.get("views_count") or 0)
+        # Map the structured tweet onto the flat post
+        data.id = post_data.id
+        data.timestamp = post_data.created_at
+        data.text = post_data.text
 
-            # Media mapping (already a list)
-            data["media"] = post_data.get("media", [])
+        if data.text:
+            data.mentions = re.findall(r'@\w+', data.text)
+            data.hashtags = re.findall(r'#\w+', data.text)
 
-            # Entities
-            data["entities"] = post_data.get("entities", {})
+        screen_name = post_data.author.screen_name
+        data.author = intern(f"https://x.com/{screen_name}") if screen_name else None
 
-            if "repost" in extracted:
-                data["repost"] = extracted["repost"]
-
-            # --- COMMENTS EXTRACTION ---
-            ScraperUtils.log_info("Starting additional comment extraction via scroll...")
-            additional_comments = ScraperUtils.extract_comments(self.page)
+        metrics = post_data.metrics
+        data.likes = metrics.favorite_count
+        data.replies = metrics.reply_count
+        data.retweets = metrics.retweet_count
+        data.quote_count = metrics.quote_count
+        data.views = metrics.views_count
 
-            # Merge initial and additional comments
-            final_comments_list = []
-            seen_comments = set()
+        data.media = post_data.media
+        data.entities = post_data.entities
+        data.repost = extracted["repost"]
 
-            for c in initial_comments + additional_comments:
-                key = f"{c.get('user', '')}||{c.get('text', '')[:200]}"
-                if key not in seen_comments:
-                    seen_comments.add(key)
-                    final_comments_list.append(c)
+        return data, index
 
-            ScraperUtils.log_info(f"Total comments extracted: {len(final_comments_list)}.")
-            data["comments"] = final_comments_list
+    def _build_post(self, href: str, captured: list, page) -> Post | None:
+        with self.metrics.span("parse"):
+            data, index = self._parse_captured(href, captured)
+        self.metrics.add("responses_parsed", len(captured))
 
+        if data is not None:
+            # --- COMMENTS EXTRACTION ---
+            ScraperUtils.log_info("Starting additional comment extraction...")
+            data["comments"] = self._collect_comments(page, captured, data.get("id"), index)
             return data
-        else:
-            ScraperUtils.log_info("GraphQL data missing, attempting DOM extraction...")
-            # DOM Fallback
-            try:
-                text_el = self.page.locator('div[data-testid="tweetText"]').first
-                if text_el.count() > 0:
-                    data["text"] = text_el.inner_text()
-
-                user_el = self.page.locator('div[data-testid="User-Name"] a').first
-                if user_el.count() > 0:
-                    handle = user_el.get_attribute('href').replace('/', '')
-                    data["author"] = f"https://x.com/{handle}"
 
-                time_el = self.page.locator('time').first
-                if time_el.count() > 0:
-                    data["timestamp"] = time_el.get_attribute('datetime')
-
-                if data["text"]:
-                    data["mentions"] = re.findall(r'@\w+', data["text"])
-                    data["hashtags"] = re.findall(r'#\w+', data["text"])
+        ScraperUtils.log_info("GraphQL data missing, attempting DOM extraction...")
+        # DOM Fallback
+        try:
+            return self._post_from_dom(href, page.evaluate(POST_DOM_JS))
+        except Exception as e:
+            ScraperUtils.log_error(f"DOM Fallback failed: {e}")
+            return None
 
-                data["comments"] = []
-                return data
-            except Exception as e:
-                ScraperUtils.log_error(f"DOM Fallback failed: {e}")
-                return None
+    @staticmethod
+    def _post_from_dom(href: str, fields: dict) -> Post:
+        """ The DOM fallback post from the POST_DOM_JS fields; shared with AsyncXScraper. """
+        data = XScraper._empty_post(href)
+        data["text"] = fields.get("text")
+        if fields.get("user_href"):
+            data["author"] = f"https://x.com/{fields['user_href'].replace('/', '')}"
+        data["timestamp"] = fields.get("timestamp")
+        if data["text"]:
+            data["mentions"] = re.findall(r'@\w+', data["text"])
+            data["hashtags"] = re.findall(r'#\w+', data["text"])
+        data["comments"] = []
+        return data
 
     def close(self):
         self.browser_engine.quit_driver()
\ No newline at end of file
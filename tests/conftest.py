@@ -0,0 +1,49 @@
+import os
+import pytest
+
+
+@pytest.fixture
+def mongo_db():
+    """ An in-memory mongomock database. """
+    mongomock = pytest.importorskip("mongomock")
+    from mongomock.collection import BulkOperationBuilder
+
+    add_update = BulkOperationBuilder.add_update
+
+    def compatible_add_update(self, *args, sort=None, **kwargs):
+        # pymongo >= 4.11 passes `sort`, which mongomock does not know yet
+        return add_update(self, *args, **kwargs)
+
+    BulkOperationBuilder.add_update = compatible_add_update
+    try:
+        yield mongomock.MongoClient().scraper
+    finally:
+        BulkOperationBuilder.add_update = add_update
+
+
+@pytest.fixture(scope="module")
+def browser_page():
+    """
+    A page of headless Chromium for the in-page scripts; skipped when Playwright has no browser
+    (python -m playwright install chromium). PLAYWRIGHT_CDP_URL attaches to an already running
+    Chromium-based browser over CDP instead and uses its first page.
+    """
+    sync_api = pytest.importorskip("playwright.sync_api")
+    with sync_api.sync_playwright() as playwright:
+        cdp_url = os.environ.get("PLAYWRIGHT_CDP_URL")
+        try:
+            if cdp_url:
+                browser = playwright.chromium.connect_over_cdp(cdp_url)
+            else:
+                browser = playwright.chromium.launch(headless=True)
+        except Exception as e:
+            pytest.skip(f"No Chromium for Playwright: {str(e).splitlines()[0]}")
+        if cdp_url:
+            context = browser.contexts[0]
+            page = context.pages[0] if context.pages else context.new_page()
+        else:
+            page = browser.new_page()
+        yield page
+        if not cdp_url:
+            page.close()
+        browser.close()
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from core.seen_index import SeenIndex
+from core.waits import Pacing
+from platforms.async_instagram_scraper import AsyncInstagramScraper
+from platforms.async_x_scraper import AsyncXScraper
+from platforms.instagram_scraper import InstagramScraper
+from platforms.x_scraper import XScraper
+
+FEEDS = {
+    "x": [f"https://x.com/u/status/{i}" for i in range(1, 10)],
+    "instagram": [f"https://www.instagram.com/p/Post{i}/" for i in range(1, 10)],
+}
+# Every third post is older than the date range
+OLD_POSTS = {href for hrefs in FEEDS.values() for href in hrefs[::3]}
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def fake_run(scraper, platform):
+    """ Feeds the scraper three hrefs a scroll round and replaces the post visit, which records
+    how many visits run at once. Returns the visit log. """
+    hrefs = FEEDS[platform]
+    accept = XScraper._accept_hrefs if platform == "x" else InstagramScraper._accept_hrefs
+    log = {"tabs": [], "in_flight": 0, "max_in_flight": 0}
+    rounds = []
+
+    async def collect_round(seen, post_hrefs):
+        start = len(rounds) * 3
+        rounds.append(start)
+        return accept(hrefs[start:start + 3], seen, post_hrefs, scraper.seen_index)
+
+    async def new_page():
+        page = FakePage()
+        log["tabs"].append(page)
+        return page
+
+    async def visit(href, page):
+        log["in_flight"] += 1
+        log["max_in_flight"] = max(log["max_in_flight"], log["in_flight"])
+        await asyncio.sleep(0)
+        log["in_flight"] -= 1
+        return {"url": href, "timestamp": "2020-01-01T10:00:00.000Z" if href in OLD_POSTS else "2024-06-01T10:00:00.000Z"}
+
+    scraper._collect_round = collect_round
+    engine = scraper.browser_engine if platform == "x" else scraper.browser
+    engine.new_page = new_page
+    if platform == "x":
+        scraper._render_post = visit
+    else:
+        scraper._scrape_single_post = visit
+    return log
+
+
+@pytest.mark.parametrize("platform, scraper_class", [("x", AsyncXScraper), ("instagram", AsyncInstagramScraper)])
+def test_async_search_visits_concurrently_and_marks_only_posts_in_range(platform, scraper_class, tmp_path):
+    scraper = scraper_class(user_data_dir=str(tmp_path / "profile"), concurrency=2, pacing=Pacing.none())
+    scraper.seen_index = SeenIndex(str(tmp_path / "seen.sqlite3"), platform=platform)
+    log = fake_run(scraper, platform)
+    hrefs = FEEDS[platform]
+    search = {"current_url": "https://x.com/search?q=py"} if platform == "x" else {}
+
+    posts = asyncio.run(scraper.search(start_time="2023-01-01", max_posts=6, **search))
+
+    recent = [href for href in hrefs[:6] if href not in OLD_POSTS]
+    assert [post["url"] for post in posts] == recent
+    assert log["max_in_flight"] == 2
+    assert len(log["tabs"]) == 6 and all(tab.closed for tab in log["tabs"])
+    assert [href for href in hrefs if href in scraper.seen_index] == recent
+
+    # A rerun without the range visits the old posts it skipped
+    fake_run(scraper, platform)
+    posts = asyncio.run(scraper.search(max_posts=5, **search))
+    assert [post["url"] for post in posts] == [href for href in hrefs if href not in recent]
+    scraper.seen_index.close()
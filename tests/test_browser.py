@@ -0,0 +1,94 @@
+import asyncio
+
+from core.async_browser import AsyncBrowserEngine
+from core.browser import BrowserEngine
+from platforms.instagram_scraper import InstagramScraper
+
+
+class FakeRequest:
+    def __init__(self, resource_type, url):
+        self.resource_type = resource_type
+        self.url = url
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url="https://x.com/"):
+        self.request = FakeRequest(resource_type, url)
+        self.outcome = None
+
+    def abort(self):
+        self.outcome = "aborted"
+
+    def continue_(self):
+        self.outcome = "continued"
+
+
+def route(engine, resource_type, url="https://x.com/"):
+    fake = FakeRoute(resource_type, url)
+    engine.handle_route(fake)
+    return fake.outcome
+
+
+def test_handle_route_aborts_blocked_requests_and_counts_them(tmp_path):
+    engine = BrowserEngine(user_data_dir=str(tmp_path))
+
+    assert route(engine, "image") == "aborted"
+    assert route(engine, "xhr", "https://x.com/i/api/1.1/jot/client_event.json") == "aborted"
+    assert route(engine, "xhr", "https://x.com/i/api/graphql/abc/TweetDetail") == "continued"
+    assert engine.blocker.report()["by_type"] == {"image": 1, "xhr": 1}
+    assert engine.blocker.allowed == 1
+
+
+def test_instagram_default_profile_keeps_stylesheets(tmp_path):
+    insta = InstagramScraper(user_data_dir=str(tmp_path / "insta"))
+    assert route(insta.browser, "stylesheet") == "continued"
+    assert route(insta.browser, "image") == "aborted"
+
+    assert route(BrowserEngine(user_data_dir=str(tmp_path / "x")), "stylesheet") == "aborted"
+    # An explicit profile is used as given
+    assert route(InstagramScraper(user_data_dir=str(tmp_path / "insta"), block_resources="none").browser,
+                 "image") == "continued"
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+def test_quit_driver_resets_the_handles_of_both_engines(tmp_path):
+    engine = BrowserEngine(user_data_dir=str(tmp_path))
+    context, playwright = engine.context, engine.playwright = FakeContext(), FakePlaywright()
+    engine.page = object()
+    engine.quit_driver()
+
+    assert context.closed and playwright.stopped
+    assert (engine.context, engine.playwright, engine.page) == (None, None, None)
+    # A second quit (e.g. close() after a failed run) has nothing left to close
+    engine.quit_driver()
+
+    class AsyncContext(FakeContext):
+        async def close(self):
+            super().close()
+
+    class AsyncPlaywright(FakePlaywright):
+        async def stop(self):
+            super().stop()
+
+    engine = AsyncBrowserEngine(user_data_dir=str(tmp_path))
+    context, playwright = engine.context, engine.playwright = AsyncContext(), AsyncPlaywright()
+    engine.page = object()
+    asyncio.run(engine.quit_driver())
+
+    assert context.closed and playwright.stopped
+    assert (engine.context, engine.playwright, engine.page) == (None, None, None)
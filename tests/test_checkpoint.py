@@ -0,0 +1,44 @@
+import json
+from core.checkpoint import Checkpoint
+from core.models import InstaPost, Post
+
+
+def test_resumes_collection_progress_and_posts(tmp_path):
+    checkpoint = Checkpoint.for_run("x", "#Python", 10, directory=str(tmp_path))
+    hrefs = ["https://x.com/a/status/1", "https://x.com/a/status/2", "https://x.com/a/status/3"]
+    checkpoint.collected("https://x.com/search?q=%23Python", hrefs, scroll_rounds=2, scroll_y=1800)
+    checkpoint.post_done(hrefs[0], Post(url=hrefs[0], likes=4, id="1"))
+    checkpoint.post_failed(hrefs[1], "timeout")
+
+    resumed = Checkpoint.for_run("x", "#Python", 10, directory=str(tmp_path))
+    assert resumed.resumed
+    assert resumed.hrefs == hrefs
+    assert (resumed.scroll_rounds, resumed.scroll_y) == (2, 1800)
+    assert resumed.pending(hrefs) == hrefs[1:]
+    assert resumed.failed == {hrefs[1]: "timeout"}
+    posts = resumed.posts()
+    assert isinstance(posts[0], Post)
+    assert (posts[0].likes, posts[0].id) == (4, "1")
+
+
+def test_posts_only_append_to_the_journal(tmp_path):
+    checkpoint = Checkpoint.for_run("instagram", "@nasa", 5, directory=str(tmp_path))
+    checkpoint.collected("https://www.instagram.com/nasa/", ["/p/A/"], scroll_rounds=1)
+    snapshot = checkpoint.path.read_bytes()
+    checkpoint.post_done("/p/A/", InstaPost(url="/p/A/", id="7"))
+    assert checkpoint.path.read_bytes() == snapshot
+    assert [json.loads(line)["status"] for line in checkpoint.journal_path.read_text().splitlines()] == ["done"]
+    assert isinstance(Checkpoint.for_run("instagram", "@nasa", 5, directory=str(tmp_path)).posts()[0], InstaPost)
+
+
+def test_ignores_a_torn_journal_line_and_finish_removes_everything(tmp_path):
+    checkpoint = Checkpoint.for_run("x", "q", 5, directory=str(tmp_path))
+    checkpoint.collected("u", ["a", "b"], scroll_rounds=1, finished=True)
+    checkpoint.post_done("a")
+    with open(checkpoint.journal_path, "ab") as f:
+        f.write(b'{"href": "b", "sta')
+
+    resumed = Checkpoint.for_run("x", "q", 5, directory=str(tmp_path))
+    assert resumed.done == {"a"}
+    resumed.finish()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,34 @@
+from core.seen_index import SeenIndex
+from platforms.instagram_scraper import InstagramScraper
+from platforms.x_scraper import XScraper
+
+
+def test_x_hrefs_are_filtered_once_for_both_engines(tmp_path):
+    index = SeenIndex(str(tmp_path / "seen.db"))
+    index.mark("https://x.com/a/status/1", {"id": "1"})
+    seen, post_hrefs = set(), []
+    hrefs = ["https://x.com/a/status/1", "https://x.com/b/status/2", "https://x.com/b/status/2",
+             "https://x.com/b/status/2/photo/1", "https://x.com/home"]
+
+    assert XScraper._accept_hrefs(hrefs, seen, post_hrefs, index) == (1, 1)
+    assert post_hrefs == ["https://x.com/b/status/2"]
+    # A later round only adds what it has not seen
+    assert XScraper._accept_hrefs(hrefs + ["https://x.com/c/status/3?s=20"], seen, post_hrefs) == (1, 0)
+    assert post_hrefs[-1] == "https://x.com/c/status/3?s=20"
+
+
+def test_instagram_hrefs_are_filtered_once_for_both_engines():
+    seen, post_hrefs = set(), []
+    hrefs = ["https://www.instagram.com/p/Abc_1/", "https://www.instagram.com/reel/Xyz-2/",
+             "https://www.instagram.com/p/Abc_1/", "https://www.instagram.com/p/Abc_1/liked_by/", None]
+
+    assert InstagramScraper._accept_hrefs(hrefs, seen, post_hrefs) == 2
+    assert post_hrefs == ["https://www.instagram.com/p/Abc_1/", "https://www.instagram.com/reel/Xyz-2/"]
+
+
+def test_dom_fallback_fields_map_onto_a_post():
+    post = XScraper._post_from_dom("https://x.com/a/status/1",
+                                   {"text": "hi @bob #py", "user_href": "/alice", "timestamp": "2024-01-01T00:00:00.000Z"})
+    assert post["author"] == "https://x.com/alice"
+    assert post["mentions"] == ["@bob"] and post["hashtags"] == ["#py"]
+    assert post["comments"] == []
@@ -0,0 +1,82 @@
+import copy
+
+from core.models import CommentIndex
+from core.replay import build_payloads
+from core.tweet_parser import TweetDetailParser
+from core.utils import ScraperUtils
+
+POST = {"id": "7", "url": "https://x.com/a/status/7", "text": "main",
+        "comments": [{"user": f"https://x.com/u{i}", "text": f"reply {i}"} for i in range(8)]}
+# Three replies a page: cursor-1 and cursor-2 lead to pages 1 and 2, the last page has no Bottom cursor
+BODIES = build_payloads(POST, page_size=3)
+
+
+class FakeClient:
+    """ XGraphQLClient stand-in serving BODIES by cursor. Like X, each page repeats the last reply
+    of the page before it. """
+    ready = True
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.cursors = []
+
+    def fetch_tweet_detail(self, tweet_id, cursor=None):
+        self.cursors.append(cursor)
+        if self.fail:
+            return None
+        number = int(cursor.split("-")[1])
+        body = copy.deepcopy(BODIES[number])
+        previous = BODIES[number - 1]["data"]["threaded_conversation_with_injections_v2"]["instructions"][1]["entries"]
+        repeated = [entry for entry in previous if entry["entryId"].startswith("conversationthread-")][-1]
+        body["data"]["threaded_conversation_with_injections_v2"]["instructions"][1]["entries"].insert(0, repeated)
+        return body
+
+
+def first_page():
+    """ The captured first page and the index of the comments it already gave. """
+    index = CommentIndex()
+    parsed = TweetDetailParser.parse(BODIES[0], index=index)
+    return parsed["comments"], index
+
+
+def texts(comments):
+    return [comment["text"] for comment in comments]
+
+
+def test_last_cursor_is_the_cursor_of_the_latest_page_that_has_one():
+    assert ScraperUtils.find_cursor(BODIES[0]) == "cursor-1"
+    assert ScraperUtils.find_cursor(BODIES[2]) is None
+    assert ScraperUtils.last_cursor([BODIES[0], BODIES[1], BODIES[2]]) == "cursor-2"
+    assert ScraperUtils.last_cursor([BODIES[2]]) is None
+
+
+def test_cursors_are_followed_without_repeating_comments():
+    loaded, index = first_page()
+    client = FakeClient()
+    more = ScraperUtils.extract_comments(None, captured=[BODIES[0]], client=client, tweet_id="7", index=index)
+
+    assert client.cursors == ["cursor-1", "cursor-2"]
+    assert texts(loaded) == ["reply 0", "reply 1", "reply 2"]
+    assert texts(more) == [f"reply {i}" for i in range(3, 8)]
+    assert len(index) == 8
+
+
+def test_max_comments_stops_the_pagination():
+    _, index = first_page()
+    client = FakeClient()
+    more = ScraperUtils.extract_comments(None, captured=[BODIES[0]], client=client, tweet_id="7",
+                                         max_comments=2, index=index)
+
+    assert client.cursors == ["cursor-1"]
+    assert texts(more) == ["reply 3", "reply 4"]
+
+
+def test_complete_or_failed_pagination_gives_no_comments():
+    _, index = first_page()
+    client = FakeClient()
+    assert ScraperUtils.extract_comments(None, captured=[BODIES[2]], client=client, tweet_id="7", index=index) == []
+    assert client.cursors == []
+
+    client = FakeClient(fail=True)
+    assert ScraperUtils._paginate_comments(client, "7", "cursor-1", index=index) is None
+    assert ScraperUtils.extract_comments(None, captured=[BODIES[0]], client=client, tweet_id="7", index=index) == []
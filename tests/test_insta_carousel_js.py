@@ -0,0 +1,56 @@
+"""
+CAROUSEL_JS must collect the same media as the step-by-step walk it replaces (the fallback of
+InstagramScraper._carousel_media). Runs in Chromium through the browser_page fixture and is
+skipped when Playwright has no browser.
+"""
+from pathlib import Path
+from platforms.instagram_scraper import CAROUSEL_JS, MEDIA_IMG_SELECTORS, InstagramScraper
+
+FIXTURE = Path(__file__).parent / "fixtures" / "instagram_post_carousel.html"
+EXPECTED = [
+    "https://scontent.cdninstagram.com/v/slide1.jpg",
+    "https://scontent.cdninstagram.com/v/slide2.jpg",
+    "https://scontent.cdninstagram.com/v/slide3.mp4",
+    "https://scontent.cdninstagram.com/v/slide3-hd.mp4",
+    "https://scontent.cdninstagram.com/v/slide4.jpg",
+    "https://scontent.cdninstagram.com/v/slide6.jpg",
+]
+
+
+def _load(page):
+    page.set_content(FIXTURE.read_text(encoding="utf-8"))
+
+
+def test_carousel_js_walks_every_slide(browser_page):
+    _load(browser_page)
+    carousel = browser_page.evaluate(CAROUSEL_JS, [MEDIA_IMG_SELECTORS, InstagramScraper.CAROUSEL_TIMEOUT,
+                                                   InstagramScraper.CAROUSEL_MAX_STEPS])
+    assert carousel == {"urls": EXPECTED, "clicks": 5}
+
+
+def test_carousel_js_matches_stepwise_walk(browser_page):
+    _load(browser_page)
+    stepwise = InstagramScraper._carousel_media_stepwise(browser_page, InstagramScraper.CAROUSEL_TIMEOUT,
+                                                         InstagramScraper.CAROUSEL_MAX_STEPS)
+    assert stepwise == EXPECTED
+
+
+def test_carousel_js_stops_after_max_steps(browser_page):
+    _load(browser_page)
+    carousel = browser_page.evaluate(CAROUSEL_JS, [MEDIA_IMG_SELECTORS, InstagramScraper.CAROUSEL_TIMEOUT, 1])
+    assert carousel == {"urls": EXPECTED[:4], "clicks": 1}
+
+
+def test_failed_in_page_read_falls_back_to_stepwise(browser_page, tmp_path, monkeypatch):
+    _load(browser_page)
+    scraper = InstagramScraper(user_data_dir=str(tmp_path))
+    scraper.page = browser_page
+    evaluate = browser_page.evaluate
+
+    def broken_carousel(script, *args):
+        if script == CAROUSEL_JS:
+            raise RuntimeError("script error")
+        return evaluate(script, *args)
+
+    monkeypatch.setattr(browser_page, "evaluate", broken_carousel)
+    assert scraper._carousel_media() == EXPECTED
@@ -0,0 +1,50 @@
+"""
+COMMENTS_JS (the default comment extraction of InstagramScraper) must return exactly what
+parse_instagram_comment reads element by element, the fallback. Runs in Chromium through the
+browser_page fixture and is skipped when Playwright has no browser. Set
+INSTAGRAM_POST_HTML to a saved post page ("Save page as" on a post with its comments open)
+to check the live markup as well as the bundled fixture.
+"""
+import os
+from pathlib import Path
+import pytest
+from core.insta_utils import InstaUtils
+
+FIXTURE = Path(__file__).parent / "fixtures" / "instagram_post_comments.html"
+PAGES = [FIXTURE] + ([Path(os.environ["INSTAGRAM_POST_HTML"])] if os.environ.get("INSTAGRAM_POST_HTML") else [])
+# Same lookups as InstagramScraper._extract_comments
+MAIN = "xpath=//main//hr[1]/following::div[1]/div[1]"
+CONTAINER_SELECTORS = ["./div", "./ul/li", "./div[contains(@role, 'presentation')]/div"]
+
+
+def _comment_block(page, path):
+    page.set_content(path.read_text(encoding="utf-8"))
+    main = page.query_selector(MAIN)
+    assert main is not None
+    return main.query_selector_all("xpath=./div")[-1]
+
+
+def _per_element(block):
+    for selector in CONTAINER_SELECTORS:
+        containers = block.query_selector_all(f"xpath={selector}")
+        if containers:
+            break
+    return [c for c in (InstaUtils.parse_instagram_comment(container) for container in containers) if c]
+
+
+@pytest.mark.parametrize("path", PAGES, ids=lambda p: p.name)
+def test_comments_js_matches_per_element_parser(browser_page, path):
+    block = _comment_block(browser_page, path)
+    expected = _per_element(block)
+    assert expected
+    assert InstaUtils.parse_instagram_comments(browser_page, block, CONTAINER_SELECTORS) == expected
+
+
+def test_fixture_values(browser_page):
+    comments = InstaUtils.parse_instagram_comments(browser_page, _comment_block(browser_page, FIXTURE),
+                                                   CONTAINER_SELECTORS)
+    assert [c["username"] for c in comments] == ["@geegeecollins", "@loreta_isac", "@someone_else"]
+    assert comments[0]["time"] == "2025-12-31T15:20:01.000Z"
+    assert [c["likes"] for c in comments] == [1, 12, 0]
+    assert [c["replies"] for c in comments] == [0, 3, 0]
+    assert comments[2]["media"] == "https://static.cdninstagram.com/media/sticker.png"
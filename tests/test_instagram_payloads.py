@@ -0,0 +1,51 @@
+from core.decoding import LazyJson
+from core.insta_parser import InstaGraphQLParser
+from core.models import InstaComment, to_iso_time
+from platforms.instagram_scraper import PostPayloads
+
+HREF = "https://www.instagram.com/p/AbC/?img_index=1"
+
+
+def _post_page():
+    return LazyJson(b'{"data": {"xdt_api__v1__media__shortcode__web_info": {"items": [{"code": "AbC", "pk": 1,'
+                    b' "like_count": 5, "taken_at": 1767193209, "user": {"username": "mosseri"},'
+                    b' "comments": [{"text": "first", "created_at": 1767193300, "user": {"username": "a"}}]}]}}}')
+
+
+def _comment_page(*texts):
+    edges = ",".join(f'{{"node": {{"text": "{t}", "created_at": 1767193300, "user": {{"username": "a"}}}}}}'
+                     for t in texts)
+    return LazyJson(f'{{"data": {{"{InstaGraphQLParser.COMMENTS_KEY}": {{"edges": [{edges}]}}}}}}'.encode())
+
+
+def test_follow_parses_each_captured_body_once(monkeypatch):
+    calls = []
+    parse = InstaGraphQLParser.parse
+    monkeypatch.setattr(InstaGraphQLParser, "parse", staticmethod(lambda body: calls.append(body) or parse(body)))
+
+    payloads = PostPayloads(HREF)
+    captured = [_comment_page("first", "second")]
+    assert not payloads.follow(captured)
+    assert not payloads.follow(captured)
+    captured.append(_post_page())
+    assert payloads.follow(captured)
+    captured.append(_comment_page("third"))
+    payloads.follow(captured)
+    assert len(calls) == 3
+
+    post = payloads.post()
+    assert post.url == HREF
+    assert post.likes == 5
+    assert post.timestamp == "2025-12-31T15:00:09.000Z"
+    assert [c.message for c in post.comments] == ["first", "second", "third"]
+
+
+def test_dom_and_graphql_times_share_one_format():
+    assert to_iso_time(1767193209) == "2025-12-31T15:00:09.000Z"
+    assert to_iso_time("2025-12-31T15:00:09.000Z") == "2025-12-31T15:00:09.000Z"
+    assert to_iso_time("2025-12-31T16:00:09+01:00") == "2025-12-31T15:00:09.000Z"
+    assert to_iso_time("Dec 31, 2025") == "2025-12-31T00:00:00.000Z"
+    assert to_iso_time("2 days ago") == "2 days ago"
+    assert to_iso_time(None) is None
+    comment = InstaComment.from_dict({"username": "@a", "time": "Dec 31, 2025", "likes": "1,204"})
+    assert (comment.time, comment.likes) == ("2025-12-31T00:00:00.000Z", 1204)
@@ -0,0 +1,14 @@
+from core.metrics import RunMetrics
+
+
+def test_prometheus_series_are_last_run_gauges():
+    metrics = RunMetrics("x")
+    metrics.add("posts", 3)
+    metrics.observe("parse", 0.25)
+    text = metrics.to_prometheus()
+
+    types = [line.split()[-1] for line in text.splitlines() if line.startswith("# TYPE")]
+    assert types and set(types) == {"gauge"}
+    assert "_total" not in text
+    assert 'scraper_last_run_posts{platform="x"} 3' in text
+    assert 'scraper_last_run_stage_seconds{platform="x",stage="parse"} 0.25' in text
@@ -0,0 +1,81 @@
+import time
+from pymongo.errors import BulkWriteError
+from core.database import MongoSink
+from core.models import Comment, Post
+
+
+def _post(url="https://x.com/someone/status/42", **fields):
+    return dict({"url": url, "likes": 1, "comments": [{"user": "https://x.com/a", "text": "hi", "timestamp": "t"}]}, **fields)
+
+
+def test_upserts_on_stable_key(mongo_db):
+    sink = MongoSink("x", db=mongo_db, flush_interval=0)
+    # DOM fallback without an id, then the GraphQL path with one and new counts
+    sink.write(_post())
+    sink.write(_post(id="42", likes=7))
+    sink.close()
+
+    docs = list(mongo_db.posts.find())
+    assert len(docs) == 1
+    assert docs[0]["key"] == "42"
+    assert docs[0]["id"] == "42"
+    assert docs[0]["likes"] == 7
+    assert mongo_db.comments.count_documents({"post_key": "42"}) == 1
+
+
+def test_writes_models(mongo_db):
+    post = Post(url="https://www.instagram.com/p/AbC_1/", comments=[Comment(user="u", text="t", id="9")])
+    with MongoSink("instagram", db=mongo_db, flush_interval=0) as sink:
+        sink.write(post)
+    assert mongo_db.posts.find_one()["key"] == "AbC_1"
+    assert mongo_db.comments.find_one()["key"] == "AbC_1:9"
+
+
+def test_backfills_keys_of_older_documents(mongo_db):
+    mongo_db.posts.insert_one({"platform": "x", "url": "https://x.com/someone/status/42", "likes": 1})
+    with MongoSink("x", db=mongo_db, flush_interval=0) as sink:
+        sink.write(_post(id="42", likes=3))
+    assert mongo_db.posts.count_documents({}) == 1
+    assert mongo_db.posts.find_one()["likes"] == 3
+
+
+def test_flushes_by_batch_size(mongo_db):
+    sink = MongoSink("x", db=mongo_db, batch_size=4, flush_interval=0)
+    sink.write(_post())
+    assert mongo_db.posts.count_documents({}) == 0
+    sink.write(_post(url="https://x.com/someone/status/43"))
+    assert mongo_db.posts.count_documents({}) == 2
+    sink.close()
+
+
+def test_flushes_by_time_without_further_writes(mongo_db):
+    sink = MongoSink("x", db=mongo_db, flush_interval=0.05)
+    sink.write(_post())
+    deadline = time.monotonic() + 3
+    while not mongo_db.posts.count_documents({}) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert mongo_db.posts.count_documents({}) == 1
+    sink.close()
+
+
+def test_retries_concurrent_duplicate_keys(mongo_db, monkeypatch):
+    sink = MongoSink("x", db=mongo_db, flush_interval=0)
+    bulk_write = type(sink.posts).bulk_write
+    calls = []
+
+    def racing_bulk_write(collection, ops, ordered=True):
+        calls.append(len(ops))
+        if len(calls) == 1:
+            # Another writer inserted the same key between our match and insert
+            collection.insert_one({"platform": "x", "key": "42", "url": "https://x.com/someone/status/42", "likes": 0})
+            raise BulkWriteError({"writeErrors": [{"index": 0, "code": 11000, "errmsg": "E11000 duplicate key"}]})
+        return bulk_write(collection, ops, ordered=ordered)
+
+    monkeypatch.setattr(type(sink.posts), "bulk_write", racing_bulk_write)
+    sink.write(_post(id="42", likes=5))
+    sink.close()
+
+    assert calls[:2] == [1, 1]
+    doc = mongo_db.posts.find_one({"key": "42"})
+    assert doc["likes"] == 5
+    assert mongo_db.posts.count_documents({}) == 1
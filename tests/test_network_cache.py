@@ -0,0 +1,142 @@
+import asyncio
+
+from core.network_cache import NetworkCache
+
+FEED = "https://www.instagram.com/api/graphql"
+
+
+class FakeRequest:
+    def __init__(self, url, method="GET", post_data=None):
+        self.url = url
+        self.method = method
+        self.post_data_buffer = post_data
+
+
+class FakeResponse:
+    def __init__(self, body, status=200):
+        self.status = status
+        self.headers = {"content-type": "application/json", "content-encoding": "gzip", "content-length": "9"}
+        self._body = body
+
+    def body(self):
+        return self._body
+
+
+class FakeRoute:
+    """ A routed request; fetch() answers from `network`, a list of bodies served in turn. """
+
+    def __init__(self, request, network=()):
+        self.request = request
+        self.network = list(network)
+        self.outcome = None
+
+    def fetch(self):
+        if not self.network:
+            raise RuntimeError("net::ERR_INTERNET_DISCONNECTED")
+        return FakeResponse(self.network.pop(0))
+
+    def fulfill(self, response=None, status=None, headers=None, body=None):
+        self.outcome = ("fulfilled", status or response.status, headers, body)
+
+    def continue_(self):
+        self.outcome = ("continued",)
+
+    def abort(self):
+        self.outcome = ("aborted",)
+
+
+class AsyncRoute(FakeRoute):
+    async def fetch(self):
+        return AsyncResponse(FakeRoute.fetch(self)._body)
+
+    async def fulfill(self, **kwargs):
+        FakeRoute.fulfill(self, **kwargs)
+
+    async def continue_(self):
+        FakeRoute.continue_(self)
+
+    async def abort(self):
+        FakeRoute.abort(self)
+
+
+class AsyncResponse(FakeResponse):
+    async def body(self):
+        return self._body
+
+
+def form(doc_id, cursor, lsd):
+    return f"doc_id={doc_id}&lsd={lsd}&variables=%7B%22after%22%3A%22{cursor}%22%7D&__req=1a".encode()
+
+
+def test_key_ignores_volatile_params_and_form_field_order(tmp_path):
+    cache = NetworkCache(str(tmp_path))
+
+    assert cache.key("get", "https://x.com/i/api?b=2&a=1&__req=3") == cache.key("GET", "https://x.com/i/api?a=1&b=2")
+    assert cache.key("POST", FEED, form(1, "c1", "tok1")) == cache.key("POST", FEED, form(1, "c1", "tok2"))
+    assert cache.key("POST", FEED, form(1, "c1", "tok1")) != cache.key("POST", FEED, form(1, "c2", "tok1"))
+    # JSON bodies are matched as they are
+    assert cache.key("POST", FEED, b'{"lsd": 1}') != cache.key("POST", FEED, b'{"lsd": 2}')
+    assert cache.key("GET", "https://x.com/a?q=1") != cache.key("POST", "https://x.com/a?q=1")
+
+
+def test_recorded_responses_replay_in_order_then_the_last_repeats(tmp_path):
+    recorder = NetworkCache(str(tmp_path), mode="record")
+    for body in (b"page 1", b"page 2"):
+        route = FakeRoute(FakeRequest(FEED, "POST", form(1, "", "tok1")), network=[body])
+        recorder.handle(route)
+        assert route.outcome[0] == "fulfilled" and route.outcome[3] == body
+    assert recorder.report()["recorded"] == 2
+
+    replay = NetworkCache(str(tmp_path), mode="replay")
+    served = []
+    for _ in range(3):
+        route = FakeRoute(FakeRequest(FEED, "POST", form(1, "", "tok2")))
+        replay.handle(route)
+        served.append(route.outcome[3])
+    assert served == [b"page 1", b"page 2", b"page 2"]
+    # The transfer headers of the original response are dropped
+    assert route.outcome[2] == {"content-type": "application/json"}
+    assert (replay.hits, replay.misses) == (3, 0)
+    # Both recordings share one body blob per distinct body
+    assert len(list((tmp_path / "blobs").glob("*/*"))) == 2
+
+
+def test_misses_are_aborted_or_sent_to_the_network(tmp_path):
+    NetworkCache(str(tmp_path), mode="record").store("GET", "https://x.com/a", None, 200, {}, b"a")
+
+    route = FakeRoute(FakeRequest("https://x.com/b"))
+    NetworkCache(str(tmp_path)).handle(route)
+    assert route.outcome == ("aborted",)
+
+    route = FakeRoute(FakeRequest("https://x.com/b"))
+    NetworkCache(str(tmp_path), on_miss="network").handle(route)
+    assert route.outcome == ("continued",)
+
+    assert NetworkCache(str(tmp_path)).lookup("GET", "https://x.com/a")["body"] == b"a"
+
+
+def test_record_aborts_failed_fetches_and_survives_a_truncated_log(tmp_path):
+    recorder = NetworkCache(str(tmp_path), mode="record")
+    route = FakeRoute(FakeRequest("https://x.com/a"))
+    recorder.handle(route)
+    assert route.outcome == ("aborted",) and recorder.recorded == 0
+
+    recorder.store("GET", "https://x.com/a", None, 200, {}, b"a")
+    with open(tmp_path / "entries.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"_key": "cut sh')
+    assert NetworkCache(str(tmp_path)).lookup("GET", "https://x.com/a")["body"] == b"a"
+
+
+def test_async_routes_record_and_replay(tmp_path):
+    async def run():
+        recorder = NetworkCache(str(tmp_path), mode="record")
+        await recorder.handle_async(AsyncRoute(FakeRequest("https://x.com/a"), network=[b"a"]))
+        route = AsyncRoute(FakeRequest("https://x.com/a"))
+        await NetworkCache(str(tmp_path)).handle_async(route)
+        missed = AsyncRoute(FakeRequest("https://x.com/b"))
+        await NetworkCache(str(tmp_path), on_miss="network").handle_async(missed)
+        return route.outcome, missed.outcome
+
+    replayed, missed = asyncio.run(run())
+    assert replayed[0] == "fulfilled" and replayed[3] == b"a"
+    assert missed == ("continued",)
@@ -0,0 +1,232 @@
+import pytest
+
+import platforms.instagram_scraper as instagram_scraper
+import platforms.x_scraper as x_scraper
+from core.seen_index import SeenIndex
+from core.waits import Pacing
+from platforms.instagram_scraper import InstagramScraper
+from platforms.x_scraper import XScraper
+
+X_FEED = [f"https://x.com/u/status/{i}" for i in range(1, 10)]
+INSTA_FEED = [f"https://www.instagram.com/p/Post{i}/" for i in range(1, 10)]
+# Every third post is older than the date range of the seen index tests
+OLD_POSTS = set(X_FEED[::3] + INSTA_FEED[::3])
+
+
+class FakeResponse:
+    status = 200
+
+    url = "https://x.com/i/api/graphql/abc/TweetDetail?variables=%7B%7D"
+
+    def body(self):
+        return b'{"data": {}}'
+
+
+class FakePage:
+    """ A tab: navigations fire the response listeners at once; hrefs in `broken` fail to load. """
+
+    def __init__(self, broken=()):
+        self.broken = broken
+        self.listeners = []
+        self.visited = []
+        self.closed = False
+        self.url = "https://feed.example/"
+
+    def on(self, event, listener):
+        self.listeners.append(listener)
+
+    def off(self, event, listener):
+        self.listeners.remove(listener)
+
+    remove_listener = off
+
+    def goto(self, href, **kwargs):
+        if href in self.broken:
+            raise RuntimeError("net::ERR_CONNECTION_RESET")
+        self.visited.append(href)
+        for listener in list(self.listeners):
+            listener(FakeResponse())
+
+    def evaluate(self, expression, *args):
+        return "complete" if expression == "document.readyState" else 0
+
+    def wait_for_timeout(self, ms):
+        pass
+
+    def wait_for_load_state(self, *args, **kwargs):
+        pass
+
+    def query_selector(self, selector):
+        return object()
+
+    def wait_for_selector(self, selector, **kwargs):
+        pass
+
+    def bring_to_front(self):
+        pass
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+class FakeEngine:
+    """ BrowserEngine stand-in: records every tab it opens. """
+    broken = ()
+
+    def __init__(self, **kwargs):
+        self.blocker = None
+        self.context = self
+        self.page = None
+        self.tabs = []
+
+    def on(self, event, handler):
+        pass
+
+    def create_driver(self):
+        self.page = FakePage()
+        return self.page
+
+    get_driver = create_driver
+
+    def new_page(self):
+        page = FakePage(self.broken)
+        self.tabs.append(page)
+        return page
+
+
+def feed(scraper, hrefs, per_round=3):
+    """ Replaces the feed scroll: each round reveals the next `per_round` hrefs. """
+    rounds = []
+
+    def collect_round(seen, post_hrefs):
+        start = len(rounds) * per_round
+        rounds.append(start)
+        return scraper._accept_hrefs(hrefs[start:start + per_round], seen, post_hrefs, scraper.seen_index)
+
+    scraper._collect_round = collect_round
+    return rounds
+
+
+@pytest.fixture
+def x(monkeypatch):
+    monkeypatch.setattr(x_scraper, "BrowserEngine", FakeEngine)
+    scraper = XScraper(pacing=Pacing.none(), concurrency=2)
+    scraper._build_post = lambda href, captured, page: {"url": href, "tab": page, "bodies": len(captured)}
+    return scraper
+
+
+@pytest.fixture
+def insta(monkeypatch):
+    monkeypatch.setattr(instagram_scraper, "BrowserEngine", FakeEngine)
+    scraper = InstagramScraper(pacing=Pacing.none(), concurrency=2)
+
+    def finish_visit(page, href, captured, listener):
+        page.remove_listener("response", listener)
+        return {"url": href, "tab": page}
+
+    scraper._finish_visit = finish_visit
+    return scraper
+
+
+def test_x_pipeline_yields_posts_in_feed_order_up_to_max_posts(x):
+    rounds = feed(x, X_FEED)
+    posts = list(x.iter_search(current_url="https://x.com/search?q=py", max_posts=5))
+
+    assert [post["url"] for post in posts] == X_FEED[:5]
+    assert all(post["bodies"] == 1 for post in posts)
+    # The feed stops scrolling once max_posts hrefs are collected
+    assert len(rounds) == 2
+    assert x.metrics.summary()["counters"]["posts"] == 5
+
+
+def test_x_pipeline_reuses_its_tabs_and_closes_them(x):
+    feed(x, X_FEED)
+    posts = list(x.iter_search(current_url="https://x.com/search?q=py", max_posts=6))
+
+    tabs = x.browser_engine.tabs
+    assert len(tabs) == 2
+    assert sorted(href for tab in tabs for href in tab.visited) == sorted(X_FEED[:6])
+    assert all(tab.visited for tab in tabs)
+    assert {id(post["tab"]) for post in posts} == {id(tab) for tab in tabs}
+    assert all(tab.closed and not tab.listeners for tab in tabs)
+    # The feed tab never navigates away
+    assert x.page.url == "https://feed.example/"
+
+
+def test_x_pipeline_skips_a_failed_visit(x, monkeypatch):
+    monkeypatch.setattr(FakeEngine, "broken", (X_FEED[1],))
+    feed(x, X_FEED)
+    posts = list(x.iter_search(current_url="https://x.com/search?q=py", max_posts=4))
+
+    assert [post["url"] for post in posts] == [X_FEED[0]] + X_FEED[2:4]
+    assert all(not tab.listeners for tab in x.browser_engine.tabs)
+
+
+def test_x_pipeline_keeps_going_when_a_post_fails_to_parse(x):
+    feed(x, X_FEED)
+    build = x._build_post
+
+    def build_post(href, captured, page):
+        if href == X_FEED[0]:
+            raise ValueError("unexpected payload")
+        return build(href, captured, page)
+
+    x._build_post = build_post
+    posts = list(x.iter_search(current_url="https://x.com/search?q=py", max_posts=3))
+
+    assert [post["url"] for post in posts] == X_FEED[1:3]
+
+
+def test_instagram_pipeline_yields_posts_in_feed_order_up_to_max_posts(insta):
+    rounds = feed(insta, INSTA_FEED)
+    posts = list(insta.iter_search(max_posts=5))
+
+    assert [post["url"] for post in posts] == INSTA_FEED[:5]
+    assert len(rounds) == 2
+
+
+def test_instagram_pipeline_reuses_its_tabs_and_skips_a_failed_visit(insta, monkeypatch):
+    monkeypatch.setattr(FakeEngine, "broken", (INSTA_FEED[2],))
+    feed(insta, INSTA_FEED)
+    posts = list(insta.iter_search(max_posts=6))
+
+    assert [post["url"] for post in posts] == INSTA_FEED[:2] + INSTA_FEED[3:6]
+    tabs = insta.browser.tabs
+    assert len(tabs) == 2
+    assert {id(post["tab"]) for post in posts} == {id(tab) for tab in tabs}
+    assert all(tab.closed and not tab.listeners for tab in tabs)
+    assert insta.page.url == "https://feed.example/"
+
+
+def dated(href):
+    return "2020-01-01T10:00:00.000Z" if href in OLD_POSTS else "2024-06-01T10:00:00.000Z"
+
+
+@pytest.mark.parametrize("name, target", [("x", {"current_url": "https://x.com/search?q=py"}), ("insta", {})])
+def test_posts_outside_the_date_range_are_not_marked_seen(name, target, request, tmp_path):
+    scraper = request.getfixturevalue(name)
+    hrefs = X_FEED if name == "x" else INSTA_FEED
+    scraper.seen_index = SeenIndex(str(tmp_path / "seen.sqlite3"), platform=name)
+    if name == "x":
+        scraper._build_post = lambda href, captured, page: {"url": href, "timestamp": dated(href)}
+    else:
+        def finish_visit(page, href, captured, listener):
+            page.remove_listener("response", listener)
+            return {"url": href, "timestamp": dated(href)}
+        scraper._finish_visit = finish_visit
+
+    feed(scraper, hrefs)
+    posts = list(scraper.iter_search(start_time="2023-01-01", max_posts=6, **target))
+
+    recent = [href for href in hrefs[:6] if href not in OLD_POSTS]
+    assert [post["url"] for post in posts] == recent
+    assert [href for href in hrefs if href in scraper.seen_index] == recent
+
+    # A rerun with a wider range still visits the old posts, and skips the ones it already has
+    feed(scraper, hrefs)
+    posts = list(scraper.iter_search(max_posts=5, **target))
+    assert [post["url"] for post in posts] == [href for href in hrefs if href not in recent]
+    scraper.seen_index.close()
@@ -0,0 +1,14 @@
+import json
+from core.replay import Replay, build_comment_pages
+
+
+def test_instagram_replay_counts_rebuilt_comments():
+    post = {"url": "https://www.instagram.com/p/A/", "comments": [
+        {"username": "/someone/", "time": "Dec 31, 2025", "message": "hi", "likes": "1,204", "replies": 2},
+        {"username": "@other", "time": "2025-12-30T10:00:00.000Z", "message": "yo", "likes": 0, "replies": 0},
+    ]}
+    pages = [json.dumps(body).encode() for body in build_comment_pages(post, page_size=1)]
+    assert len(pages) == 2
+
+    replay = Replay(instagram_comment_pages=pages)
+    assert replay.instagram_posts() == (0, 2)
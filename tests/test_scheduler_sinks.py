@@ -0,0 +1,28 @@
+import json
+import threading
+from core.job_queue import Job
+from platforms.scheduler import PlatformSinks
+
+
+def test_workers_share_one_sink_per_platform(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sinks = PlatformSinks(batch_size=3, max_bytes=0)
+
+    def worker(number):
+        sink = sinks(Job(number, "x", "search", f"q{number}", 200, 3600, 0, 0))
+        for i in range(200):
+            sink.write({"url": f"https://x.com/u/status/{number}{i:03d}", "text": "x" * 500})
+        sink.close()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(1, 5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    sinks.close()
+
+    files = list((tmp_path / "data").iterdir())
+    assert [f.name for f in files] == ["x_jobs.jsonl"]
+    lines = files[0].read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 800
+    assert len({json.loads(line)["url"] for line in lines}) == 800
@@ -0,0 +1,79 @@
+import pytest
+
+import platforms.scraper_pool as scraper_pool
+from core.metrics import RunMetrics
+from platforms.scraper_pool import ScraperPool
+from platforms.universal_scraper import UniversalScraper
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    def evaluate(self, expression):
+        if self.closed:
+            raise RuntimeError("Target page, context or browser has been closed")
+        return 1 if expression == "() => 1" else 0
+
+
+class FakeScraper:
+    """ Logs in at once; its search crashes the page when `crash` is set. """
+    crash = False
+
+    def __init__(self, user_data_dir=None, **kwargs):
+        self.user_data_dir = user_data_dir
+        self.page = self.driver = FakePage()
+        self.metrics = RunMetrics(platform="x")
+        self.resource_blocker = None
+        self.network_cache = None
+        self.seen_index = None
+        self.closed = False
+
+    def login(self, username=None, password=None):
+        return True
+
+    def iter_search(self, text=None, max_posts=5, checkpoint=None):
+        yield {"url": "https://x.com/a/status/1"}
+        if self.crash:
+            self.page.closed = True
+            raise RuntimeError("Target crashed")
+        yield {"url": "https://x.com/a/status/2"}
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setitem(scraper_pool.SCRAPERS, "x", FakeScraper)
+    return ScraperPool("x", size=1)
+
+
+def test_failed_run_recycles_its_slot(pool, monkeypatch):
+    scraper = UniversalScraper(pool=pool)
+    monkeypatch.setattr(FakeScraper, "crash", True)
+    posts = scraper.run(search_text="#py")
+
+    # The posts before the failure are kept, the crashed browser is not
+    assert [post["url"] for post in posts] == ["https://x.com/a/status/1"]
+    assert isinstance(scraper.last_error, RuntimeError)
+    assert pool.stats == {"created": 1, "recycled": 1, "leases": 1}
+    assert not pool._idle and not pool._busy
+
+    monkeypatch.setattr(FakeScraper, "crash", False)
+    assert len(scraper.run(search_text="#py")) == 2
+    assert scraper.last_error is None
+    assert pool.stats == {"created": 2, "recycled": 1, "leases": 2}
+    assert pool._idle[0].slot == 0 and pool._idle[0].jobs == 1
+
+
+def test_successful_runs_reuse_the_warm_scraper(pool):
+    scraper = UniversalScraper(pool=pool)
+    scraper.run(search_text="#py")
+    scraper.run(search_text="#rust")
+
+    assert pool.stats == {"created": 1, "recycled": 0, "leases": 2}
+    assert pool._idle[0].jobs == 2 and not pool._idle[0].scraper.closed
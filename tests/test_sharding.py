@@ -0,0 +1,104 @@
+import os
+
+from core.metrics import RunMetrics
+from core.sharding import HashRing, clone_profile
+from platforms.sharded_runner import ShardedRunner
+
+QUERIES = [f"#topic{i}" for i in range(400)]
+
+
+class FakePage:
+    def is_closed(self):
+        return False
+
+    def evaluate(self, expression):
+        return 1 if expression == "() => 1" else 0
+
+
+class FakeScraper:
+    """ Scraper factory for the worker processes: two posts per query, tagged with the worker's pid. """
+
+    def __init__(self, user_data_dir=None, **kwargs):
+        self.page = self.driver = FakePage()
+        self.metrics = RunMetrics(platform="x")
+        self.resource_blocker = None
+        self.network_cache = None
+        self.seen_index = None
+
+    def login(self, username=None, password=None):
+        return True
+
+    def iter_search(self, text=None, max_posts=5, checkpoint=None):
+        for i in range(2):
+            yield {"url": f"https://x.com/{text}/status/{i}", "pid": os.getpid()}
+
+    def close(self):
+        pass
+
+
+def test_assignment_is_stable_across_rings_and_node_order():
+    nodes = ["host-a/0", "host-a/1", "host-b/0"]
+    ring = HashRing(nodes)
+
+    assert [ring.node_for(q) for q in QUERIES] == [HashRing(reversed(nodes)).node_for(q) for q in QUERIES]
+    shards = ring.partition(QUERIES)
+    assert set(shards) == set(nodes)
+    assert sorted(q for keys in shards.values() for q in keys) == sorted(QUERIES)
+    # 100 points per node spread the keys roughly evenly
+    assert all(len(keys) > len(QUERIES) / 6 for keys in shards.values())
+
+
+def test_adding_a_shard_only_moves_keys_to_it():
+    ring = HashRing(["a", "b", "c"])
+    before = {q: ring.node_for(q) for q in QUERIES}
+    ring.add("d")
+    moved = {q for q in QUERIES if ring.node_for(q) != before[q]}
+
+    assert moved and all(ring.node_for(q) == "d" for q in moved)
+    assert len(moved) < len(QUERIES) / 2
+
+    ring.remove("d")
+    assert {q: ring.node_for(q) for q in QUERIES} == before
+
+
+def test_clone_profile_skips_locks_and_caches_and_keeps_an_existing_copy(tmp_path):
+    template = tmp_path / "template"
+    (template / "Default" / "Cache").mkdir(parents=True)
+    (template / "Default" / "Cache" / "data_0").write_text("cache")
+    (template / "Default" / "Cookies").write_text("session")
+    (template / "SingletonLock").write_text("pid")
+    dest = tmp_path / "worker"
+
+    clone_profile(str(template), str(dest))
+    assert (dest / "Default" / "Cookies").read_text() == "session"
+    assert not (dest / "SingletonLock").exists() and not (dest / "Default" / "Cache").exists()
+
+    # The worker's own, newer session is kept unless refresh is asked for
+    (dest / "Default" / "Cookies").write_text("newer")
+    clone_profile(str(template), str(dest))
+    assert (dest / "Default" / "Cookies").read_text() == "newer"
+    clone_profile(str(template), str(dest), refresh=True)
+    assert (dest / "Default" / "Cookies").read_text() == "session"
+
+
+def test_local_shards_keep_this_nodes_share():
+    items = QUERIES[:50]
+    shares = [ShardedRunner(workers=2, node=node, nodes=["a", "b"]).local_shards(items) for node in ("a", "b")]
+
+    assert all(shard.startswith("a/") for shard in shares[0]) and all(shard.startswith("b/") for shard in shares[1])
+    assert sorted(q for share in shares for keys in share.values() for q in keys) == sorted(items)
+
+
+def test_spawned_workers_merge_their_posts(tmp_path):
+    template = tmp_path / "template"
+    template.mkdir()
+    runner = ShardedRunner(workers=2, node="a", template_profile=str(template),
+                           profile_root=str(tmp_path / "profiles"), scraper_factory=FakeScraper)
+    items = QUERIES[:6]
+    assert len(runner.local_shards(items)) == 2
+
+    posts = runner.run(items, max_posts=2)
+
+    assert sorted(post["url"] for post in posts) == sorted(f"https://x.com/{q}/status/{i}" for q in items for i in range(2))
+    assert len({post["pid"] for post in posts}) == 2 and os.getpid() not in {post["pid"] for post in posts}
+    assert sorted(os.listdir(tmp_path / "profiles")) == ["x_0", "x_1"]
@@ -0,0 +1,54 @@
+from core.models import Comment, CommentIndex, comment_key, to_int
+from core.replay import build_payloads, load_payloads
+from core.tweet_parser import TweetDetailParser, _comment_fast
+
+POST = {"id": "9", "url": "https://x.com/a/status/9", "text": "main", "comments": [
+    {"user": "https://x.com/b", "text": "same"},
+    {"user": "https://x.com/c", "text": "same"},
+    {"user": "https://x.com/b", "text": "same"},
+]}
+
+
+def without_comment_ids(body):
+    """ The body with the ids removed from every reply, as DOM-read comments come in. """
+    for instr in body["data"]["threaded_conversation_with_injections_v2"]["instructions"]:
+        for entry in instr.get("entries", ()):
+            for item in entry["content"].get("items", ()):
+                result = item["item"]["itemContent"]["tweet_results"]["result"]
+                result.pop("rest_id", None)
+                result["legacy"].pop("id_str", None)
+    return body
+
+
+def test_comment_key_is_the_id_or_the_user_and_text():
+    assert comment_key("123", "https://x.com/b", "hi") == "123"
+    assert comment_key(None, "https://x.com/b", "x" * 300) == ("https://x.com/b", "x" * 200)
+    assert comment_key("", "https://x.com/b", None) == ("https://x.com/b", "")
+
+
+def test_index_and_parser_share_the_key_of_comments_without_id():
+    index = CommentIndex([{"user": "https://x.com/b", "text": "same"}])
+    assert Comment(user="https://x.com/b", text="same") in index
+
+    parsed = TweetDetailParser.parse(without_comment_ids(build_payloads(POST)[0]), index=index)
+
+    # b's reply was already indexed (and is repeated in the body); only c's is new
+    assert [(c.user, c.id) for c in parsed["comments"]] == [("https://x.com/c", None)]
+    assert index.keys == {("https://x.com/b", "same"), ("https://x.com/c", "same")}
+
+
+def replies(body):
+    for instr in body["data"]["threaded_conversation_with_injections_v2"]["instructions"]:
+        for entry in instr.get("entries", ()):
+            for item in entry["content"].get("items", ()):
+                yield item["item"]["itemContent"]["tweet_results"]["result"]
+
+
+def test_fast_comment_reads_match_the_generic_lookups():
+    results = [result for body in load_payloads() for result in replies(body)]
+    assert results
+    for result in results:
+        legacy, text, handle, timestamp, likes, reposts, views, comment_id = _comment_fast(result)
+        fast = (legacy, text, handle, timestamp, likes, reposts, int(views), comment_id)
+        generic = TweetDetailParser._comment_fields(result)[1:]
+        assert fast == generic[:6] + (to_int(generic[6]), generic[7])
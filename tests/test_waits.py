@@ -0,0 +1,76 @@
+import asyncio
+
+from core.waits import AsyncWaitUtils, WaitUtils
+
+
+class FakePage:
+    """ Sync page: wait_for_function succeeds once `ready` is set, and times out otherwise. """
+
+    def __init__(self, ready=True):
+        self.ready = ready
+        self.calls = []
+        self.slept = 0
+
+    def wait_for_function(self, script, arg=None, timeout=None):
+        self.calls.append((script, arg, timeout))
+        if not self.ready:
+            raise TimeoutError(f"Timeout {timeout}ms exceeded.")
+
+    def evaluate(self, script, arg=None):
+        self.calls.append((script, arg, None))
+        return 3
+
+    def wait_for_timeout(self, ms):
+        self.slept += ms
+
+
+class AsyncPage(FakePage):
+    async def wait_for_function(self, script, arg=None, timeout=None):
+        FakePage.wait_for_function(self, script, arg, timeout)
+
+    async def evaluate(self, script, arg=None):
+        return FakePage.evaluate(self, script, arg)
+
+
+def test_sync_and_async_waits_send_the_same_scripts():
+    sync_page, async_page = FakePage(), AsyncPage()
+
+    assert WaitUtils.wait_for_height_increase(sync_page, 100, timeout=50) is True
+    assert WaitUtils.wait_for_count_increase(sync_page, "xpath=//article", 2) is True
+    assert WaitUtils.count(sync_page, "a[href]") == 3
+
+    async def run():
+        assert await AsyncWaitUtils.wait_for_height_increase(async_page, 100, timeout=50) is True
+        assert await AsyncWaitUtils.wait_for_count_increase(async_page, "xpath=//article", 2) is True
+        assert await AsyncWaitUtils.count(async_page, "a[href]") == 3
+
+    asyncio.run(run())
+    assert async_page.calls == sync_page.calls
+    assert sync_page.calls[0] == ("prev => document.body.scrollHeight > prev", 100, 50)
+
+
+def test_timeouts_return_falsy_instead_of_raising():
+    assert WaitUtils.wait_for_height_increase(FakePage(ready=False), 100) is False
+    assert WaitUtils.wait_for_count_increase(FakePage(ready=False), "article", 0) is False
+
+    async def run():
+        return (await AsyncWaitUtils.wait_for_height_increase(AsyncPage(ready=False), 100),
+                await AsyncWaitUtils.wait_for_count_increase(AsyncPage(ready=False), "article", 0))
+
+    assert asyncio.run(run()) == (False, False)
+
+
+def test_wait_until_polls_until_the_condition_or_the_timeout():
+    page = FakePage()
+    captured = []
+    assert WaitUtils.wait_until(page, lambda: captured, timeout=250, interval=100) is False
+    assert page.slept == 300
+
+    page = FakePage()
+    checks = iter([False, False, True])
+    assert WaitUtils.wait_until(page, lambda: next(checks), timeout=1000, interval=100) is True
+    assert page.slept == 200
+
+    checks = iter([False, True])
+    assert asyncio.run(AsyncWaitUtils.wait_until(page, lambda: next(checks), timeout=1000, interval=1)) is True
+    assert asyncio.run(AsyncWaitUtils.wait_until(page, lambda: False, timeout=3, interval=1)) is False
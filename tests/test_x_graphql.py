@@ -0,0 +1,144 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qsl, urlparse
+import pytest
+from core.x_graphql import AsyncXGraphQLClient, XGraphQLClient
+
+QUERY_PATH = "/i/api/graphql/AbC123/TweetDetail"
+# The Bottom cursor each page hands out; the last page has none
+NEXT_CURSOR = {None: "cursor-1", "cursor-1": "cursor-2", "cursor-2": None}
+
+
+def _page(tweet_id, cursor):
+    entries = [{"entryId": f"tweet-{tweet_id}-{cursor}", "content": {}}]
+    if cursor:
+        entries.append({"entryId": "cursor-bottom", "content": {"cursorType": "Bottom", "value": cursor}})
+    return {"data": {"threaded_conversation_with_injections_v2": {"instructions": [{"entries": entries}]}}}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = dict(parse_qsl(parsed.query))
+        variables = json.loads(query.get("variables", "{}"))
+        self.requests.append({"path": parsed.path, "query": query, "variables": variables,
+                              "headers": {k.lower(): v for k, v in self.headers.items()}})
+        if parsed.path != QUERY_PATH:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = json.dumps(_page(variables["focalTweetId"], NEXT_CURSOR[variables.get("cursor")])).encode()
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    StubHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def context():
+    """ The parts of a BrowserContext the client uses: cookies() and a real APIRequestContext. """
+    sync_api = pytest.importorskip("playwright.sync_api")
+    with sync_api.sync_playwright() as playwright:
+        request = playwright.request.new_context()
+        yield SimpleNamespace(request=request, cookies=lambda url: [{"name": "ct0", "value": "csrf-token"}])
+        request.dispose()
+
+
+def _browser_request(base_url):
+    variables = {"focalTweetId": "1", "cursor": "stale", "with_rux_injections": False, "rankingMode": "Relevance"}
+    url = (f"{base_url}{QUERY_PATH}?variables={json.dumps(variables)}"
+           f"&features={json.dumps({'view_counts_everywhere_api_enabled': True})}")
+    headers = {"authorization": "Bearer token", "x-twitter-active-user": "yes", "cookie": "auth_token=secret",
+               "user-agent": "browser"}
+    return SimpleNamespace(url=url, headers=headers)
+
+
+def test_not_ready_until_a_tweet_detail_request_is_observed(context, stub_server):
+    client = XGraphQLClient(context, base_url=stub_server)
+    assert client.fetch_tweet_detail("42") is None
+    client.observe(SimpleNamespace(url=f"{stub_server}/i/api/graphql/X/HomeTimeline", headers={}))
+    assert not client.ready
+    assert StubHandler.requests == []
+
+
+def test_learns_endpoint_and_sends_csrf_headers(context, stub_server):
+    client = XGraphQLClient(context, base_url=stub_server)
+    client.observe(_browser_request(stub_server))
+    assert client.ready and client.path == QUERY_PATH
+
+    body = client.fetch_tweet_detail("42")
+    assert body["data"]["threaded_conversation_with_injections_v2"]["instructions"][0]["entries"][0]["entryId"] == "tweet-42-cursor-1"
+
+    sent = StubHandler.requests[-1]
+    assert sent["path"] == QUERY_PATH
+    # Per-tweet variables are replaced, the rest of the learned request is kept
+    assert sent["variables"] == {"focalTweetId": "42", "with_rux_injections": False, "rankingMode": "Relevance"}
+    assert json.loads(sent["query"]["features"]) == {"view_counts_everywhere_api_enabled": True}
+    assert sent["headers"]["x-csrf-token"] == "csrf-token"
+    assert sent["headers"]["authorization"] == "Bearer token"
+    assert sent["headers"]["x-twitter-active-user"] == "yes"
+    # Only the forwarded headers are copied from the browser request
+    assert "auth_token=secret" not in sent["headers"].get("cookie", "")
+    assert sent["headers"].get("user-agent") != "browser"
+
+
+def test_follows_bottom_cursors_until_they_run_out(context, stub_server):
+    client = XGraphQLClient(context, base_url=stub_server)
+    client.learn(_browser_request(stub_server).url)
+
+    bodies = client.fetch_conversation("7")
+    assert len(bodies) == 3
+    assert [r["variables"].get("cursor") for r in StubHandler.requests] == [None, "cursor-1", "cursor-2"]
+
+    StubHandler.requests.clear()
+    assert len(client.fetch_conversation("7", max_pages=2)) == 2
+    assert len(StubHandler.requests) == 2
+
+
+def test_error_status_returns_none(context, stub_server):
+    client = XGraphQLClient(context, base_url=stub_server)
+    client.learn(f"{stub_server}/i/api/graphql/Gone/TweetDetail?variables={{}}")
+    assert client.fetch_tweet_detail("42") is None
+    assert client.fetch_conversation("42") == []
+
+
+def test_async_client_builds_the_same_requests(stub_server):
+    async_api = pytest.importorskip("playwright.async_api")
+
+    async def cookies(url):
+        return [{"name": "ct0", "value": "csrf-token"}]
+
+    async def run():
+        async with async_api.async_playwright() as playwright:
+            request = await playwright.request.new_context()
+            try:
+                client = AsyncXGraphQLClient(SimpleNamespace(request=request, cookies=cookies), base_url=stub_server)
+                client.observe(_browser_request(stub_server))
+                return await client.fetch_conversation("7")
+            finally:
+                await request.dispose()
+
+    bodies = asyncio.run(run())
+    assert len(bodies) == 3
+    assert [r["variables"].get("cursor") for r in StubHandler.requests] == [None, "cursor-1", "cursor-2"]
+    assert all(r["headers"]["x-csrf-token"] == "csrf-token" for r in StubHandler.requests)